@@ -35,6 +35,13 @@ config.set_main_option("sqlalchemy.url", app_config.EFFECTIVE_ASYNC_DATABASE_URL
 target_metadata = Base.metadata
 
 
+def include_name(name, type_, parent_names):
+    """Keep the FTS5 virtual table and its shadow tables out of autogenerate."""
+    if type_ == "table" and name is not None:
+        return not name.startswith("records_fts")
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -49,6 +56,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -64,7 +72,11 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_name=include_name,
+        )
 
         with context.begin_transaction():
             context.run_migrations()
@@ -0,0 +1,93 @@
+"""Add publication date columns
+
+The dates of existing records are parsed from `issued` and `date` here, as
+ingest does for new records.
+
+Revision ID: 036d2e9f1228
+Revises: e34a3fd3b6f1
+Create Date: 2026-10-17 18:07:21.154405
+
+"""
+import calendar
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Sequence, Tuple, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '036d2e9f1228'
+down_revision: Union[str, Sequence[str], None] = 'e34a3fd3b6f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# `src.normalizer.publication_date` as of this revision, frozen here so that
+# later changes to the app do not change what this migration writes
+_DATE_RE = re.compile(r"(?<!\d)(\d{4})(?:[-./](\d{1,2})(?:[-./](\d{1,2}))?)?(?!\d)")
+
+_Date = Tuple[int | None, int | None, int | None]
+
+
+def _parse_date(value: str) -> _Date:
+    match = _DATE_RE.search(unicodedata.normalize("NFKC", value))
+    if match is None:
+        return None, None, None
+    year = int(match[1])
+    month = int(match[2]) if match[2] else None
+    if month is None or not 1 <= month <= 12:
+        return year, None, None
+    day = int(match[3]) if match[3] else None
+    if day is None or not 1 <= day <= calendar.monthrange(year, month)[1]:
+        return year, month, None
+    return year, month, day
+
+
+def _publication_date(date: str | None, issued: Iterable[str]) -> _Date:
+    values = [*issued, *([date] if date is not None else [])]
+    return max(
+        (_parse_date(value) for value in values),
+        key=lambda parsed: sum(part is not None for part in parsed),
+        default=(None, None, None),
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('records', sa.Column('pub_year', sa.Integer(), nullable=True))
+    op.add_column('records', sa.Column('pub_month', sa.Integer(), nullable=True))
+    op.add_column('records', sa.Column('pub_day', sa.Integer(), nullable=True))
+
+    bind = op.get_bind()
+    issued: Dict[str, List[str]] = {}
+    for record_id, value in bind.execute(
+        sa.text("SELECT record_id, value FROM issued ORDER BY rowid")
+    ):
+        issued.setdefault(record_id, []).append(value)
+    records = bind.execute(sa.text("SELECT rowid, id, date FROM records")).all()
+    updates = []
+    for rowid, record_id, date in records:
+        year, month, day = _publication_date(date, issued.get(record_id, []))
+        if year is not None:
+            updates.append({"year": year, "month": month, "day": day, "rowid": rowid})
+    if updates:
+        bind.execute(
+            sa.text(
+                "UPDATE records SET pub_year = :year, pub_month = :month, "
+                "pub_day = :day WHERE rowid = :rowid"
+            ),
+            updates,
+        )
+
+    op.create_index('ix_records_publication_date', 'records', ['pub_year', 'pub_month', 'pub_day'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_records_publication_date', table_name='records')
+    with op.batch_alter_table('records') as batch_op:
+        batch_op.drop_column('pub_day')
+        batch_op.drop_column('pub_month')
+        batch_op.drop_column('pub_year')
@@ -0,0 +1,139 @@
+"""Add upsert key and content hash to records
+
+The header identifier of existing records is read from their stored document,
+or from their first dcterms:URI identifier if they have none, and the hash from
+the document. Records without a document get no hash, so the next ingest of
+them rewrites them.
+
+Copies left by loading the same files more than once are deleted, keeping the
+last one loaded, before the identifier becomes unique; the facet counts are
+then recounted.
+
+Revision ID: 0904b4f57c74
+Revises: 85a61be4f0b1
+Create Date: 2026-10-17 18:18:35.179449
+
+"""
+import hashlib
+from typing import Dict, List, Sequence, Tuple, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0904b4f57c74'
+down_revision: Union[str, Sequence[str], None] = '85a61be4f0b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Tables whose rows belong to one record
+_CHILD_TABLES = (
+    'record_documents',
+    'identifiers',
+    'publication_places',
+    'issued',
+    'subjects',
+    'see_alsos',
+    'same_as_links',
+    'thumbnails',
+    'record_creator_association',
+)
+
+
+def _content_hash(document: str) -> str:
+    # `src.db._document.content_hash` as of this revision
+    return hashlib.blake2b(document.encode(), digest_size=16).hexdigest()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SQLite can add a NOT NULL column without rebuilding the table only if it
+    # has a default; every row gets its value below
+    op.add_column('records', sa.Column('oai_identifier', sa.String(), nullable=False, server_default=''))
+    op.add_column('records', sa.Column('content_hash', sa.String(), nullable=True))
+
+    bind = op.get_bind()
+    keys: Dict[str, Tuple[str, str | None]] = {}
+    for record_id, oai_identifier, document in bind.execute(
+        sa.text(
+            "SELECT record_id, json_extract(document, '$.header.identifier'), "
+            "document FROM record_documents"
+        )
+    ):
+        keys[record_id] = (oai_identifier, _content_hash(document))
+    # The parser adds the header identifier before the identifiers of the
+    # metadata
+    for record_id, value in bind.execute(
+        sa.text(
+            "SELECT record_id, value FROM identifiers "
+            "WHERE type = 'dcterms:URI' ORDER BY rowid"
+        )
+    ):
+        keys.setdefault(record_id, (value, None))
+
+    latest: Dict[str, Tuple[int, str]] = {}
+    duplicates: List[Dict[str, str]] = []
+    updates = []
+    for rowid, record_id in bind.execute(
+        sa.text("SELECT rowid, id FROM records ORDER BY rowid")
+    ):
+        oai_identifier, hash_value = keys[record_id]
+        if oai_identifier in latest:
+            duplicates.append({"id": latest[oai_identifier][1]})
+        latest[oai_identifier] = (rowid, record_id)
+        updates.append(
+            {"oai_identifier": oai_identifier, "hash": hash_value, "rowid": rowid}
+        )
+    if updates:
+        bind.execute(
+            sa.text(
+                "UPDATE records SET oai_identifier = :oai_identifier, "
+                "content_hash = :hash WHERE rowid = :rowid"
+            ),
+            updates,
+        )
+
+    if duplicates:
+        op.execute("CREATE TEMP TABLE duplicate_records (id CHAR(32) PRIMARY KEY)")
+        bind.execute(
+            sa.text("INSERT INTO duplicate_records (id) VALUES (:id)"), duplicates
+        )
+        op.execute(
+            "DELETE FROM records_fts WHERE rowid IN "
+            "(SELECT rowid FROM records WHERE id IN (SELECT id FROM duplicate_records))"
+        )
+        for table in _CHILD_TABLES:
+            op.execute(
+                f"DELETE FROM {table} "
+                f"WHERE record_id IN (SELECT id FROM duplicate_records)"
+            )
+        op.execute(
+            "DELETE FROM records WHERE id IN (SELECT id FROM duplicate_records)"
+        )
+        op.execute("DROP TABLE duplicate_records")
+
+        op.execute("DELETE FROM facet_counts")
+        for facet in ('material_type', 'language', 'access_rights', 'publisher'):
+            op.execute(
+                f"INSERT INTO facet_counts (facet, value, count) "
+                f"SELECT '{facet}', {facet}, count(*) FROM records "
+                f"WHERE {facet} IS NOT NULL GROUP BY {facet}"
+            )
+        op.execute(
+            "INSERT INTO facet_counts (facet, value, count) "
+            "SELECT 'subject', value, count(DISTINCT record_id) FROM subjects "
+            "GROUP BY value"
+        )
+
+    op.create_index(op.f('ix_records_oai_identifier'), 'records', ['oai_identifier'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_records_oai_identifier'), table_name='records')
+    # Unlike a batch rebuild of the table, DROP COLUMN keeps the rowids of
+    # records, which records_fts rows are aligned with
+    op.execute("ALTER TABLE records DROP COLUMN content_hash")
+    op.execute("ALTER TABLE records DROP COLUMN oai_identifier")
@@ -0,0 +1,82 @@
+"""Add normalized identifier value
+
+Revision ID: 1c521a1ef221
+Revises: 7dd2b5594a08
+Create Date: 2026-10-17 18:00:30.031713
+
+"""
+import re
+import unicodedata
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1c521a1ef221'
+down_revision: Union[str, Sequence[str], None] = '7dd2b5594a08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# `src.normalizer.normalize_identifier` as of this revision, frozen here so that
+# later changes to the app do not change what this migration writes
+_CODE_SEPARATOR_RE = re.compile(r"[\s\-\u2010-\u2015\u2212]+")
+_ISBN10_RE = re.compile(r"\d{9}[\dX]")
+
+
+def _compact_code(value: str) -> str:
+    return _CODE_SEPARATOR_RE.sub("", unicodedata.normalize("NFKC", value)).upper()
+
+
+def _normalize_isbn(value: str) -> str:
+    code = _compact_code(value)
+    if _ISBN10_RE.fullmatch(code):
+        digits = [10 if c == "X" else int(c) for c in code]
+        if sum((10 - i) * d for i, d in enumerate(digits)) % 11 == 0:
+            first_twelve = "978" + code[:9]
+            total = sum(
+                (1 if i % 2 == 0 else 3) * int(c) for i, c in enumerate(first_twelve)
+            )
+            return first_twelve + str(-total % 10)
+    return code
+
+
+def _normalize_identifier(value: str, type_: str | None) -> str:
+    if type_ is not None and "ISBN" in type_:
+        return _normalize_isbn(value)
+    if type_ is not None and "ISSN" in type_:
+        return _compact_code(value)
+    return unicodedata.normalize("NFKC", value).strip()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("identifiers", sa.Column("normalized_value", sa.String(), nullable=True))
+
+    bind = op.get_bind()
+    identifiers = bind.execute(sa.text("SELECT rowid, value, type FROM identifiers")).all()
+    if identifiers:
+        bind.execute(
+            sa.text("UPDATE identifiers SET normalized_value = :key WHERE rowid = :rowid"),
+            [
+                {"key": _normalize_identifier(value, type_), "rowid": rowid}
+                for rowid, value, type_ in identifiers
+            ],
+        )
+
+    with op.batch_alter_table("identifiers") as batch_op:
+        batch_op.alter_column(
+            "normalized_value", existing_type=sa.String(), nullable=False
+        )
+        batch_op.create_index(
+            "ix_identifiers_normalized_value", ["normalized_value"], unique=False
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("identifiers") as batch_op:
+        batch_op.drop_index("ix_identifiers_normalized_value")
+        batch_op.drop_column("normalized_value")
@@ -0,0 +1,71 @@
+"""Add unique normalized creator name
+
+Revision ID: 613755a220b0
+Revises: f1ad888c8de1
+Create Date: 2026-10-17 17:38:43.174183
+
+"""
+import unicodedata
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '613755a220b0'
+down_revision: Union[str, Sequence[str], None] = 'f1ad888c8de1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _normalize_name(name: str) -> str:
+    # `src.normalizer.normalize_name` as of this revision
+    return " ".join(unicodedata.normalize("NFKC", name).casefold().split())
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("creators", sa.Column("normalized_name", sa.String(), nullable=True))
+
+    bind = op.get_bind()
+    creators = bind.execute(sa.text("SELECT id, name FROM creators ORDER BY rowid")).all()
+
+    # Keep the first creator of every normalized name and merge the others into it
+    kept_ids: dict[str, str] = {}
+    for creator_id, name in creators:
+        key = _normalize_name(name)
+        kept_id = kept_ids.setdefault(key, creator_id)
+        if kept_id == creator_id:
+            bind.execute(
+                sa.text("UPDATE creators SET normalized_name = :key WHERE id = :id"),
+                {"key": key, "id": creator_id},
+            )
+            continue
+        bind.execute(
+            sa.text(
+                "UPDATE OR IGNORE record_creator_association "
+                "SET creator_id = :kept_id WHERE creator_id = :id"
+            ),
+            {"kept_id": kept_id, "id": creator_id},
+        )
+        bind.execute(
+            sa.text("DELETE FROM record_creator_association WHERE creator_id = :id"),
+            {"id": creator_id},
+        )
+        bind.execute(sa.text("DELETE FROM creators WHERE id = :id"), {"id": creator_id})
+
+    with op.batch_alter_table("creators") as batch_op:
+        batch_op.alter_column(
+            "normalized_name", existing_type=sa.String(), nullable=False
+        )
+        batch_op.create_index(
+            "ix_creators_normalized_name", ["normalized_name"], unique=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("creators") as batch_op:
+        batch_op.drop_index("ix_creators_normalized_name")
+        batch_op.drop_column("normalized_name")
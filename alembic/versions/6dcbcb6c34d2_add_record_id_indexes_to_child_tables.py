@@ -0,0 +1,42 @@
+"""Add record_id indexes to child tables
+
+Loading the child rows of a page of records, and deleting them when a record is
+replaced or removed, scanned each of these tables. subjects already has its
+index.
+
+Revision ID: 6dcbcb6c34d2
+Revises: f2ed2fe63723
+Create Date: 2026-10-17 18:56:08.890902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6dcbcb6c34d2'
+down_revision: Union[str, Sequence[str], None] = 'f2ed2fe63723'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_identifiers_record_id'), 'identifiers', ['record_id'], unique=False)
+    op.create_index(op.f('ix_issued_record_id'), 'issued', ['record_id'], unique=False)
+    op.create_index(op.f('ix_publication_places_record_id'), 'publication_places', ['record_id'], unique=False)
+    op.create_index(op.f('ix_same_as_links_record_id'), 'same_as_links', ['record_id'], unique=False)
+    op.create_index(op.f('ix_see_alsos_record_id'), 'see_alsos', ['record_id'], unique=False)
+    op.create_index(op.f('ix_thumbnails_record_id'), 'thumbnails', ['record_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_thumbnails_record_id'), table_name='thumbnails')
+    op.drop_index(op.f('ix_see_alsos_record_id'), table_name='see_alsos')
+    op.drop_index(op.f('ix_same_as_links_record_id'), table_name='same_as_links')
+    op.drop_index(op.f('ix_publication_places_record_id'), table_name='publication_places')
+    op.drop_index(op.f('ix_issued_record_id'), table_name='issued')
+    op.drop_index(op.f('ix_identifiers_record_id'), table_name='identifiers')
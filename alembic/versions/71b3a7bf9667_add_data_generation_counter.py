@@ -0,0 +1,33 @@
+"""Add data generation counter
+
+Revision ID: 71b3a7bf9667
+Revises: 613755a220b0
+Create Date: 2026-10-17 17:45:46.650461
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '71b3a7bf9667'
+down_revision: Union[str, Sequence[str], None] = '613755a220b0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    data_generation = op.create_table('data_generation',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('generation', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.bulk_insert(data_generation, [{'id': 1, 'generation': 0}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('data_generation')
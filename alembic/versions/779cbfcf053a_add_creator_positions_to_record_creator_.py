@@ -0,0 +1,87 @@
+"""Add creator positions to record creator association
+
+Creators were loaded in no particular order, so documents rebuilt from the
+tables could list them in another order than ingest, and get another content
+hash. The positions of existing rows follow the creators of the record's stored
+document, or the order the rows were inserted in for records without one.
+Documents rebuilt before this revision may already have the wrong order; the
+next ingest of those records rewrites them once, in source order.
+
+Revision ID: 779cbfcf053a
+Revises: 6dcbcb6c34d2
+Create Date: 2026-10-17 19:36:54.083445
+
+"""
+import json
+import unicodedata
+from typing import Dict, List, Sequence, Tuple, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '779cbfcf053a'
+down_revision: Union[str, Sequence[str], None] = '6dcbcb6c34d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _normalize_name(name: str) -> str:
+    # `src.normalizer.normalize_name` as of this revision
+    return " ".join(unicodedata.normalize("NFKC", name).casefold().split())
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('record_creator_association', sa.Column('position', sa.Integer(), nullable=False, server_default='0'))
+
+    bind = op.get_bind()
+    # Normalized creator name -> position, per record with a stored document
+    document_positions: Dict[int, Dict[str, int]] = {}
+    for record_id, creators in bind.execute(
+        sa.text(
+            "SELECT record_id, json_extract(document, '$.metadata.dc.creator') "
+            "FROM record_documents"
+        )
+    ):
+        positions = document_positions[record_id] = {}
+        for name in json.loads(creators) if creators else []:
+            positions.setdefault(_normalize_name(name), len(positions))
+
+    links: Dict[int, List[Tuple[int, str]]] = {}
+    for rowid, record_id, normalized_name in bind.execute(
+        sa.text(
+            "SELECT a.rowid, a.record_id, c.normalized_name "
+            "FROM record_creator_association AS a "
+            "JOIN creators AS c ON c.id = a.creator_id ORDER BY a.rowid"
+        )
+    ):
+        links.setdefault(record_id, []).append((rowid, normalized_name))
+
+    updates = []
+    for record_id, record_links in links.items():
+        positions = document_positions.get(record_id, {})
+        # A stable sort: creators missing from the document keep their
+        # insertion order, after the others
+        ordered = sorted(
+            record_links, key=lambda link: positions.get(link[1], len(positions))
+        )
+        updates.extend(
+            {"position": position, "rowid": rowid}
+            for position, (rowid, _) in enumerate(ordered)
+        )
+    if updates:
+        bind.execute(
+            sa.text(
+                "UPDATE record_creator_association SET position = :position "
+                "WHERE rowid = :rowid"
+            ),
+            updates,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('record_creator_association') as batch_op:
+        batch_op.drop_column('position')
@@ -0,0 +1,59 @@
+"""Add records full-text search index
+
+Revision ID: 79b03b34b278
+Revises: dc916375ece1
+Create Date: 2026-10-17 17:34:35.104290
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '79b03b34b278'
+down_revision: Union[str, Sequence[str], None] = 'dc916375ece1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS records_fts USING fts5("
+        "record_id UNINDEXED, "
+        "title, "
+        "title_transcription, "
+        "alternative, "
+        "series_title, "
+        "creators, "
+        "tokenize = 'trigram'"
+        ")"
+    )
+    # Backfill the index from the records already in the database
+    op.execute(
+        """
+        INSERT INTO records_fts (
+            record_id, title, title_transcription, alternative, series_title, creators
+        )
+        SELECT
+            r.id,
+            r.title,
+            r.title_transcription,
+            r.alternative,
+            r.series_title,
+            (
+                SELECT group_concat(c.name, char(10))
+                FROM record_creator_association AS a
+                JOIN creators AS c ON c.id = a.creator_id
+                WHERE a.record_id = r.id
+            )
+        FROM records AS r
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TABLE IF EXISTS records_fts")
@@ -0,0 +1,37 @@
+"""Add record documents read model
+
+Search serves records from the new table and falls back to the normalized
+tables for records without a document. Backfill existing records with
+`python manage.py rebuild-record-documents`.
+
+Revision ID: 7dd2b5594a08
+Revises: 71b3a7bf9667
+Create Date: 2026-10-17 17:49:51.156450
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7dd2b5594a08'
+down_revision: Union[str, Sequence[str], None] = '71b3a7bf9667'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('record_documents',
+    sa.Column('record_id', sa.UUID(), nullable=False),
+    sa.Column('document', sa.Text(), nullable=False),
+    sa.ForeignKeyConstraint(['record_id'], ['records.id'], ),
+    sa.PrimaryKeyConstraint('record_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('record_documents')
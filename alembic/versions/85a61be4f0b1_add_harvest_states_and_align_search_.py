@@ -0,0 +1,51 @@
+"""Add harvest states and align search index rowids
+
+Rows of records_fts are renumbered to the rowid of their record, so that the
+row of a replaced or deleted record is found without a scan. Rows of records
+that no longer exist are dropped.
+
+Revision ID: 85a61be4f0b1
+Revises: 036d2e9f1228
+Create Date: 2026-10-17 18:14:06.704651
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '85a61be4f0b1'
+down_revision: Union[str, Sequence[str], None] = '036d2e9f1228'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('harvest_states',
+    sa.Column('endpoint', sa.String(), nullable=False),
+    sa.Column('set_spec', sa.String(), nullable=False),
+    sa.Column('last_datestamp', sa.DateTime(), nullable=False),
+    sa.Column('harvested_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('endpoint', 'set_spec')
+    )
+
+    op.execute("CREATE TEMP TABLE fts_rows AS SELECT * FROM records_fts")
+    op.execute("DELETE FROM records_fts")
+    op.execute(
+        "INSERT INTO records_fts (rowid, record_id, title, title_transcription, "
+        "alternative, series_title, creators) "
+        "SELECT records.rowid, fts_rows.record_id, fts_rows.title, "
+        "fts_rows.title_transcription, fts_rows.alternative, fts_rows.series_title, "
+        "fts_rows.creators "
+        "FROM fts_rows JOIN records ON records.id = fts_rows.record_id"
+    )
+    op.execute("DROP TABLE fts_rows")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The renumbered search index works with the previous code as it is
+    op.drop_table('harvest_states')
@@ -0,0 +1,79 @@
+"""Add creator names to record creator association
+
+Creators are deduplicated on their normalized name and keep the first spelling
+seen, so records that spell a creator differently lost their own spelling. The
+association now stores the name as spelled in the record. Existing rows take it
+from the creators of the record's stored document, or from the creator for
+records without one. Documents rebuilt from the tables before this revision
+already hold the creator's spelling; the next ingest of those records restores
+their own.
+
+Revision ID: cd7f9b3027aa
+Revises: 779cbfcf053a
+Create Date: 2026-10-17 19:51:12.408317
+
+"""
+import json
+import unicodedata
+from typing import Dict, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'cd7f9b3027aa'
+down_revision: Union[str, Sequence[str], None] = '779cbfcf053a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _normalize_name(name: str) -> str:
+    # `src.normalizer.normalize_name` as of this revision
+    return " ".join(unicodedata.normalize("NFKC", name).casefold().split())
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('record_creator_association', sa.Column('name', sa.String(), nullable=False, server_default=''))
+
+    bind = op.get_bind()
+    # Normalized creator name -> first spelling, per record with a stored document
+    document_names: Dict[int, Dict[str, str]] = {}
+    for record_id, creators in bind.execute(
+        sa.text(
+            "SELECT record_id, json_extract(document, '$.metadata.dc.creator') "
+            "FROM record_documents"
+        )
+    ):
+        names = document_names[record_id] = {}
+        for name in json.loads(creators) if creators else []:
+            names.setdefault(_normalize_name(name), name)
+
+    updates = [
+        {
+            "name": document_names.get(record_id, {}).get(normalized_name, name),
+            "rowid": rowid,
+        }
+        for rowid, record_id, normalized_name, name in bind.execute(
+            sa.text(
+                "SELECT a.rowid, a.record_id, c.normalized_name, c.name "
+                "FROM record_creator_association AS a "
+                "JOIN creators AS c ON c.id = a.creator_id"
+            )
+        )
+    ]
+    if updates:
+        bind.execute(
+            sa.text(
+                "UPDATE record_creator_association SET name = :name "
+                "WHERE rowid = :rowid"
+            ),
+            updates,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('record_creator_association') as batch_op:
+        batch_op.drop_column('name')
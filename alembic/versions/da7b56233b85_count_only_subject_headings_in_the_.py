@@ -0,0 +1,59 @@
+"""Count only subject headings in the subject facet
+
+The subject facet counted classification numbers such as NDC "913.6" next to
+headings such as NDLSH "日本文学". It now counts headings only, so the stored
+counts of the subject facet are recounted without classification numbers.
+
+Revision ID: da7b56233b85
+Revises: cd7f9b3027aa
+Create Date: 2026-10-17 19:57:52.735872
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'da7b56233b85'
+down_revision: Union[str, Sequence[str], None] = 'cd7f9b3027aa'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# `src.db._facets.CLASSIFICATION_SUBJECT_TYPES` as of this revision
+_CLASSIFICATION_SUBJECT_TYPES = (
+    "dcndl:NDC",
+    "dcndl:NDC8",
+    "dcndl:NDC9",
+    "dcndl:NDC10",
+    "dcndl:NDLC",
+    "dcterms:DDC",
+    "dcterms:LCC",
+    "dcterms:UDC",
+)
+
+
+def _recount_subjects(headings_only: bool) -> None:
+    op.execute("DELETE FROM facet_counts WHERE facet = 'subject'")
+    stmt = sa.text(
+        "INSERT INTO facet_counts (facet, value, count) "
+        "SELECT 'subject', value, count(DISTINCT record_id) FROM subjects "
+        + ("WHERE type IS NULL OR type NOT IN :types " if headings_only else "")
+        + "GROUP BY value"
+    )
+    if headings_only:
+        stmt = stmt.bindparams(
+            sa.bindparam("types", _CLASSIFICATION_SUBJECT_TYPES, expanding=True)
+        )
+    op.get_bind().execute(stmt)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _recount_subjects(headings_only=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _recount_subjects(headings_only=False)
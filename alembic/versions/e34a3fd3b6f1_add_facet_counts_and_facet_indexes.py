@@ -0,0 +1,60 @@
+"""Add facet counts and facet indexes
+
+The counts of existing records are backfilled here; later ingests keep them
+up to date, and `python manage.py rebuild-facet-counts` recounts them.
+
+Revision ID: e34a3fd3b6f1
+Revises: 1c521a1ef221
+Create Date: 2026-10-17 18:04:43.996189
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e34a3fd3b6f1'
+down_revision: Union[str, Sequence[str], None] = '1c521a1ef221'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('facet_counts',
+    sa.Column('facet', sa.String(), nullable=False),
+    sa.Column('value', sa.String(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('facet', 'value')
+    )
+    op.create_index(op.f('ix_records_access_rights'), 'records', ['access_rights'], unique=False)
+    op.create_index(op.f('ix_records_language'), 'records', ['language'], unique=False)
+    op.create_index(op.f('ix_records_material_type'), 'records', ['material_type'], unique=False)
+    op.create_index(op.f('ix_records_publisher'), 'records', ['publisher'], unique=False)
+    op.create_index('ix_subjects_record_id', 'subjects', ['record_id'], unique=False)
+    op.create_index('ix_subjects_value', 'subjects', ['value'], unique=False)
+
+    for facet in ('material_type', 'language', 'access_rights', 'publisher'):
+        op.execute(
+            f"INSERT INTO facet_counts (facet, value, count) "
+            f"SELECT '{facet}', {facet}, count(*) FROM records "
+            f"WHERE {facet} IS NOT NULL GROUP BY {facet}"
+        )
+    op.execute(
+        "INSERT INTO facet_counts (facet, value, count) "
+        "SELECT 'subject', value, count(DISTINCT record_id) FROM subjects "
+        "GROUP BY value"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_subjects_value', table_name='subjects')
+    op.drop_index('ix_subjects_record_id', table_name='subjects')
+    op.drop_index(op.f('ix_records_publisher'), table_name='records')
+    op.drop_index(op.f('ix_records_material_type'), table_name='records')
+    op.drop_index(op.f('ix_records_language'), table_name='records')
+    op.drop_index(op.f('ix_records_access_rights'), table_name='records')
+    op.drop_table('facet_counts')
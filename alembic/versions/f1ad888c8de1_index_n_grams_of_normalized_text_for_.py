@@ -0,0 +1,112 @@
+"""Index n-grams of normalized text for search
+
+Revision ID: f1ad888c8de1
+Revises: 79b03b34b278
+Create Date: 2026-10-17 17:36:22.287506
+
+"""
+import re
+import unicodedata
+from typing import Any, Dict, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from config import Config
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1ad888c8de1'
+down_revision: Union[str, Sequence[str], None] = '79b03b34b278'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_CREATE_TABLE_SQL = (
+    "CREATE VIRTUAL TABLE records_fts USING fts5("
+    "record_id UNINDEXED, "
+    "title, "
+    "title_transcription, "
+    "alternative, "
+    "series_title, "
+    "creators, "
+    "tokenize = '{tokenize}'"
+    ")"
+)
+
+# The normalization of `src.normalizer` as of this revision, frozen here so that
+# later changes to the app do not change what this migration indexes
+_KATAKANA_TO_HIRAGANA = {cp: cp - 0x60 for cp in range(0x30A1, 0x30F7)} | {
+    0x30FD: 0x309D,
+    0x30FE: 0x309E,
+}
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+
+def _to_index_text(text: str | None, n: int) -> str | None:
+    if text is None:
+        return None
+    normalized = unicodedata.normalize("NFKC", text).casefold()
+    compacted = _NON_WORD_RE.sub("", normalized.translate(_KATAKANA_TO_HIRAGANA))
+    return " ".join(compacted[i : i + n] for i in range(len(compacted)))
+
+
+def _build_fts_row(row: Any, n: int) -> Dict[str, Any]:
+    creator_tokens = [_to_index_text(name, n) for name in (row[5] or "").split("\n")]
+    return {
+        "record_id": row[0],
+        "title": _to_index_text(row[1], n),
+        "title_transcription": _to_index_text(row[2], n),
+        "alternative": _to_index_text(row[3], n),
+        "series_title": _to_index_text(row[4], n),
+        "creators": " ".join(token for token in creator_tokens if token),
+    }
+
+
+_SELECT_RECORDS_SQL = """
+    SELECT
+        r.id,
+        r.title,
+        r.title_transcription,
+        r.alternative,
+        r.series_title,
+        (
+            SELECT group_concat(c.name, char(10))
+            FROM record_creator_association AS a
+            JOIN creators AS c ON c.id = a.creator_id
+            WHERE a.record_id = r.id
+        )
+    FROM records AS r
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("DROP TABLE IF EXISTS records_fts")
+    op.execute(_CREATE_TABLE_SQL.format(tokenize="unicode61 remove_diacritics 0"))
+
+    # Re-index existing records as normalized n-grams, of the length the app
+    # searches with
+    ngram_size = Config().SEARCH_NGRAM_SIZE
+    bind = op.get_bind()
+    insert_stmt = sa.text(
+        "INSERT INTO records_fts (record_id, title, title_transcription, "
+        "alternative, series_title, creators) VALUES (:record_id, :title, "
+        ":title_transcription, :alternative, :series_title, :creators)"
+    )
+    result = bind.execute(sa.text(_SELECT_RECORDS_SQL))
+    while partition := result.fetchmany(1000):
+        bind.execute(
+            insert_stmt, [_build_fts_row(row, ngram_size) for row in partition]
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TABLE IF EXISTS records_fts")
+    op.execute(_CREATE_TABLE_SQL.format(tokenize="trigram"))
+    op.execute(
+        "INSERT INTO records_fts (record_id, title, title_transcription, "
+        "alternative, series_title, creators) "
+        + _SELECT_RECORDS_SQL
+    )
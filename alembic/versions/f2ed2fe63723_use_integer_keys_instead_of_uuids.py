@@ -0,0 +1,251 @@
+"""Use integer keys instead of UUIDs
+
+Every table keyed by a UUID is copied into a table keyed by an integer rowid.
+Records and creators keep their current rowid as id, so search cursors and the
+rowids of records_fts stay valid; the UUID of a record is kept as its
+external_id. records_fts loses its record_id column, as its rowid is the id of
+the record.
+
+Downgrading gives records their external_id back, and every other row a new
+random UUID.
+
+Revision ID: f2ed2fe63723
+Revises: 0904b4f57c74
+Create Date: 2026-10-17 18:23:24.870636
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2ed2fe63723'
+down_revision: Union[str, Sequence[str], None] = '0904b4f57c74'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Columns of records other than the keys
+_RECORD_COLUMNS = (
+    "oai_identifier, datestamp, content_hash, title, publisher, alternative, "
+    "series_title, date, language, extent, material_type, access_rights, "
+    "title_transcription, volume, pub_year, pub_month, pub_day"
+)
+
+# Tables with their own id and a record_id, and their other columns
+_CHILD_TABLES = {
+    'identifiers': "normalized_value, value, type",
+    'publication_places': "value, type",
+    'issued': "value, type",
+    'subjects': "value, type",
+    'see_alsos': "resource",
+    'same_as_links': "resource",
+    'thumbnails': "resource",
+}
+
+_FTS_COLUMNS = "title, title_transcription, alternative, series_title, creators"
+
+_CREATE_FTS_SQL = (
+    "CREATE VIRTUAL TABLE records_fts USING fts5("
+    "{record_id}"
+    "title, "
+    "title_transcription, "
+    "alternative, "
+    "series_title, "
+    "creators, "
+    "tokenize = 'unicode61 remove_diacritics 0'"
+    ")"
+)
+
+# SQL of a new random UUID, as stored by sa.UUID() on SQLite
+_RANDOM_UUID_SQL = "lower(hex(randomblob(16)))"
+
+
+def _create_tables(key: sa.types.TypeEngine, external_id: bool) -> None:
+    """Creates every keyed table with `key` as the type of its keys, named with
+    a "_new" suffix."""
+    record_columns = [
+        sa.Column('id', key, nullable=False),
+        *([sa.Column('external_id', sa.UUID(), nullable=True)] if external_id else []),
+        sa.Column('oai_identifier', sa.String(), nullable=False),
+        sa.Column('datestamp', sa.DateTime(), nullable=False),
+        sa.Column('content_hash', sa.String(), nullable=True),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('publisher', sa.String(), nullable=True),
+        sa.Column('alternative', sa.String(), nullable=True),
+        sa.Column('series_title', sa.String(), nullable=True),
+        sa.Column('date', sa.String(), nullable=True),
+        sa.Column('language', sa.String(), nullable=True),
+        sa.Column('extent', sa.String(), nullable=True),
+        sa.Column('material_type', sa.String(), nullable=True),
+        sa.Column('access_rights', sa.String(), nullable=True),
+        sa.Column('title_transcription', sa.String(), nullable=True),
+        sa.Column('volume', sa.String(), nullable=True),
+        sa.Column('pub_year', sa.Integer(), nullable=True),
+        sa.Column('pub_month', sa.Integer(), nullable=True),
+        sa.Column('pub_day', sa.Integer(), nullable=True),
+    ]
+    op.create_table('records_new',
+    *record_columns,
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('creators_new',
+    sa.Column('id', key, nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('normalized_name', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('record_creator_association_new',
+    sa.Column('record_id', key, nullable=False),
+    sa.Column('creator_id', key, nullable=False),
+    sa.ForeignKeyConstraint(['creator_id'], ['creators.id'], ),
+    sa.ForeignKeyConstraint(['record_id'], ['records.id'], ),
+    sa.PrimaryKeyConstraint('record_id', 'creator_id')
+    )
+    op.create_table('record_documents_new',
+    sa.Column('record_id', key, nullable=False),
+    sa.Column('document', sa.Text(), nullable=False),
+    sa.ForeignKeyConstraint(['record_id'], ['records.id'], ),
+    sa.PrimaryKeyConstraint('record_id')
+    )
+    for table, columns in _CHILD_TABLES.items():
+        value_columns = [
+            sa.Column(name.strip(), sa.String(), nullable=name.strip() == 'type')
+            for name in columns.split(",")
+        ]
+        constraints = []
+        if table == 'identifiers':
+            constraints.append(
+                sa.UniqueConstraint('value', 'type', 'record_id', name='_identifier_uc')
+            )
+        op.create_table(f'{table}_new',
+        sa.Column('id', key, nullable=False),
+        *value_columns,
+        sa.Column('record_id', key, nullable=False),
+        sa.ForeignKeyConstraint(['record_id'], ['records.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        *constraints
+        )
+
+
+def _copy_rows(child_id_sql: str) -> None:
+    """Copies the rows of every table but records into its "_new" table, mapping
+    keys through the temporary record_keys and creator_keys (old -> new).
+    CROSS JOIN makes SQLite scan the copied table and look its keys up, rather
+    than scan it once per key."""
+    op.execute(
+        "INSERT INTO creators_new (id, name, normalized_name) "
+        "SELECT k.new, c.name, c.normalized_name "
+        "FROM creators AS c CROSS JOIN creator_keys AS k ON k.old = c.id"
+    )
+    op.execute(
+        "INSERT INTO record_creator_association_new (record_id, creator_id) "
+        "SELECT rk.new, ck.new FROM record_creator_association AS a "
+        "CROSS JOIN record_keys AS rk ON rk.old = a.record_id "
+        "CROSS JOIN creator_keys AS ck ON ck.old = a.creator_id"
+    )
+    op.execute(
+        "INSERT INTO record_documents_new (record_id, document) "
+        "SELECT k.new, d.document FROM record_documents AS d "
+        "CROSS JOIN record_keys AS k ON k.old = d.record_id"
+    )
+    for table, columns in _CHILD_TABLES.items():
+        op.execute(
+            f"INSERT INTO {table}_new (id, {columns}, record_id) "
+            f"SELECT {child_id_sql.format(table='t')}, {columns}, k.new "
+            f"FROM {table} AS t CROSS JOIN record_keys AS k ON k.old = t.record_id "
+            f"ORDER BY t.rowid"
+        )
+
+
+def _replace_tables() -> None:
+    """Replaces every keyed table with its "_new" table, and creates the
+    indexes again."""
+    for table in (
+        *_CHILD_TABLES,
+        'record_documents',
+        'record_creator_association',
+        'creators',
+        'records',
+    ):
+        op.drop_table(table)
+        op.rename_table(f'{table}_new', table)
+    op.execute("DROP TABLE record_keys")
+    op.execute("DROP TABLE creator_keys")
+
+    op.create_index(op.f('ix_creators_name'), 'creators', ['name'], unique=False)
+    op.create_index(op.f('ix_creators_normalized_name'), 'creators', ['normalized_name'], unique=True)
+    op.create_index(op.f('ix_identifiers_normalized_value'), 'identifiers', ['normalized_value'], unique=False)
+    op.create_index('ix_subjects_record_id', 'subjects', ['record_id'], unique=False)
+    op.create_index('ix_subjects_value', 'subjects', ['value'], unique=False)
+    op.create_index(op.f('ix_records_access_rights'), 'records', ['access_rights'], unique=False)
+    op.create_index(op.f('ix_records_language'), 'records', ['language'], unique=False)
+    op.create_index(op.f('ix_records_material_type'), 'records', ['material_type'], unique=False)
+    op.create_index(op.f('ix_records_publisher'), 'records', ['publisher'], unique=False)
+    op.create_index(op.f('ix_records_oai_identifier'), 'records', ['oai_identifier'], unique=True)
+    op.create_index('ix_records_publication_date', 'records', ['pub_year', 'pub_month', 'pub_day'], unique=False)
+
+
+def _replace_search_index(record_id_sql: str | None) -> None:
+    """Creates records_fts again with the same rows, with a record_id column
+    holding `record_id_sql` (over the old rowid `r`) if given."""
+    op.execute(f"CREATE TEMP TABLE fts_rows AS SELECT rowid AS r, {_FTS_COLUMNS} FROM records_fts")
+    op.execute("DROP TABLE records_fts")
+    if record_id_sql is None:
+        op.execute(_CREATE_FTS_SQL.format(record_id=""))
+        op.execute(
+            f"INSERT INTO records_fts (rowid, {_FTS_COLUMNS}) "
+            f"SELECT r, {_FTS_COLUMNS} FROM fts_rows"
+        )
+    else:
+        op.execute(_CREATE_FTS_SQL.format(record_id="record_id UNINDEXED, "))
+        op.execute(
+            f"INSERT INTO records_fts (rowid, record_id, {_FTS_COLUMNS}) "
+            f"SELECT r, {record_id_sql}, {_FTS_COLUMNS} FROM fts_rows"
+        )
+    op.execute("DROP TABLE fts_rows")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE TEMP TABLE record_keys (old UUID PRIMARY KEY, new INTEGER)")
+    op.execute("INSERT INTO record_keys SELECT id, rowid FROM records")
+    op.execute("CREATE TEMP TABLE creator_keys (old UUID PRIMARY KEY, new INTEGER)")
+    op.execute("INSERT INTO creator_keys SELECT id, rowid FROM creators")
+
+    _create_tables(sa.Integer(), external_id=True)
+    op.execute(
+        f"INSERT INTO records_new (id, external_id, {_RECORD_COLUMNS}) "
+        f"SELECT rowid, id, {_RECORD_COLUMNS} FROM records ORDER BY rowid"
+    )
+    # Child rows keep their order, which is the order of their values
+    _copy_rows("{table}.rowid")
+    _replace_tables()
+    op.create_index(op.f('ix_records_external_id'), 'records', ['external_id'], unique=True)
+
+    _replace_search_index(None)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("CREATE TEMP TABLE record_keys (old INTEGER PRIMARY KEY, new UUID)")
+    op.execute(
+        f"INSERT INTO record_keys "
+        f"SELECT id, coalesce(external_id, {_RANDOM_UUID_SQL}) FROM records"
+    )
+    op.execute("CREATE TEMP TABLE creator_keys (old INTEGER PRIMARY KEY, new UUID)")
+    op.execute(f"INSERT INTO creator_keys SELECT id, {_RANDOM_UUID_SQL} FROM creators")
+
+    _replace_search_index("(SELECT new FROM record_keys WHERE old = r)")
+
+    _create_tables(sa.UUID(), external_id=False)
+    # Ids become rowids again, which records_fts rows are aligned with
+    op.execute(
+        f"INSERT INTO records_new (rowid, id, {_RECORD_COLUMNS}) "
+        f"SELECT r.id, k.new, {_RECORD_COLUMNS} FROM records AS r "
+        f"CROSS JOIN record_keys AS k ON k.old = r.id"
+    )
+    _copy_rows(_RANDOM_UUID_SQL)
+    _replace_tables()
@@ -0,0 +1,79 @@
+"""
+Compares the records/second of the SAX and pyexpat parser engines.
+
+    python -m benchmarks.bench_parser --records 100000
+    python -m benchmarks.bench_parser --file init_data/large.xml
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, get_args
+
+from benchmarks.corpus import generate
+from src.xml_loader._parser import ParserEngine, _iter_dcndl_xml, _parse_dcndl_xml
+
+
+def _records_per_second(path: Path, engine: ParserEngine, repeat: int) -> float:
+    """
+    Returns the best records/second of `repeat` full parses of the file.
+    """
+    best = 0.0
+    for _ in range(repeat):
+        count = 0
+
+        def count_record(_: Dict[str, Any]) -> None:
+            nonlocal count
+            count += 1
+
+        start = time.perf_counter()
+        _parse_dcndl_xml(str(path), count_record, engine=engine)
+        best = max(best, count / (time.perf_counter() - start))
+    return best
+
+
+def _check_identical(path: Path) -> int:
+    """
+    Checks that every engine produces the same record dicts.
+    Returns the number of compared records.
+    """
+    engines = get_args(ParserEngine)
+    streams = [_iter_dcndl_xml(str(path), engine=engine) for engine in engines]
+    compared = 0
+    for records in itertools.zip_longest(*streams):
+        if any(record != records[0] for record in records):
+            raise AssertionError(f"Engines disagree on record #{compared}")
+        compared += 1
+    return compared
+
+
+def run(path: Path, repeat: int) -> None:
+    print(f"File: {path} ({path.stat().st_size / 1e6:.1f} MB)")
+    print(f"Identical output for {_check_identical(path)} records.")
+    results = {
+        engine: _records_per_second(path, engine, repeat)
+        for engine in get_args(ParserEngine)
+    }
+    for engine, rate in results.items():
+        print(f"  {engine:>6}: {rate:12,.0f} records/s")
+    print(f"  speedup: {results['expat'] / results['sax']:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--file", type=Path, help="Existing DC-NDL XML file.")
+    parser.add_argument(
+        "--records", type=int, default=100000, help="Synthetic records if no --file."
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.file:
+        run(args.file, args.repeat)
+    else:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            run(generate(Path(tmp_dir) / "corpus.xml", args.records), args.repeat)
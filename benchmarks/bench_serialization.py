@@ -0,0 +1,152 @@
+"""
+Compares the per-record cost of turning stored records into a search response.
+
+    python -m benchmarks.bench_serialization --records 5000 --page-size 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from benchmarks.corpus import generate
+from src import model
+from src.api.search import PaginatedRecordResponse, _render_paginated_response
+from src.db import _model as sa_model
+from src.db._convert import _convert_sa_to_pydantic
+from src.xml_loader.loader import iter_xml
+
+_ENVELOPE: Dict[str, Any] = dict(
+    total_items=1000,
+    total_pages=50,
+    total_items_exact=True,
+    has_more=True,
+    current_page=1,
+    per_page=20,
+    next_cursor=None,
+)
+
+
+def _to_sa_record(record: model.Record) -> sa_model.Record:
+    """
+    Builds a detached SQLAlchemy record as it would be loaded from the database.
+    """
+    dc = record.metadata.dc
+    return sa_model.Record(  # type: ignore[call-arg]
+        datestamp=record.header.datestamp.replace(tzinfo=None),
+        title=dc.title,
+        publisher=dc.publisher,
+        alternative=dc.alternative,
+        series_title=dc.series_title,
+        date=dc.date,
+        language=dc.language,
+        extent=dc.extent,
+        material_type=dc.material_type,
+        access_rights=dc.access_rights,
+        title_transcription=dc.title_transcription,
+        volume=dc.volume,
+        creators=[sa_model.Creator(name=name) for name in dc.creator],  # type: ignore[call-arg]
+        identifiers=[sa_model.Identifier(**v.model_dump()) for v in dc.identifier],
+        publication_places=[
+            sa_model.PublicationPlace(**v.model_dump()) for v in dc.publication_place
+        ],
+        issued=[
+            sa_model.Issued(value=str(v.value), type=v.type)  # type: ignore[call-arg]
+            for v in dc.issued
+        ],
+        subjects=[sa_model.Subject(**v.model_dump()) for v in dc.subject],
+        see_alsos=[sa_model.SeeAlso(**v.model_dump()) for v in dc.see_also],
+        same_as_links=[sa_model.SameAs(**v.model_dump()) for v in dc.same_as],
+        thumbnails=[sa_model.Thumbnail(**v.model_dump()) for v in dc.thumbnail],
+    )
+
+
+def _validated(db_records: List[sa_model.Record]) -> bytes:
+    """
+    The previous path: validated models, validated again and serialized the way
+    FastAPI handles `response_model`.
+    """
+    response = PaginatedRecordResponse(
+        items=[_convert_sa_to_pydantic(r) for r in db_records], **_ENVELOPE
+    )
+    adapter = TypeAdapter(PaginatedRecordResponse)
+    content = jsonable_encoder(adapter.validate_python(response))
+    return json.dumps(content, ensure_ascii=False).encode()
+
+
+def _constructed(db_records: List[sa_model.Record]) -> bytes:
+    """
+    Records without a stored document: models built without validation.
+    """
+    documents = [
+        _convert_sa_to_pydantic(r, validate=False).model_dump_json() for r in db_records
+    ]
+    return bytes(_render_paginated_response(documents, **_ENVELOPE).body)
+
+
+def _stored(documents: List[str]) -> bytes:
+    """
+    Records with a stored document: the documents are spliced in as they are.
+    """
+    return bytes(_render_paginated_response(documents, **_ENVELOPE).body)
+
+
+def _microseconds_per_record(
+    render: Callable[[], bytes], record_count: int, repeat: int
+) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render()
+        best = min(best, time.perf_counter() - start)
+    return best / record_count * 1e6
+
+
+def run(path: Path, page_size: int, repeat: int) -> None:
+    records = list(iter_xml(path))
+    db_records = [_to_sa_record(record) for record in records]
+    documents = [
+        _convert_sa_to_pydantic(r, validate=False).model_dump_json() for r in db_records
+    ]
+    pages = [
+        slice(start, start + page_size) for start in range(0, len(records), page_size)
+    ]
+
+    # Every path must write the same response
+    expected = json.loads(_validated(db_records[pages[0]]))
+    for render in (_constructed(db_records[pages[0]]), _stored(documents[pages[0]])):
+        if json.loads(render) != expected:
+            raise AssertionError("Serialization paths disagree")
+
+    renderers: Dict[str, Callable[[], bytes]] = {
+        "validated": lambda: b"".join(_validated(db_records[p]) for p in pages),
+        "constructed": lambda: b"".join(_constructed(db_records[p]) for p in pages),
+        "stored": lambda: b"".join(_stored(documents[p]) for p in pages),
+    }
+    print(f"{len(records)} records in pages of {page_size}")
+    results = {
+        name: _microseconds_per_record(render, len(records), repeat)
+        for name, render in renderers.items()
+    }
+    for name, cost in results.items():
+        speedup = results["validated"] / cost
+        print(f"  {name:>11}: {cost:8.1f} us/record ({speedup:5.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = generate(Path(tmp_dir) / "corpus.xml", args.records)
+        run(path, args.page_size, args.repeat)
@@ -0,0 +1,287 @@
+"""
+Measures parsing and ingest in records/second and the latency of a fixed search
+mix on synthetic corpora of several sizes, and saves the results as JSON.
+
+    python -m benchmarks.bench_suite --sizes 10000 100000 1000000 --output before.json
+    python -m benchmarks.bench_suite --sizes 10000 100000 --compare before.json
+
+Every size gets a fresh database, written and read with the pragmas of the app.
+Searches run with empty caches, so their latencies are those of cache misses.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import platform
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from benchmarks.corpus import (
+    _FAMILY_NAMES,
+    _KANJI_WORDS,
+    _LANGUAGES,
+    _SUBJECTS,
+    CorpusGenerator,
+    generate,
+)
+from src.db import _model as sa_model
+from src.db import crud
+from src.db._creator_cache import CreatorCache
+from src.db.session import (
+    READ_PRAGMAS,
+    WRITE_PRAGMAS,
+    _set_pragmas_on_connect,
+    app_config,
+)
+from src.xml_loader._parser import _parse_dcndl_xml
+from src.xml_loader.loader import iter_xml
+
+# Query name -> search arguments drawn from the random source and stored ISBNs
+QueryBuilder = Callable[[random.Random, List[str]], Dict[str, Any]]
+
+QUERY_MIX: Dict[str, QueryBuilder] = {
+    "first_page": lambda rng, isbns: {},
+    "deep_page": lambda rng, isbns: {"skip": rng.randrange(100, 1000) * 20},
+    "keyword": lambda rng, isbns: {"q": rng.choice(_KANJI_WORDS)},
+    "two_keywords": lambda rng, isbns: {"q": " ".join(rng.sample(_KANJI_WORDS, 2))},
+    "title": lambda rng, isbns: {"title": rng.choice(_KANJI_WORDS)},
+    "creator": lambda rng, isbns: {"creator": rng.choice(_FAMILY_NAMES)},
+    "isbn": lambda rng, isbns: {"isbn": rng.choice(isbns)},
+    "subject": lambda rng, isbns: {"subject": rng.choice(_SUBJECTS)[1]},
+    "keyword_facets": lambda rng, isbns: {
+        "q": rng.choice(_KANJI_WORDS),
+        "facets": "material_type,language,subject",
+    },
+    "years_by_date": lambda rng, isbns: {
+        "language": rng.choice(_LANGUAGES),
+        "year_from": (year := rng.randint(1900, 2020)),
+        "year_to": year + 10,
+        "sort": "date_desc",
+    },
+}
+
+
+def percentiles(latencies: List[float]) -> Dict[str, float]:
+    """
+    Returns the p50, p95 and p99 of latencies in seconds, in milliseconds.
+    """
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "p50_ms": round(cuts[49] * 1000, 3),
+        "p95_ms": round(cuts[94] * 1000, 3),
+        "p99_ms": round(cuts[98] * 1000, 3),
+    }
+
+
+def _parse_rate(path: Path) -> float:
+    count = 0
+
+    def count_record(_: Dict[str, Any]) -> None:
+        nonlocal count
+        count += 1
+
+    start = time.perf_counter()
+    _parse_dcndl_xml(str(path), count_record)
+    return count / (time.perf_counter() - start)
+
+
+def _load_rate(path: Path) -> float:
+    start = time.perf_counter()
+    count = sum(1 for _ in iter_xml(path))
+    return count / (time.perf_counter() - start)
+
+
+async def _ingest_rate(path: Path, db_session: AsyncSession) -> float:
+    """
+    Writes the corpus the way populate.py does, in committed batches.
+    """
+    creator_cache = CreatorCache(max_size=app_config.INGEST_CREATOR_CACHE_SIZE)
+    count = 0
+    start = time.perf_counter()
+    for batch in itertools.batched(iter_xml(path), app_config.INGEST_BATCH_SIZE):
+        await crud.bulk_upsert_records(db_session, batch, creator_cache)
+        await db_session.commit()
+        creator_cache.mark_committed()
+        count += len(batch)
+    return count / (time.perf_counter() - start)
+
+
+async def _create_record_rate(
+    db_session: AsyncSession, work_dir: Path, size: int, count: int
+) -> float:
+    """
+    Creates `count` new records one at a time, each in its own transaction.
+    """
+    path = work_dir / "new_records.xml"
+    with open(path, "w", encoding="utf-8") as out:
+        CorpusGenerator(seed=1).write(out, count, first_index=size)
+    records = list(iter_xml(path))
+    start = time.perf_counter()
+    for record in records:
+        await crud.create_record(db_session, record)
+        await db_session.commit()
+    return count / (time.perf_counter() - start)
+
+
+async def _search_latencies(
+    db_session: AsyncSession, queries_per_kind: int, seed: int
+) -> Dict[str, Dict[str, float]]:
+    rng = random.Random(seed)
+    isbns = list(
+        (
+            await db_session.scalars(
+                select(sa_model.Identifier.value)
+                .where(sa_model.Identifier.type == "dcndl:ISBN")
+                .limit(1000)
+            )
+        ).all()
+    ) or ["9784000000000"]
+    queries = [
+        (kind, build(rng, isbns))
+        for kind, build in QUERY_MIX.items()
+        for _ in range(queries_per_kind)
+    ]
+    rng.shuffle(queries)
+
+    latencies: Dict[str, List[float]] = {kind: [] for kind in QUERY_MIX}
+    for kind, kwargs in queries:
+        crud.clear_search_caches()
+        start = time.perf_counter()
+        await crud.search_records(db_session, **kwargs)
+        latencies[kind].append(time.perf_counter() - start)
+
+    results = {kind: percentiles(values) for kind, values in latencies.items()}
+    results["all"] = percentiles(list(itertools.chain(*latencies.values())))
+    return results
+
+
+async def run_size(
+    size: int, work_dir: Path, queries_per_kind: int, create_count: int, seed: int
+) -> Dict[str, Any]:
+    corpus = generate(work_dir / f"corpus_{size}.xml", size, seed)
+    database = work_dir / f"bench_{size}.sqlite3"
+    result: Dict[str, Any] = {"corpus_mb": round(corpus.stat().st_size / 1e6, 1)}
+    print(f"{size} records ({result['corpus_mb']} MB of XML)")
+
+    result["parse_records_per_second"] = round(_parse_rate(corpus))
+    result["load_records_per_second"] = round(_load_rate(corpus))
+
+    write_engine = create_async_engine(f"sqlite+aiosqlite:///{database}", pool_size=1)
+    _set_pragmas_on_connect(write_engine, WRITE_PRAGMAS)
+    read_engine = create_async_engine(
+        f"sqlite+aiosqlite:///file:{database}?mode=ro&uri=true"
+    )
+    _set_pragmas_on_connect(read_engine, READ_PRAGMAS)
+    try:
+        async with write_engine.begin() as conn:
+            await conn.run_sync(sa_model.Base.metadata.create_all)
+        async with AsyncSession(write_engine, expire_on_commit=False) as db_session:
+            result["ingest_records_per_second"] = round(
+                await _ingest_rate(corpus, db_session)
+            )
+        result["database_mb"] = round(database.stat().st_size / 1e6, 1)
+        async with AsyncSession(read_engine) as db_session:
+            result["search"] = await _search_latencies(
+                db_session, queries_per_kind, seed
+            )
+        async with AsyncSession(write_engine, expire_on_commit=False) as db_session:
+            result["create_record_per_second"] = round(
+                await _create_record_rate(db_session, work_dir, size, create_count)
+            )
+    finally:
+        await write_engine.dispose()
+        await read_engine.dispose()
+        corpus.unlink()
+        for path in work_dir.glob(f"{database.name}*"):
+            path.unlink()
+
+    for name in (
+        "parse_records_per_second",
+        "load_records_per_second",
+        "ingest_records_per_second",
+        "create_record_per_second",
+    ):
+        print(f"  {name:>26}: {result[name]:12,}")
+    for kind, latency in result["search"].items():
+        print(
+            f"  {kind:>26}: p50 {latency['p50_ms']:8.2f} ms  "
+            f"p95 {latency['p95_ms']:8.2f} ms  p99 {latency['p99_ms']:8.2f} ms"
+        )
+    return result
+
+
+def compare(baseline: Dict[str, Any], results: Dict[str, Any]) -> None:
+    """
+    Prints the change of every metric measured in both runs. Rates should go
+    up and latencies down.
+    """
+
+    def metrics(sizes: Dict[str, Any]) -> Dict[str, float]:
+        flat = {}
+        for size, result in sizes.items():
+            for name, value in result.items():
+                if name.endswith("_per_second"):
+                    flat[f"{size} {name}"] = value
+            for kind, latency in result.get("search", {}).items():
+                for name, value in latency.items():
+                    flat[f"{size} search {kind} {name}"] = value
+        return flat
+
+    before = metrics(baseline["sizes"])
+    after = metrics(results["sizes"])
+    print(f"Compared with {baseline['created']}:")
+    for name, value in after.items():
+        if before.get(name):
+            print(f"  {name:>48}: {value / before[name]:6.2f}x")
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    results: Dict[str, Any] = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "seed": args.seed,
+        "queries_per_kind": args.queries,
+        "sizes": {},
+    }
+    with tempfile.TemporaryDirectory(dir=args.work_dir) as tmp_dir:
+        for size in args.sizes:
+            results["sizes"][str(size)] = await run_size(
+                size, Path(tmp_dir), args.queries, args.creates, args.seed
+            )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10000, 100000, 1000000]
+    )
+    parser.add_argument("--queries", type=int, default=50, help="Queries per kind.")
+    parser.add_argument("--creates", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--work-dir", type=Path, help="Directory for the corpora and databases."
+    )
+    parser.add_argument("--output", type=Path, help="JSON file to save results to.")
+    parser.add_argument("--compare", type=Path, help="JSON results of an earlier run.")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Saved results to {args.output}")
+    if args.compare:
+        compare(json.loads(args.compare.read_text()), results)
@@ -0,0 +1,51 @@
+"""
+Runs every check of the benchmarks package, and fails if any of them fails.
+
+    python -m benchmarks.checks --records 1000
+
+- `benchmarks.query_plans`: searches and record writes do not fall back to full
+  table scans.
+- `benchmarks.document_rebuild`: rebuilt record documents equal the ingested
+  ones, so loading the same files again writes nothing.
+
+Each check runs against its own synthetic corpus in a temporary database. The
+exit status is 1 if any check failed, so the command can gate a merge or a CI
+job.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from typing import Awaitable, Callable, Dict
+
+from benchmarks import document_rebuild, query_plans
+
+# Check name -> coroutine that runs it on `record_count` records and returns
+# its number of failures
+CHECKS: Dict[str, Callable[[int], Awaitable[int]]] = {
+    "query_plans": lambda record_count: query_plans.run(None, record_count),
+    "document_rebuild": document_rebuild.run,
+}
+
+
+async def run(record_count: int) -> int:
+    failures = {}
+    for name, check in CHECKS.items():
+        print(f"--- {name} ---")
+        failures[name] = await check(record_count)
+
+    print("--- summary ---")
+    for name, count in failures.items():
+        print(f"{'FAIL' if count else 'ok'} {name}")
+    return sum(failures.values())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=1000)
+    args = parser.parse_args()
+
+    failures = asyncio.run(run(args.records))
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,370 @@
+"""
+Deterministic generator of synthetic DC-NDL (Simple) OAI-PMH corpora.
+
+    python -m benchmarks.corpus --records 100000 --output init_data/synthetic.xml
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import IO, List
+from xml.sax.saxutils import escape, quoteattr
+
+from src.xml_loader._parser import NAMESPACES
+
+_KANJI_WORDS = [
+    "日本",
+    "歴史",
+    "文学",
+    "研究",
+    "図書館",
+    "情報",
+    "社会",
+    "経済",
+    "文化",
+    "教育",
+    "科学",
+    "技術",
+    "入門",
+    "概論",
+    "物語",
+    "思想",
+    "地域",
+    "資料",
+    "記録",
+    "時代",
+    "東京",
+    "京都",
+    "近代",
+    "現代",
+    "古典",
+    "言語",
+    "芸術",
+    "自然",
+    "環境",
+    "医学",
+]
+_KANA_WORDS = [
+    "はじめての",
+    "やさしい",
+    "わかる",
+    "たのしい",
+    "こころ",
+    "ことば",
+    "くらし",
+    "まち",
+]
+_KATAKANA_WORDS = [
+    "データベース",
+    "コンピュータ",
+    "プログラミング",
+    "デザイン",
+    "マネジメント",
+    "ネットワーク",
+    "システム",
+    "ガイド",
+    "ハンドブック",
+    "アーカイブ",
+]
+_LATIN_WORDS = ["Python", "Web", "AI", "SQL", "OPAC", "Linux", "Data", "Design"]
+_SUFFIXES = ["", "", "", "の研究", "入門", "の基礎", "史", "論", "事典", "ハンドブック"]
+
+_FAMILY_NAMES = [
+    "佐藤",
+    "鈴木",
+    "高橋",
+    "田中",
+    "伊藤",
+    "渡辺",
+    "山本",
+    "中村",
+    "小林",
+    "加藤",
+    "吉田",
+    "山田",
+    "佐々木",
+    "山口",
+    "松本",
+    "井上",
+    "木村",
+    "林",
+    "斎藤",
+    "清水",
+]
+_GIVEN_NAMES = [
+    "太郎",
+    "花子",
+    "一郎",
+    "美咲",
+    "健",
+    "直樹",
+    "陽子",
+    "翔",
+    "由美",
+    "誠",
+    "浩",
+    "明美",
+    "大輔",
+    "恵",
+    "拓也",
+    "裕子",
+    "修",
+    "彩",
+    "剛",
+    "真理",
+]
+_LATIN_NAMES = ["Smith, John", "Müller, Anna", "Martin, Paul", "Brown, Emily"]
+
+_SUBJECTS = [
+    ("dcndl:NDLSH", "日本--歴史"),
+    ("dcndl:NDLSH", "日本文学"),
+    ("dcndl:NDLSH", "図書館"),
+    ("dcndl:NDLSH", "情報科学"),
+    ("dcndl:NDLSH", "経済"),
+    ("dcndl:NDLSH", "教育"),
+    ("dcndl:NDC10", "210.1"),
+    ("dcndl:NDC10", "913.6"),
+    ("dcndl:NDC10", "010"),
+    ("dcndl:NDC10", "007.6"),
+    ("dcndl:NDC10", "331"),
+    ("dcndl:NDC10", "370"),
+]
+_PUBLISHERS = [
+    "岩波書店",
+    "講談社",
+    "新潮社",
+    "有斐閣",
+    "東京大学出版会",
+    "技術評論社",
+    "オライリー・ジャパン",
+    "丸善出版",
+    "筑摩書房",
+    "国立国会図書館",
+]
+_MATERIAL_TYPES = ["図書", "図書", "図書", "雑誌", "博士論文", "地図"]
+_LANGUAGES = ["jpn", "jpn", "jpn", "jpn", "eng", "chi"]
+_ACCESS_RIGHTS = [
+    None,
+    None,
+    "インターネット公開",
+    "図書館送信資料",
+    "国立国会図書館内限定",
+]
+
+_NAMESPACE_DECLARATIONS = " ".join(
+    f'xmlns:{prefix}="{uri}"' for prefix, uri in NAMESPACES.items() if prefix != "oai"
+)
+
+
+def _isbn13(rng: random.Random) -> str:
+    digits = [9, 7, 8, 4] + [rng.randrange(10) for _ in range(8)]
+    check = (10 - sum(d * (3 if i % 2 else 1) for i, d in enumerate(digits)) % 10) % 10
+    body = "".join(map(str, digits + [check]))
+    return f"{body[:3]}-{body[3]}-{body[4:7]}-{body[7:12]}-{body[12]}"
+
+
+def _isbn10(rng: random.Random) -> str:
+    digits = [4] + [rng.randrange(10) for _ in range(8)]
+    check = (11 - sum(d * (10 - i) for i, d in enumerate(digits)) % 11) % 11
+    body = "".join(map(str, digits)) + ("X" if check == 10 else str(check))
+    return (
+        body if rng.random() < 0.5 else f"{body[0]}-{body[1:4]}-{body[4:9]}-{body[9]}"
+    )
+
+
+def _issn(rng: random.Random) -> str:
+    digits = [rng.randrange(10) for _ in range(7)]
+    check = (11 - sum(d * (8 - i) for i, d in enumerate(digits)) % 11) % 11
+    body = "".join(map(str, digits)) + ("X" if check == 10 else str(check))
+    return f"{body[:4]}-{body[4:]}"
+
+
+class CorpusGenerator:
+    """
+    Generates records from a seeded random source, so the same arguments always
+    produce the same corpus.
+
+    Creators are drawn from a fixed pool with Zipf-like weights, so a few
+    prolific authors appear on many records, as in the real catalogue. Some
+    records spell them differently, see `_spelling`.
+    """
+
+    def __init__(
+        self, seed: int = 0, creator_pool_size: int = 5000, creator_skew: float = 1.1
+    ) -> None:
+        self.rng = random.Random(seed)
+        names = [f"{f}, {g}" for f, g in itertools.product(_FAMILY_NAMES, _GIVEN_NAMES)]
+        names += _LATIN_NAMES
+        self.creators = [
+            name if i < len(names) else f"{name}{i // len(names)}"
+            for i, name in zip(range(creator_pool_size), itertools.cycle(names))
+        ]
+        # Cumulative weights, so that each draw does not re-sum the whole pool
+        self.creator_cum_weights = list(
+            itertools.accumulate(
+                1 / (rank**creator_skew) for rank in range(1, len(self.creators) + 1)
+            )
+        )
+        self.start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+    def _title(self) -> str:
+        rng = self.rng
+        pools = [_KANJI_WORDS, _KANJI_WORDS, _KANA_WORDS, _KATAKANA_WORDS, _LATIN_WORDS]
+        words = [rng.choice(rng.choice(pools)) for _ in range(rng.randint(1, 3))]
+        title = "".join(words) + rng.choice(_SUFFIXES)
+        if rng.random() < 0.05:
+            # Some titles arrive with full-width alphanumerics
+            title = title.translate(
+                {c: c + 0xFEE0 for c in range(0x21, 0x7F) if chr(c).isalnum()}
+            )
+        return title
+
+    def _spelling(self, name: str) -> str:
+        """
+        Spells a creator name as some records do: upper-cased, with full-width
+        characters or with doubled spaces. Every spelling normalizes to the same
+        creator, but each record must keep its own.
+        """
+        rng = self.rng
+        if rng.random() >= 0.1:
+            return name
+        variant = rng.randrange(3)
+        if variant == 0:
+            return name.upper()
+        if variant == 1:
+            return name.translate({c: c + 0xFEE0 for c in range(0x21, 0x7F)})
+        return name.replace(" ", "  ")
+
+    def _issued(self, year: int) -> List[str]:
+        rng = self.rng
+        month = rng.randint(1, 12)
+        return [
+            rng.choice(
+                [str(year), f"{year}-{month:02d}", f"{year}.{month}", f"[{year}]"]
+            )
+        ]
+
+    def record(self, index: int, datestamp: datetime | None = None) -> str:
+        """
+        Generates record `index`, last modified at `datestamp` (by default, one
+        minute after the previous record). Generating the same index again
+        gives a changed version of the record with the same identifiers.
+        """
+        rng = self.rng
+        material_type = rng.choice(_MATERIAL_TYPES)
+        year = rng.randint(1900, 2024)
+        title = self._title()
+        parts = [
+            f"<dc:title>{escape(title)}</dc:title>",
+            f"<dcndl:titleTranscription>{escape(title)}</dcndl:titleTranscription>",
+        ]
+        if rng.random() < 0.2:
+            parts.append(
+                f"<dcterms:alternative>{escape(self._title())}</dcterms:alternative>"
+            )
+        if rng.random() < 0.15:
+            parts.append(
+                f"<dcndl:seriesTitle>{escape(self._title())}</dcndl:seriesTitle>"
+            )
+            parts.append(f"<dcndl:volume>{rng.randint(1, 30)}</dcndl:volume>")
+
+        creator_count = rng.choices([0, 1, 2, 3], weights=[5, 60, 25, 10])[0]
+        for name in rng.choices(
+            self.creators, cum_weights=self.creator_cum_weights, k=creator_count
+        ):
+            parts.append(f"<dc:creator>{escape(self._spelling(name))}</dc:creator>")
+
+        identifiers = [("dcndl:JPNO", str(20000000 + index))]
+        if material_type == "雑誌":
+            identifiers.append(("dcndl:ISSN", _issn(rng)))
+        elif rng.random() < 0.7:
+            isbn = _isbn13(rng) if year >= 2007 or rng.random() < 0.3 else _isbn10(rng)
+            identifiers.append(("dcndl:ISBN", isbn))
+        if rng.random() < 0.5:
+            identifiers.append(("dcndl:NDLBibID", str(100000000 + index)))
+        for id_type, value in identifiers:
+            parts.append(f'<dc:identifier xsi:type="{id_type}">{value}</dc:identifier>')
+
+        parts.append(f"<dc:publisher>{escape(rng.choice(_PUBLISHERS))}</dc:publisher>")
+        parts.append(f"<dc:date>{year}</dc:date>")
+        for issued in self._issued(year):
+            parts.append(
+                f'<dcterms:issued xsi:type="dcterms:W3CDTF">{issued}</dcterms:issued>'
+            )
+        parts.append(
+            '<dcndl:publicationPlace xsi:type="dcterms:ISO3166">'
+            "JP</dcndl:publicationPlace>"
+        )
+        for subject_type, subject in rng.sample(_SUBJECTS, rng.randint(0, 3)):
+            parts.append(
+                f'<dc:subject xsi:type="{subject_type}">{escape(subject)}</dc:subject>'
+            )
+        language = rng.choice(_LANGUAGES)
+        parts.append(
+            f'<dc:language xsi:type="dcterms:ISO639-2">{language}</dc:language>'
+        )
+        extent = f"{rng.randint(20, 800)}p ; {rng.choice([15, 19, 21, 26])}cm"
+        parts.append(f"<dcterms:extent>{extent}</dcterms:extent>")
+        parts.append(f"<dcndl:materialType>{material_type}</dcndl:materialType>")
+        if (access_rights := rng.choice(_ACCESS_RIGHTS)) is not None:
+            parts.append(
+                f"<dcterms:accessRights>{access_rights}</dcterms:accessRights>"
+            )
+
+        bib_id = f"R100000002-I{index:09d}"
+        see_also = quoteattr(f"https://ndlsearch.ndl.go.jp/books/{bib_id}")
+        parts.append(f"<rdfs:seeAlso rdf:resource={see_also}/>")
+        if rng.random() < 0.5:
+            same_as = quoteattr(f"http://id.ndl.go.jp/jpno/{20000000 + index}")
+            parts.append(f"<owl:sameAs rdf:resource={same_as}/>")
+        if rng.random() < 0.3:
+            thumbnail = quoteattr(f"https://ndlsearch.ndl.go.jp/thumbnail/{bib_id}.jpg")
+            parts.append(f"<foaf:thumbnail rdf:resource={thumbnail}/>")
+
+        if datestamp is None:
+            datestamp = self.start + timedelta(minutes=index)
+        return (
+            "<record><header>"
+            f"<identifier>https://ndlsearch.ndl.go.jp/api/oaipmh/{bib_id}</identifier>"
+            f"<datestamp>{datestamp.strftime('%Y-%m-%dT%H:%M:%SZ')}</datestamp>"
+            "</header><metadata>"
+            "<dcndl_simple:dc "
+            'xmlns:dcndl_simple="http://ndl.go.jp/dcndl/dcndl_simple/" '
+            f"{_NAMESPACE_DECLARATIONS}>"
+            + "".join(parts)
+            + "</dcndl_simple:dc></metadata></record>\n"
+        )
+
+    def write(self, out: IO[str], record_count: int, first_index: int = 0) -> None:
+        """
+        Writes a complete OAI-PMH ListRecords response with `record_count` records.
+        """
+        out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        out.write(f'<OAI-PMH xmlns="{NAMESPACES["oai"]}"><ListRecords>\n')
+        for index in range(first_index, first_index + record_count):
+            out.write(self.record(index))
+        out.write("</ListRecords></OAI-PMH>\n")
+
+
+def generate(path: Path, record_count: int, seed: int = 0) -> Path:
+    """
+    Writes a corpus file and returns its path.
+    """
+    with open(path, "w", encoding="utf-8") as out:
+        CorpusGenerator(seed=seed).write(out, record_count)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, required=True)
+    args = parser.parse_args()
+
+    generate(args.output, args.records, args.seed)
+    print(f"Wrote {args.records} records to {args.output}")
@@ -0,0 +1,129 @@
+"""
+Checks that rebuilt record documents equal the ingested ones, so that loading the
+same files again after `rebuild-record-documents` updates nothing.
+
+    python -m benchmarks.document_rebuild --records 500
+
+A synthetic corpus is ingested into a temporary database, its documents are
+rebuilt from the normalized tables, and the corpus is ingested again. The check
+fails if a rebuilt document differs by a byte from the one ingest builds for
+the record, if its content hash differs, or if the second ingest reports any
+record as updated. Records of the corpus spell some creators differently (see
+`CorpusGenerator._spelling`); the check also fails if none do, since it would
+then miss rebuilds that take another record's spelling.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from benchmarks.corpus import generate
+from src import model
+from src.db import _model as sa_model
+from src.db import crud
+from src.db._document import build_document, content_hash
+from src.xml_loader.loader import iter_xml
+
+
+async def _stored_documents(db_session: AsyncSession) -> Dict[str, Tuple[str, str]]:
+    """
+    Returns the stored document and content hash of every record by its OAI-PMH
+    identifier.
+    """
+    stmt = select(
+        sa_model.Record.oai_identifier,
+        sa_model.RecordDocument.document,
+        sa_model.Record.content_hash,
+    ).join(sa_model.RecordDocument)
+    return {
+        oai_identifier: (document, hash_value or "")
+        for oai_identifier, document, hash_value in await db_session.execute(stmt)
+    }
+
+
+async def _spelling_variants(db_session: AsyncSession) -> int:
+    """
+    Returns the number of records that spell a creator unlike the creator row.
+    """
+    stmt = (
+        select(func.count(func.distinct(sa_model.RecordCreatorAssociation.record_id)))
+        .join(sa_model.Creator)
+        .where(sa_model.RecordCreatorAssociation.name != sa_model.Creator.name)
+    )
+    return (await db_session.execute(stmt)).scalar_one()
+
+
+async def check(db_session: AsyncSession, records: List[model.Record]) -> int:
+    """
+    Ingests `records`, rebuilds their documents and ingests them again. Prints
+    every difference, and returns the number of differing documents plus the
+    number of records the second ingest wrote.
+    """
+    # The document ingest builds for each record; the last version wins
+    expected = {
+        record.header.identifier: build_document(record).encode() for record in records
+    }
+    await crud.bulk_upsert_records(db_session, records)
+    await db_session.commit()
+    variants = await _spelling_variants(db_session)
+    if not variants:
+        print("FAIL corpus: no record spells a creator differently")
+
+    await crud.rebuild_record_documents(db_session)
+    await db_session.commit()
+    rebuilt = await _stored_documents(db_session)
+
+    differences = 0
+    for oai_identifier, document in expected.items():
+        rebuilt_document, rebuilt_hash = rebuilt.get(oai_identifier, ("", ""))
+        if rebuilt_document.encode() != document or rebuilt_hash != content_hash(
+            document.decode()
+        ):
+            differences += 1
+            print(f"FAIL {oai_identifier}: rebuilt document differs")
+            print(f"  ingested: {document.decode()}")
+            print(f"  rebuilt:  {rebuilt_document}")
+
+    counts = await crud.bulk_upsert_records(db_session, records)
+    await db_session.commit()
+    if counts.inserted or counts.updated:
+        print(f"FAIL second ingest: {counts}")
+
+    print(
+        f"{len(expected)} records, {variants} with creator spelling variants, "
+        f"{differences} rebuilt documents differ, second ingest: {counts}"
+    )
+    return differences + counts.inserted + counts.updated + (0 if variants else 1)
+
+
+async def run(record_count: int) -> int:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        corpus = generate(Path(tmp_dir) / "corpus.xml", record_count)
+        records = list(iter_xml(corpus))
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{Path(tmp_dir) / 'document_rebuild.sqlite3'}"
+        )
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(sa_model.Base.metadata.create_all)
+            async with AsyncSession(engine, expire_on_commit=False) as db_session:
+                return await check(db_session, records)
+        finally:
+            await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=500)
+    args = parser.parse_args()
+
+    failures = asyncio.run(run(args.records))
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,213 @@
+"""
+Local stand-in for an OAI-PMH repository that serves a synthetic corpus, for
+trying out and timing incremental harvests without calling NDL.
+
+    python -m benchmarks.oai_server --records 10000 --port 8081
+    HARVEST_BASE_URL=http://127.0.0.1:8081/oai python manage.py harvest
+
+Restarting the server with more records, or with --updated-every and
+--deleted-every, simulates changes in the repository: new, changed and deleted
+records get datestamps after every existing one, so the next harvest fetches
+only those.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import bisect
+import binascii
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, NamedTuple, Tuple
+from urllib.parse import parse_qs, urlsplit
+from xml.sax.saxutils import escape, quoteattr
+
+from benchmarks.corpus import CorpusGenerator
+from src.xml_loader._parser import NAMESPACES
+
+METADATA_PREFIX = "dcndl_simple"
+
+
+class Entry(NamedTuple):
+    datestamp: datetime
+    set_spec: str
+    xml: str
+
+
+class BadRequest(Exception):
+    def __init__(self, code: str, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+
+
+def _uri(index: int) -> str:
+    return f"https://ndlsearch.ndl.go.jp/api/oaipmh/R100000002-I{index:09d}"
+
+
+def _format(datestamp: datetime) -> str:
+    return datestamp.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _parse(value: str) -> datetime:
+    try:
+        datestamp = datetime.fromisoformat(value)
+    except ValueError:
+        raise BadRequest("badArgument", f"Bad datestamp: {value}") from None
+    if datestamp.tzinfo is None:
+        datestamp = datestamp.replace(tzinfo=timezone.utc)
+    return datestamp
+
+
+def build_entries(
+    record_count: int, set_count: int, updated_every: int, deleted_every: int
+) -> List[Entry]:
+    """
+    Builds the repository contents, ordered by datestamp. Record i belongs to
+    set "set{i % set_count}".
+    """
+    generator = CorpusGenerator()
+    entries: Dict[int, Tuple[datetime, str]] = {
+        index: (generator.start + timedelta(minutes=index), generator.record(index))
+        for index in range(record_count)
+    }
+    changed_at = generator.start + timedelta(minutes=record_count)
+    for index in range(record_count):
+        if updated_every and index % updated_every == updated_every - 1:
+            entries[index] = (changed_at, generator.record(index, changed_at))
+            changed_at += timedelta(minutes=1)
+        if deleted_every and index % deleted_every == deleted_every - 1:
+            deleted = (
+                '<record><header status="deleted">'
+                f"<identifier>{_uri(index)}</identifier>"
+                f"<datestamp>{_format(changed_at)}</datestamp>"
+                "</header></record>\n"
+            )
+            entries[index] = (changed_at, deleted)
+            changed_at += timedelta(minutes=1)
+
+    result = []
+    for index, (datestamp, xml) in entries.items():
+        set_spec = f"set{index % set_count}"
+        xml = xml.replace(
+            "</datestamp>", f"</datestamp><setSpec>{set_spec}</setSpec>", 1
+        )
+        result.append(Entry(datestamp, set_spec, xml))
+    result.sort(key=lambda entry: entry.datestamp)
+    return result
+
+
+def _encode_token(offset: int, args: Dict[str, str]) -> str:
+    payload = "\n".join([str(offset), args["from"], args["until"], args["set"]])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def _decode_token(token: str) -> Tuple[int, Dict[str, str]]:
+    try:
+        offset, from_, until, set_spec = (
+            base64.urlsafe_b64decode(token).decode().split("\n")
+        )
+        return int(offset), {"from": from_, "until": until, "set": set_spec}
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise BadRequest("badResumptionToken", "Bad resumption token") from None
+
+
+def list_records(
+    entries: List[Entry],
+    datestamps: List[datetime],
+    query: Dict[str, str],
+    page_size: int,
+) -> List[str]:
+    """
+    Returns the parts of a ListRecords response body for the query.
+    """
+    if "resumptionToken" in query:
+        offset, args = _decode_token(query["resumptionToken"])
+    else:
+        if query.get("metadataPrefix") != METADATA_PREFIX:
+            raise BadRequest(
+                "cannotDisseminateFormat", f"Only {METADATA_PREFIX} is supported"
+            )
+        offset = 0
+        args = {name: query.get(name, "") for name in ("from", "until", "set")}
+
+    start = 0
+    end = len(entries)
+    if args["from"]:
+        start = bisect.bisect_left(datestamps, _parse(args["from"]))
+    if args["until"]:
+        end = bisect.bisect_right(datestamps, _parse(args["until"]))
+    matching = [
+        entry
+        for entry in entries[start:end]
+        if not args["set"] or entry.set_spec == args["set"]
+    ]
+    if not matching:
+        raise BadRequest("noRecordsMatch", "No records match the request")
+
+    parts = ["<ListRecords>"]
+    parts.extend(entry.xml for entry in matching[offset : offset + page_size])
+    if offset + page_size < len(matching):
+        token = _encode_token(offset + page_size, args)
+    else:
+        token = ""
+    if offset > 0 or token:
+        parts.append(
+            f'<resumptionToken completeListSize="{len(matching)}" '
+            f'cursor="{offset}">{token}</resumptionToken>'
+        )
+    parts.append("</ListRecords>")
+    return parts
+
+
+def make_handler(entries: List[Entry], page_size: int) -> type[BaseHTTPRequestHandler]:
+    datestamps = [entry.datestamp for entry in entries]
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            url = urlsplit(self.path)
+            query = {name: values[0] for name, values in parse_qs(url.query).items()}
+            try:
+                if query.get("verb") != "ListRecords":
+                    raise BadRequest("badVerb", "Only ListRecords is supported")
+                body = list_records(entries, datestamps, query, page_size)
+            except BadRequest as e:
+                body = [f"<error code={quoteattr(e.code)}>{escape(str(e))}</error>"]
+
+            content = "".join(
+                [
+                    '<?xml version="1.0" encoding="UTF-8"?>\n',
+                    f'<OAI-PMH xmlns="{NAMESPACES["oai"]}">',
+                    f"<responseDate>{_format(datetime.now(timezone.utc))}</responseDate>",
+                    f"<request>http://{self.headers['Host']}{url.path}</request>",
+                    *body,
+                    "</OAI-PMH>\n",
+                ]
+            ).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/xml; charset=utf-8")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+    return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=10000)
+    parser.add_argument("--sets", type=int, default=2)
+    parser.add_argument("--updated-every", type=int, default=0)
+    parser.add_argument("--deleted-every", type=int, default=0)
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--port", type=int, default=8081)
+    args = parser.parse_args()
+
+    entries = build_entries(
+        args.records, args.sets, args.updated_every, args.deleted_every
+    )
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", args.port), make_handler(entries, args.page_size)
+    )
+    print(f"Serving {len(entries)} records at http://127.0.0.1:{args.port}/oai")
+    server.serve_forever()
@@ -0,0 +1,211 @@
+"""
+Checks that searches and record writes do not fall back to full table scans.
+
+    python -m benchmarks.query_plans --records 2000
+    python -m benchmarks.query_plans --database database.sqlite3
+
+Every statement executed by `crud.search_records` and `crud.create_record` is
+recorded and run again under EXPLAIN QUERY PLAN. The check fails if a plan
+scans a whole table that its case does not allow. Without --database the
+queries run against a synthetic corpus in a temporary database; with it they
+run against an existing database, and every change is rolled back.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import re
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Awaitable, Callable, FrozenSet, List, NamedTuple, Tuple
+
+from sqlalchemy import delete, event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from benchmarks.corpus import generate
+from src import model
+from src.db import _model as sa_model
+from src.db import _pagination
+from src.db import crud
+from src.xml_loader.loader import iter_xml
+
+# e.g. "SCAN records" or "SCAN records USING COVERING INDEX ix_records_language"
+_SCAN = re.compile(r"SCAN (\w+)")
+
+
+class Case(NamedTuple):
+    name: str
+    run: Callable[[AsyncSession], Awaitable[Any]]
+    # Tables the case may read in full. Without filters the first page is read
+    # in key order up to the limit, and an exact count reads every record once
+    # per data generation.
+    allowed_scans: FrozenSet[str] = frozenset()
+
+
+class Statement(NamedTuple):
+    case: str
+    sql: str
+    parameters: Tuple[Any, ...]
+
+
+def _search(**kwargs: Any) -> Callable[[AsyncSession], Awaitable[Any]]:
+    return lambda db_session: crud.search_records(db_session, **kwargs)
+
+
+def _record(template: model.Record, identifier: str, title: str) -> model.Record:
+    return template.model_copy(
+        update={
+            "header": template.header.model_copy(update={"identifier": identifier}),
+            "metadata": model.Metadata(
+                dc=template.metadata.dc.model_copy(update={"title": title})
+            ),
+        }
+    )
+
+
+async def _search_without_documents(db_session: AsyncSession) -> Any:
+    # Documents are then built from the child tables of each record
+    await db_session.execute(delete(sa_model.RecordDocument))
+    return await crud.search_records(db_session, q="日本", fields="title")
+
+
+def build_cases(template: model.Record) -> List[Case]:
+    """
+    Returns the checked cases. The records written are copies of `template`
+    under an identifier that is not stored yet.
+    """
+    identifier = "https://example.org/query-plans/record"
+    isbn = next(
+        (v.value for v in template.metadata.dc.identifier if "ISBN" in (v.type or "")),
+        "9784000000000",
+    )
+    cursor = _pagination.encode_cursor([100])
+    return [
+        Case("first page", _search(facets="language"), frozenset({"records"})),
+        Case("keyword", _search(q="日本", facets="subject,publisher")),
+        Case("title and creator", _search(title="日本", creator="山田")),
+        Case("isbn", _search(isbn=isbn)),
+        Case("identifier", _search(identifier=isbn)),
+        Case("subject", _search(subject="歴史", facets="subject,language")),
+        Case("facet and years", _search(language="jpn", year_from=1990)),
+        Case("date sort", _search(q="日本", sort="date_desc", count="estimate")),
+        Case("cursor", _search(q="日本", cursor=cursor, count="none")),
+        Case(
+            "create new record",
+            lambda db_session: crud.create_record(
+                db_session, _record(template, identifier, "問い合わせ計画")
+            ),
+        ),
+        Case(
+            "replace record",
+            lambda db_session: crud.create_record(
+                db_session, _record(template, identifier, "問い合わせ計画 改訂版")
+            ),
+        ),
+        Case("records without stored documents", _search_without_documents),
+    ]
+
+
+def full_scans(plan: List[str], allowed: FrozenSet[str]) -> List[str]:
+    """
+    Returns the tables a query plan scans in full, apart from `allowed`.
+    Scans of subqueries and FTS matches are not table scans.
+    """
+    tables = []
+    for detail in plan:
+        match = _SCAN.match(detail)
+        if match is None or "VIRTUAL TABLE" in detail:
+            continue
+        table = match.group(1)
+        if table in sa_model.Base.metadata.tables and table not in allowed:
+            tables.append(table)
+    return tables
+
+
+async def check(db_session: AsyncSession, template: model.Record) -> int:
+    """
+    Runs the cases in a transaction that is rolled back, prints the plan of
+    every statement that scans a table, and returns the number of them.
+    """
+    cases = build_cases(template)
+    statements: List[Statement] = []
+    current_case = ""
+
+    def record_statement(
+        conn: Any,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        if executemany:
+            parameters = parameters[0]
+        statements.append(Statement(current_case, statement, tuple(parameters)))
+
+    connection = await db_session.connection()
+    event.listen(connection.sync_connection, "before_cursor_execute", record_statement)
+    try:
+        for case in cases:
+            current_case = case.name
+            # Cached counts and results would skip their queries
+            await crud.bump_data_generation(db_session)
+            await case.run(db_session)
+    finally:
+        event.remove(
+            connection.sync_connection, "before_cursor_execute", record_statement
+        )
+
+    allowed = {case.name: case.allowed_scans for case in cases}
+    # Repeated statements of a case, e.g. one per batch, have the same plan
+    unique = {(statement.case, statement.sql): statement for statement in statements}
+    failures = 0
+    for statement in unique.values():
+        result = await connection.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {statement.sql}", statement.parameters
+        )
+        plan = [row[-1] for row in result]
+        scanned = full_scans(plan, allowed[statement.case])
+        if scanned:
+            failures += 1
+            print(f"FAIL {statement.case}: scans {', '.join(scanned)}")
+            print(f"  {' '.join(statement.sql.split())}")
+            for detail in plan:
+                print(f"    {detail}")
+    await db_session.rollback()
+
+    print(f"{len(unique)} statements in {len(cases)} cases, {failures} with full scans")
+    return failures
+
+
+async def run(database: Path | None, record_count: int) -> int:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # An existing database only needs a record to copy
+        corpus = generate(
+            Path(tmp_dir) / "corpus.xml", 1 if database else max(record_count, 1)
+        )
+        records = list(iter_xml(corpus))
+        path = database or Path(tmp_dir) / "query_plans.sqlite3"
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        try:
+            async with AsyncSession(engine, expire_on_commit=False) as db_session:
+                if database is None:
+                    async with engine.begin() as conn:
+                        await conn.run_sync(sa_model.Base.metadata.create_all)
+                    await crud.bulk_upsert_records(db_session, records)
+                    await db_session.commit()
+                return await check(db_session, records[0])
+        finally:
+            await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=1000)
+    parser.add_argument("--database", type=Path, default=None)
+    args = parser.parse_args()
+
+    failures = asyncio.run(run(args.database, args.records))
+    sys.exit(1 if failures else 0)
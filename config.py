@@ -1,5 +1,6 @@
 import logging
 from pathlib import Path
+from typing import List
 
 from pydantic_settings import BaseSettings
 
@@ -8,11 +9,65 @@ class Config(BaseSettings):
     DATABASE_FILE_PATH: Path = Path(
         "/mount/gdrive/My Drive/cje1s2513929/database.sqlite3"
     )
+    # Connections kept open by the read-only engine that serves the API
+    DATABASE_READ_POOL_SIZE: int = 5
+    # Bytes of the database file memory-mapped per connection; 0 disables mmap
+    DATABASE_MMAP_SIZE: int = 256 * 1024 * 1024
+    # Page cache per read connection in KiB
+    DATABASE_READ_CACHE_SIZE_KIB: int = 64 * 1024
+    # Page cache of the write connection in KiB, large for bulk loads
+    DATABASE_WRITE_CACHE_SIZE_KIB: int = 256 * 1024
+    # PRAGMA synchronous of the write connection; NORMAL is safe in WAL mode
+    DATABASE_WRITE_SYNCHRONOUS: str = "NORMAL"
+    # Seconds a connection waits for a lock before failing with "database is locked"
+    DATABASE_BUSY_TIMEOUT_SECONDS: float = 30.0
+    # Length of the n-grams used by the full-text search index
+    SEARCH_NGRAM_SIZE: int = 2
+    # Largest count computed by search in "estimate" count mode
+    SEARCH_COUNT_ESTIMATE_CAP: int = 10000
+    # Number of exact search counts kept in memory
+    SEARCH_COUNT_CACHE_SIZE: int = 1024
+    # Number of values returned per facet
+    SEARCH_FACET_LIMIT: int = 20
+    # Largest number of matching records whose facet values are counted
+    SEARCH_FACET_SAMPLE_SIZE: int = 10000
+    # Number of search results (one page each) kept in memory; 0 disables the cache
+    SEARCH_RESULT_CACHE_SIZE: int = 512
+    # Seconds a cached search result is served for; None keeps it until evicted
+    SEARCH_RESULT_CACHE_TTL_SECONDS: float | None = 60.0
+    # Records request and SQL metrics and serves them at /api/metrics
+    METRICS_ENABLED: bool = True
+    # SQL statements slower than this many seconds are logged and counted
+    METRICS_SLOW_STATEMENT_SECONDS: float = 0.5
+    # Profiles requests sent with an X-Profile: 1 header or a profile=1 parameter
+    PROFILING_ENABLED: bool = False
+    # Directory the request profiles are written to
+    PROFILING_OUTPUT_DIR: Path = Path("profiles")
+    # Largest number of identifiers accepted by POST /api/v1/records:batch
+    RECORDS_BATCH_MAX_IDENTIFIERS: int = 1000
+    # Number of records written per executemany batch by populate.py
+    INGEST_BATCH_SIZE: int = 1000
+    # Maximum number of creator names cached during ingest; None caches them all
+    INGEST_CREATOR_CACHE_SIZE: int | None = None
+    # Number of processes parsing XML files in parallel; 1 parses in-process
+    INGEST_WORKERS: int = 1
+    # Maximum number of parsed batches waiting for the database writer
+    INGEST_QUEUE_SIZE: int = 8
+    # OAI-PMH endpoint harvested by `python manage.py harvest`
+    HARVEST_BASE_URL: str = "https://ndlsearch.ndl.go.jp/api/oaipmh"
+    # Metadata format requested from the endpoint
+    HARVEST_METADATA_PREFIX: str = "dcndl_simple"
+    # Sets to harvest, each with its own high-water mark; empty harvests them all
+    HARVEST_SETS: List[str] = []
+    # Seconds to wait for a response of the endpoint
+    HARVEST_TIMEOUT_SECONDS: float = 60.0
+    # Attempts per request before a harvest fails
+    HARVEST_MAX_ATTEMPTS: int = 3
 
     @property
-    def EFFECTIVE_ASYNC_DATABASE_URL(self) -> str:
+    def EFFECTIVE_DATABASE_FILE_PATH(self) -> Path:
         """
-        Returns the effective async database URL.
+        Returns the effective database file path.
         Falls back to a local file if the configured path is not available.
         """
         project_root = Path(__file__).resolve().parent
@@ -27,4 +82,19 @@ class Config(BaseSettings):
             db_path = project_root / "database.sqlite3"
             logging.warning(f"Defaulting to local database at {db_path}")
 
-        return f"sqlite+aiosqlite:///{db_path.resolve()}"
+        return db_path.resolve()
+
+    @property
+    def EFFECTIVE_ASYNC_DATABASE_URL(self) -> str:
+        """
+        Returns the effective async database URL.
+        """
+        return f"sqlite+aiosqlite:///{self.EFFECTIVE_DATABASE_FILE_PATH}"
+
+    @property
+    def EFFECTIVE_ASYNC_READ_ONLY_DATABASE_URL(self) -> str:
+        """
+        Returns the effective async database URL for read-only connections.
+        """
+        file_uri = self.EFFECTIVE_DATABASE_FILE_PATH.as_uri().removeprefix("file://")
+        return f"sqlite+aiosqlite:///file:{file_uri}?mode=ro&uri=true"
@@ -0,0 +1,95 @@
+import argparse
+import asyncio
+import logging
+
+from src.db import crud
+from src.db._creator_cache import CreatorCache
+from src.db.session import app_config, get_write_db
+from src.harvest import format_datestamp, harvest_set
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+
+
+async def rebuild_search_index() -> None:
+    """
+    Rebuilds the full-text search index from the records in the database.
+    """
+    print("--- Rebuilding Search Index ---")
+    async for session in get_write_db():
+        indexed_count = await crud.rebuild_search_index(session)
+        await session.commit()
+    print(f"   Indexed {indexed_count} records.")
+    print("--- Search Index Rebuilt ---")
+
+
+async def rebuild_record_documents() -> None:
+    """
+    Rebuilds the stored JSON documents served by search.
+    """
+    print("--- Rebuilding Record Documents ---")
+    async for session in get_write_db():
+        document_count = await crud.rebuild_record_documents(session)
+        await session.commit()
+    print(f"   Stored {document_count} documents.")
+    print("--- Record Documents Rebuilt ---")
+
+
+async def rebuild_facet_counts() -> None:
+    """
+    Recounts the facet values served by search without filters.
+    """
+    print("--- Rebuilding Facet Counts ---")
+    async for session in get_write_db():
+        value_count = await crud.rebuild_facet_counts(session)
+        await session.commit()
+    print(f"   Counted {value_count} facet values.")
+    print("--- Facet Counts Rebuilt ---")
+
+
+async def harvest() -> None:
+    """
+    Harvests the records changed since the last harvest from the OAI-PMH
+    endpoint, set by set.
+    """
+    print("--- Harvesting ---")
+    creator_cache = CreatorCache(max_size=app_config.INGEST_CREATOR_CACHE_SIZE)
+    async for session in get_write_db():
+        for set_spec in app_config.HARVEST_SETS or [""]:
+            result = await harvest_set(
+                session,
+                creator_cache,
+                base_url=app_config.HARVEST_BASE_URL,
+                metadata_prefix=app_config.HARVEST_METADATA_PREFIX,
+                set_spec=set_spec,
+                batch_size=app_config.INGEST_BATCH_SIZE,
+                timeout=app_config.HARVEST_TIMEOUT_SECONDS,
+                max_attempts=app_config.HARVEST_MAX_ATTEMPTS,
+            )
+            mark = (
+                format_datestamp(result.last_datestamp)
+                if result.last_datestamp
+                else "-"
+            )
+            print(
+                f"   Set {set_spec or '(all)'}: inserted {result.inserted}, "
+                f"updated {result.updated}, unchanged {result.unchanged}, "
+                f"deleted {result.deleted}, skipped {result.skipped}; "
+                f"next harvest from {mark}."
+            )
+    print("--- Harvest Finished ---")
+
+
+COMMANDS = {
+    "rebuild-search-index": rebuild_search_index,
+    "rebuild-record-documents": rebuild_record_documents,
+    "rebuild-facet-counts": rebuild_facet_counts,
+    "harvest": harvest,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Database maintenance commands.")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    args = parser.parse_args()
+
+    asyncio.run(COMMANDS[args.command]())
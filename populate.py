@@ -1,12 +1,15 @@
 import asyncio
+import itertools
 import logging
 import sys
 from pathlib import Path
 
+from src.db._creator_cache import CreatorCache
 from src.db._model import Base
-from src.db.crud import create_record
-from src.db.session import get_db, async_engine
-from src.xml_loader.loader import load_xml
+from src.db.crud import UpsertCounts, bulk_upsert_records
+from src.db.session import app_config, get_write_db, write_engine
+from src.ingest import ingest_files_parallel
+from src.xml_loader.loader import iter_xml
 
 project_root = Path(__file__).resolve().parent
 
@@ -32,45 +35,58 @@ async def populate():
 
     # 2. Create DB schema
     print("2. Creating database schema...")
-    async with async_engine.begin() as conn:
+    async with write_engine.begin() as conn:
         # This is idempotent, it won't recreate tables that already exist.
         await conn.run_sync(Base.metadata.create_all)
     print("   Schema created/verified.")
 
     # 3. Load data from all files and save to DB
     print("3. Loading and saving records from all files...")
-    total_saved_count = 0
-    batch_size = 1000
-
-    async for session in get_db():
-        for xml_file_path in xml_files:
-            print(f"   - Processing file: {xml_file_path.name}")
-            try:
-                pydantic_records = load_xml(xml_file_path)
-                print(f"     Loaded {len(pydantic_records)} records from file.")
-
-                for p_record in pydantic_records:
-                    await create_record(session, p_record)
-                    total_saved_count += 1
-                    if total_saved_count % batch_size == 0:
+    total_counts = UpsertCounts()
+    batch_size = app_config.INGEST_BATCH_SIZE
+    creator_cache = CreatorCache(max_size=app_config.INGEST_CREATOR_CACHE_SIZE)
+
+    async for session in get_write_db():
+        if app_config.INGEST_WORKERS > 1:
+            print(f"   Parsing with {app_config.INGEST_WORKERS} worker processes.")
+            total_counts = await ingest_files_parallel(
+                session,
+                xml_files,
+                creator_cache,
+                workers=app_config.INGEST_WORKERS,
+                batch_size=batch_size,
+                queue_size=app_config.INGEST_QUEUE_SIZE,
+            )
+        else:
+            for xml_file_path in xml_files:
+                print(f"   - Processing file: {xml_file_path.name}")
+                try:
+                    # Records are parsed lazily; writing starts with the first batch
+                    for batch in itertools.batched(iter_xml(xml_file_path), batch_size):
+                        batch_counts = await bulk_upsert_records(
+                            session, batch, creator_cache
+                        )
                         await session.commit()
+                        creator_cache.mark_committed()
+                        total_counts.add(batch_counts)
                         print(
-                            f"     ... Committed batch. Total records saved so far: {total_saved_count}"
+                            f"     ... Committed batch. Total records so far: {total_counts}"
                         )
 
-            except Exception as e:
-                logging.error(
-                    f"   Failed to process file {xml_file_path.name}: {e}",
-                    exc_info=True,
-                )
-                await session.rollback()  # Rollback on error for this file
-                continue  # Move to the next file
+                except Exception as e:
+                    logging.error(
+                        f"   Failed to process file {xml_file_path.name}: {e}",
+                        exc_info=True,
+                    )
+                    await session.rollback()  # Rollback on error for this file
+                    creator_cache.discard_uncommitted()
+                    continue  # Move to the next file
 
         await session.commit()  # Commit any remaining records
 
-    print(
-        f"   Finished saving. Total records saved from all files: {total_saved_count}."
-    )
+    # Records already stored are updated or skipped, so running this again
+    # does not duplicate the catalogue
+    print(f"   Finished saving. Total records from all files: {total_counts}.")
     print("--- Database Population Finished ---")
 
 
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Response
+
+from src import metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics() -> Response:
+    """
+    Request latencies, SQL statements and their times, rows fetched and
+    record conversion times of this process, in the Prometheus text format.
+    """
+    return Response(
+        content=metrics.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
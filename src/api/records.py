@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import json
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db import crud
+from src.db.session import app_config, get_db
+from src.model import ProjectedRecord, Record
+
+router = APIRouter()
+
+_FIELDS_DESCRIPTION = (
+    "Comma-separated record fields or profiles to return, as in `/search`."
+)
+
+
+class RecordBatchRequest(BaseModel):
+    identifiers: List[str] = Field(
+        ...,
+        min_length=1,
+        max_length=app_config.RECORDS_BATCH_MAX_IDENTIFIERS,
+        description="Identifier values, e.g. NDL URIs, or ISBNs with or without "
+        "hyphens in their 10- or 13-digit form.",
+    )
+    type: Optional[str] = Field(
+        None, description="Only match identifiers of this type, e.g. `dcndl:ISBN`."
+    )
+
+
+class RecordLookup(BaseModel):
+    identifier: str
+    # Every record with the identifier, oldest first; empty if none. Records are
+    # cut down to the selected fields when `fields` is given
+    records: List[Record | ProjectedRecord]
+
+
+class RecordBatchResponse(BaseModel):
+    # One item per distinct requested identifier, in request order
+    items: List[RecordLookup]
+
+
+def _render_batch_response(matches: Dict[str, List[str]]) -> Response:
+    """
+    Writes a `RecordBatchResponse` around trusted, pre-serialized documents.
+    """
+    items = [
+        '{"identifier":'
+        + json.dumps(identifier, ensure_ascii=False)
+        + ',"records":['
+        + ",".join(documents)
+        + "]}"
+        for identifier, documents in matches.items()
+    ]
+    content = '{"items":[' + ",".join(items) + "]}"
+    return Response(content=content, media_type="application/json")
+
+
+@router.get(
+    "/records/{identifier:path}",
+    # Cut down to the selected fields when `fields` is given
+    response_model=Record | ProjectedRecord,
+    responses={404: {"description": "No record has the identifier."}},
+)
+async def get_record(
+    identifier: str,
+    db: AsyncSession = Depends(get_db),
+    type: str | None = Query(
+        None, description="Only match identifiers of this type, e.g. `dcndl:ISBN`."
+    ),
+    fields: str | None = Query(None, description=_FIELDS_DESCRIPTION),
+) -> Response:
+    """
+    Fetch a record by one of its identifiers, e.g. its NDL URI or ISBN.
+    ISBN-10 and ISBN-13 forms, with or without hyphens, find the same record.
+    If several records share the identifier, the oldest one is returned.
+    """
+    try:
+        matches = await crud.get_records_by_identifiers(
+            db, [identifier], identifier_type=type, fields=fields
+        )
+    except crud.InvalidFieldsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    documents = matches[identifier]
+    if not documents:
+        raise HTTPException(status_code=404, detail="Record not found")
+    return Response(content=documents[0], media_type="application/json")
+
+
+@router.post("/records:batch", response_model=RecordBatchResponse)
+async def get_records_batch(
+    request: RecordBatchRequest,
+    db: AsyncSession = Depends(get_db),
+    fields: str | None = Query(None, description=_FIELDS_DESCRIPTION),
+) -> Response:
+    """
+    Fetch the records of many identifiers at once.
+    All identifiers are resolved with a single query.
+    """
+    try:
+        matches = await crud.get_records_by_identifiers(
+            db, request.identifiers, identifier_type=request.type, fields=fields
+        )
+    except crud.InvalidFieldsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return _render_batch_response(matches)
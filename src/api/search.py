@@ -1,25 +1,80 @@
 from __future__ import annotations
 
 import math
-from typing import Optional, List
+from typing import Any, Dict, Optional, List, Sequence
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.db import crud
 from src.db.session import get_db
-from src.model import Record
+from src.model import ProjectedRecord, Record
 
 router = APIRouter()
 
 
+class FacetValue(BaseModel):
+    value: str
+    # Number of matching records with the value
+    count: int
+
+
 class PaginatedRecordResponse(BaseModel):
-    items: List[Record]
-    total_items: int
-    total_pages: int
-    current_page: int
+    # Records cut down to the selected fields when `fields` is given
+    items: List[Record | ProjectedRecord]
+    # None when the search was made with `count=none`
+    total_items: Optional[int]
+    total_pages: Optional[int]
+    # False when `total_items` is a capped estimate, i.e. a lower bound
+    total_items_exact: bool = True
+    has_more: bool = False
+    # None for pages selected by `cursor`
+    current_page: Optional[int]
     per_page: int
+    next_cursor: Optional[str] = None
+    # Most frequent values per facet requested with `facets`
+    facets: Optional[Dict[str, List[FacetValue]]] = None
+    # False when the facets were counted over a sample of the matches
+    facets_exact: bool = True
+
+
+# Prefix of a serialized `PaginatedRecordResponse` with no items
+_EMPTY_ITEMS_PREFIX = '{"items":['
+
+
+def _render_paginated_response(documents: Sequence[str], **fields: Any) -> Response:
+    """
+    Writes a `PaginatedRecordResponse` whose items are trusted, pre-serialized
+    record documents. Only the envelope is serialized here; the documents are
+    spliced in without being parsed or validated again.
+    """
+    envelope = PaginatedRecordResponse.model_construct(items=[], **fields)
+    envelope_json = envelope.model_dump_json()
+    content = (
+        _EMPTY_ITEMS_PREFIX
+        + ",".join(documents)
+        + envelope_json[len(_EMPTY_ITEMS_PREFIX) :]
+    )
+    return Response(content=content, media_type="application/json")
+
+
+class CacheStats(BaseModel):
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+
+
+class SearchCacheStatsResponse(BaseModel):
+    # Whole search results, one page each
+    results: CacheStats
+    # Exact total counts
+    counts: CacheStats
+    # Facet counts
+    facets: CacheStats
 
 
 class APIResponse(BaseModel):
@@ -31,6 +86,8 @@ class APIResponse(BaseModel):
 @router.get("/search", response_model=PaginatedRecordResponse)
 async def search_records(
     db: AsyncSession = Depends(get_db),
+    # A second session, so an uncached count can run next to the page query
+    count_db: AsyncSession = Depends(get_db, use_cache=False),
     q: str | None = Query(
         None, description="Search query for all fields (title and creator)."
     ),
@@ -38,23 +95,130 @@ async def search_records(
     creator: str | None = Query(None, description="Search query for creator."),
     page: int = Query(1, ge=1, description="Page number."),
     per_page: int = Query(20, ge=1, le=100, description="Items per page."),
+    cursor: str | None = Query(
+        None,
+        description="`next_cursor` of the previous page. Takes precedence over "
+        "`page` and costs the same for every page.",
+    ),
+    count: crud.CountMode = Query(
+        "exact",
+        description="How to compute `total_items`: `exact`, `estimate` (counts "
+        "up to a cap) or `none` (only `has_more` is reported).",
+    ),
+    isbn: str | None = Query(
+        None,
+        description="Exact ISBN, in 10- or 13-digit form, with or without hyphens.",
+    ),
+    identifier: str | None = Query(
+        None,
+        description="Exact identifier of any type, e.g. an NDL URI, JP number, "
+        "ISBN or ISSN.",
+    ),
+    fields: str | None = Query(
+        None,
+        description="Comma-separated record fields to return, e.g. "
+        "`title,creator,subject`, or a profile: `summary` (title, creator, "
+        "publisher, date, thumbnail) for result lists, or `full`. The header "
+        "and the title are always returned; other fields are omitted. All "
+        "fields are returned by default.",
+    ),
+    facets: str | None = Query(
+        None,
+        description="Comma-separated facets to count among the matches: "
+        "`material_type`, `language`, `access_rights`, `subject`, `publisher`. "
+        "`subject` counts subject headings, not classification numbers such as "
+        "NDC.",
+    ),
+    material_type: str | None = Query(None, description="Exact material type."),
+    language: str | None = Query(None, description="Exact language code."),
+    access_rights: str | None = Query(None, description="Exact access rights."),
+    subject: str | None = Query(None, description="Exact subject."),
+    publisher: str | None = Query(None, description="Exact publisher."),
+    year_from: int | None = Query(
+        None, description="Earliest publication year, inclusive."
+    ),
+    year_to: int | None = Query(
+        None, description="Latest publication year, inclusive."
+    ),
+    sort: crud.SortOrder = Query(
+        "inserted",
+        description="Result order: `inserted`, or by publication date with "
+        "`date_asc` (undated records first) or `date_desc` (undated last).",
+    ),
 ):
     """
     Search for records with pagination.
     You can use `q` for a general search across title and creator,
     or use `title` and `creator` for specific field searches.
+    `isbn` and `identifier` look up exact identifiers and combine with the rest.
+    Facet values narrow the search, and `facets` returns the counts to offer.
+    Use `page` for shallow paging, or follow `next_cursor` to go deep.
     """
     skip = (page - 1) * per_page
-    records, total_items = await crud.search_records(
-        db_session=db, q=q, title=title, creator=creator, skip=skip, limit=per_page
-    )
+    try:
+        result = await crud.search_records(
+            db_session=db,
+            q=q,
+            title=title,
+            creator=creator,
+            skip=skip,
+            limit=per_page,
+            cursor=cursor,
+            count=count,
+            count_session=count_db,
+            fields=fields,
+            isbn=isbn,
+            identifier=identifier,
+            facets=facets,
+            material_type=material_type,
+            language=language,
+            access_rights=access_rights,
+            subject=subject,
+            publisher=publisher,
+            year_from=year_from,
+            year_to=year_to,
+            sort=sort,
+        )
+    except (
+        crud.InvalidCursorError,
+        crud.InvalidFieldsError,
+        crud.InvalidFacetsError,
+    ) as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    total_pages = math.ceil(total_items / per_page)
+    total_pages = None
+    if result.total_items is not None:
+        total_pages = math.ceil(result.total_items / per_page)
 
-    return PaginatedRecordResponse(
-        items=records,
-        total_items=total_items,
+    facet_values = None
+    if result.facets is not None:
+        facet_values = {
+            name: [
+                FacetValue.model_construct(value=value, count=count)
+                for value, count in counts
+            ]
+            for name, counts in result.facets.items()
+        }
+
+    # `response_model` still documents the schema; the body is written directly
+    return _render_paginated_response(
+        result.documents,
+        total_items=result.total_items,
         total_pages=total_pages,
-        current_page=page,
+        total_items_exact=result.total_is_exact,
+        has_more=result.next_cursor is not None,
+        current_page=page if cursor is None else None,
         per_page=per_page,
+        next_cursor=result.next_cursor,
+        facets=facet_values,
+        facets_exact=result.facets_exact,
     )
+
+
+@router.get("/search/cache-stats", response_model=SearchCacheStatsResponse)
+async def get_search_cache_stats() -> SearchCacheStatsResponse:
+    """
+    Returns the hit, miss and eviction counters of the search caches of the
+    serving process, for sizing `SEARCH_RESULT_CACHE_SIZE` and its TTL.
+    """
+    return SearchCacheStatsResponse.model_validate(crud.get_search_cache_stats())
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import uuid
+from typing import Any, Dict, List, Mapping, Sequence, Tuple
+
+from sqlalchemy import TableClause
+
+from src import model
+from src.db import _document, _fts
+from src.db import _model as sa_model
+from src.normalizer import normalize_identifier, publication_date
+
+Row = Dict[str, Any]
+
+# `BatchRows` lists of rows that belong to a record through "record_id"; rows
+# of `fts` belong to it through their rowid
+_CHILD_ROW_LISTS = (
+    "documents",
+    "identifiers",
+    "publication_places",
+    "issued",
+    "subjects",
+    "see_alsos",
+    "same_as_links",
+    "thumbnails",
+)
+
+
+class BatchRows:
+    """
+    Column values for a batch of records, grouped by table so that each table
+    can be written with a single executemany.
+
+    Records are numbered within the batch; `remap` moves their rows to the ids
+    the database assigns or already holds.
+    """
+
+    def __init__(self) -> None:
+        self.records: List[Row] = []
+        self.documents: List[Row] = []
+        self.identifiers: List[Row] = []
+        self.publication_places: List[Row] = []
+        self.issued: List[Row] = []
+        self.subjects: List[Row] = []
+        self.see_alsos: List[Row] = []
+        self.same_as_links: List[Row] = []
+        self.thumbnails: List[Row] = []
+        self.fts: List[Row] = []
+        # (record_id, creator name) pairs, resolved to creator ids on insert
+        self.creator_links: List[Tuple[int, str]] = []
+
+    def table_rows(self) -> List[Tuple[TableClause, List[Row]]]:
+        """
+        Returns the rows to insert per table once their records exist.
+        """
+        return [
+            (sa_model.RecordDocument.__table__, self.documents),
+            (sa_model.Identifier.__table__, self.identifiers),
+            (sa_model.PublicationPlace.__table__, self.publication_places),
+            (sa_model.Issued.__table__, self.issued),
+            (sa_model.Subject.__table__, self.subjects),
+            (sa_model.SeeAlso.__table__, self.see_alsos),
+            (sa_model.SameAs.__table__, self.same_as_links),
+            (sa_model.Thumbnail.__table__, self.thumbnails),
+            (sa_model.records_fts, self.fts),
+        ]
+
+    def remap(self, record_ids: Mapping[int, int]) -> BatchRows:
+        """
+        Returns the rows of the records in `record_ids` only, moved to the ids
+        they map to, e.g. to write a changed record over its stored version.
+        """
+        remapped = BatchRows()
+        remapped.records = [
+            {**row, "id": record_ids[row["id"]]}
+            for row in self.records
+            if row["id"] in record_ids
+        ]
+        for name in _CHILD_ROW_LISTS:
+            setattr(
+                remapped,
+                name,
+                [
+                    {**row, "record_id": record_ids[row["record_id"]]}
+                    for row in getattr(self, name)
+                    if row["record_id"] in record_ids
+                ],
+            )
+        remapped.fts = [
+            {**row, "rowid": record_ids[row["rowid"]]}
+            for row in self.fts
+            if row["rowid"] in record_ids
+        ]
+        remapped.creator_links = [
+            (record_ids[record_id], name)
+            for record_id, name in self.creator_links
+            if record_id in record_ids
+        ]
+        return remapped
+
+
+def _typed_value_rows(
+    record_id: int, values: Sequence[model.TypedValue[Any]]
+) -> List[Row]:
+    return [
+        {"record_id": record_id, "value": str(v.value), "type": v.type} for v in values
+    ]
+
+
+def _resource_link_rows(
+    record_id: int, links: Sequence[model.ResourceLink]
+) -> List[Row]:
+    return [{"record_id": record_id, "resource": link.resource} for link in links]
+
+
+def build_batch_rows(records: Sequence[model.Record]) -> BatchRows:
+    """
+    Converts a batch of Pydantic records into per-table column values.
+    Records get their position in the batch as id, see `BatchRows.remap`.
+    """
+    rows = BatchRows()
+    for record_id, record in enumerate(records):
+        dc = record.metadata.dc
+        pub_date = publication_date(dc.date, (str(i.value) for i in dc.issued))
+        document = _document.build_document(record)
+
+        rows.records.append(
+            {
+                "id": record_id,
+                "external_id": uuid.uuid4(),
+                "oai_identifier": record.header.identifier,
+                "content_hash": _document.content_hash(document),
+                "datestamp": record.header.datestamp,
+                "title": dc.title,
+                "publisher": dc.publisher,
+                "alternative": dc.alternative,
+                "series_title": dc.series_title,
+                "date": dc.date,
+                "language": dc.language,
+                "extent": dc.extent,
+                "material_type": dc.material_type,
+                "access_rights": dc.access_rights,
+                "title_transcription": dc.title_transcription,
+                "volume": dc.volume,
+                "pub_year": pub_date.year,
+                "pub_month": pub_date.month,
+                "pub_day": pub_date.day,
+            }
+        )
+
+        rows.documents.append({"record_id": record_id, "document": document})
+
+        # Identifiers are unique per record; drop repeated (value, type) pairs
+        unique_identifiers = list(
+            {(i.value, i.type): i for i in dc.identifier}.values()
+        )
+        identifier_rows = _typed_value_rows(record_id, unique_identifiers)
+        for row in identifier_rows:
+            row["normalized_value"] = normalize_identifier(row["value"], row["type"])
+        rows.identifiers.extend(identifier_rows)
+        rows.publication_places.extend(
+            _typed_value_rows(record_id, dc.publication_place)
+        )
+        rows.issued.extend(_typed_value_rows(record_id, dc.issued))
+        rows.subjects.extend(_typed_value_rows(record_id, dc.subject))
+        rows.see_alsos.extend(_resource_link_rows(record_id, dc.see_also))
+        rows.same_as_links.extend(_resource_link_rows(record_id, dc.same_as))
+        rows.thumbnails.extend(_resource_link_rows(record_id, dc.thumbnail))
+
+        rows.fts.append(
+            _fts.build_fts_row(
+                record_id=record_id,
+                title=dc.title,
+                title_transcription=dc.title_transcription,
+                alternative=dc.alternative,
+                series_title=dc.series_title,
+                creators=dc.creator,
+            )
+        )
+        # The association is keyed by (record_id, creator_id)
+        rows.creator_links.extend(
+            (record_id, name) for name in dict.fromkeys(dc.creator)
+        )
+
+    return rows
@@ -1,14 +1,54 @@
 from __future__ import annotations
-from datetime import timezone
 
-from src import model
+import time
+from datetime import datetime, timezone
+from typing import Any, Type, TypeVar
+
+from pydantic import BaseModel
+
+from config import Config
+from src import metrics, model
 from src.db import _model as sa_model
 
+M = TypeVar("M", bound=BaseModel)
+
+# Conversions are timed for `src.metrics` only while metrics are recorded
+_TIMED = Config().METRICS_ENABLED
+
+# Parametrized exactly like the fields of `model.DcndlSimple`, so that models
+# built without validation serialize without warnings
+_StrValue = model.TypedValue[str]
+_IssuedValue = model.TypedValue[datetime | str]
+
+
+def _build(cls: Type[M], validate: bool, **values: Any) -> M:
+    """
+    Instantiates a model, skipping validation for trusted values.
+    """
+    if validate:
+        return cls(**values)
+    return cls.model_construct(**values)
+
 
-def _convert_sa_to_pydantic(db_record: sa_model.Record) -> model.Record:
+def _convert_sa_to_pydantic(
+    db_record: sa_model.Record, validate: bool = True
+) -> model.Record:
     """
     Converts a SQLAlchemy Record object to a Pydantic Record object.
+
+    Rows read back from our own database are already valid, so callers may
+    pass `validate=False` to build the models with `model_construct`.
     """
+    if not _TIMED:
+        return _convert(db_record, validate)
+    start = time.perf_counter()
+    try:
+        return _convert(db_record, validate)
+    finally:
+        metrics.CONVERSION_SECONDS.observe(time.perf_counter() - start)
+
+
+def _convert(db_record: sa_model.Record, validate: bool) -> model.Record:
     # Find the header identifier from the list of identifiers
     header_identifier_obj = next(
         (id for id in db_record.identifiers if id.type == "dcterms:URI"), None
@@ -18,13 +58,21 @@ def _convert_sa_to_pydantic(db_record: sa_model.Record) -> model.Record:
             "Header identifier (dcterms:URI) not found in identifiers list"
         )
 
-    return model.Record(
-        header=model.Header(
+    return _build(
+        model.Record,
+        validate,
+        header=_build(
+            model.Header,
+            validate,
             identifier=header_identifier_obj.value,
             datestamp=db_record.datestamp.replace(tzinfo=timezone.utc),
         ),
-        metadata=model.Metadata(
-            dc=model.DcndlSimple(
+        metadata=_build(
+            model.Metadata,
+            validate,
+            dc=_build(
+                model.DcndlSimple,
+                validate,
                 title=db_record.title,
                 publisher=db_record.publisher,
                 alternative=db_record.alternative,
@@ -37,36 +85,36 @@ def _convert_sa_to_pydantic(db_record: sa_model.Record) -> model.Record:
                 title_transcription=db_record.title_transcription,
                 volume=db_record.volume,
                 # Map relationships
-                creator=[creator.name for creator in db_record.creators],
+                creator=[link.name for link in db_record.creator_links],
                 # Convert all identifiers from the DB
                 identifier=[
-                    model.TypedValue(value=id.value, type=id.type)
+                    _build(_StrValue, validate, value=id.value, type=id.type)
                     for id in db_record.identifiers
                 ],
                 publication_place=[
-                    model.TypedValue(value=p.value, type=p.type)
+                    _build(_StrValue, validate, value=p.value, type=p.type)
                     for p in db_record.publication_places
                 ],
                 issued=[
-                    model.TypedValue(value=i.value, type=i.type)
+                    _build(_IssuedValue, validate, value=i.value, type=i.type)
                     for i in db_record.issued
                 ],
                 subject=[
-                    model.TypedValue(value=s.value, type=s.type)
+                    _build(_StrValue, validate, value=s.value, type=s.type)
                     for s in db_record.subjects
                 ],
                 see_also=[
-                    model.ResourceLink(resource=sa.resource)
+                    _build(model.ResourceLink, validate, resource=sa.resource)
                     for sa in db_record.see_alsos
                 ],
                 same_as=[
-                    model.ResourceLink(resource=sa.resource)
+                    _build(model.ResourceLink, validate, resource=sa.resource)
                     for sa in db_record.same_as_links
                 ],
                 thumbnail=[
-                    model.ResourceLink(resource=th.resource)
+                    _build(model.ResourceLink, validate, resource=th.resource)
                     for th in db_record.thumbnails
                 ],
-            )
+            ),
         ),
     )
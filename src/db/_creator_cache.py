@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Dict, Iterable, List
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db import _model as sa_model
+from src.normalizer import normalize_name
+
+
+class CreatorCache:
+    """
+    Ingest-scoped map from normalized creator names to creator ids.
+
+    With `max_size=None` every existing creator is loaded once and all lookups
+    are answered from memory. With a `max_size`, only the most recently used
+    names are kept and misses are resolved with one SELECT per batch.
+    New creators are inserted with one executemany that returns their ids, so
+    no flush is needed per name. A creator keeps the first spelling seen; the
+    spelling of each record is stored on its association row.
+    """
+
+    def __init__(self, max_size: int | None = None) -> None:
+        self.max_size = max_size
+        self._ids: OrderedDict[str, int] = OrderedDict()
+        # Keys inserted since the last commit, dropped again on rollback
+        self._uncommitted: List[str] = []
+        self._loaded = False
+
+    def _remember(self, key: str, creator_id: int) -> None:
+        self._ids[key] = creator_id
+        self._ids.move_to_end(key)
+        if self.max_size is not None and len(self._ids) > self.max_size:
+            self._ids.popitem(last=False)
+
+    async def load(self, db_session: AsyncSession) -> None:
+        """
+        Loads existing creators. Does nothing in bounded mode.
+        """
+        if self.max_size is not None or self._loaded:
+            return
+        stmt = select(sa_model.Creator.normalized_name, sa_model.Creator.id)
+        result = await db_session.stream(stmt)
+        async for key, creator_id in result:
+            self._ids[key] = creator_id
+        self._loaded = True
+
+    async def get_ids(
+        self, db_session: AsyncSession, names: Iterable[str]
+    ) -> Dict[str, int]:
+        """
+        Resolves creator names to ids, inserting the missing creators in bulk.
+        """
+        await self.load(db_session)
+
+        keys = {name: normalize_name(name) for name in names}
+        resolved: Dict[str, int] = {}
+        missing: Dict[str, str] = {}  # normalized name -> first raw name seen
+        for name, key in keys.items():
+            if key in resolved or key in missing:
+                continue
+            creator_id = self._ids.get(key)
+            if creator_id is not None:
+                self._ids.move_to_end(key)
+                resolved[key] = creator_id
+            else:
+                missing[key] = name
+
+        if missing and not self._loaded:
+            stmt = select(sa_model.Creator.normalized_name, sa_model.Creator.id).where(
+                sa_model.Creator.normalized_name.in_(missing)
+            )
+            for key, creator_id in (await db_session.execute(stmt)).all():
+                resolved[key] = creator_id
+                self._remember(key, creator_id)
+
+        new_names = [key for key in missing if key not in resolved]
+        if new_names:
+            table = sa_model.Creator.__table__
+            result = await db_session.execute(
+                insert(table).returning(table.c.normalized_name, table.c.id),
+                [{"name": missing[key], "normalized_name": key} for key in new_names],
+            )
+            for key, creator_id in result.tuples():
+                resolved[key] = creator_id
+                self._remember(key, creator_id)
+                self._uncommitted.append(key)
+
+        # Several raw names may collapse onto the same creator
+        return {name: resolved[key] for name, key in keys.items()}
+
+    def mark_committed(self) -> None:
+        """
+        Confirms the creators inserted since the last commit.
+        """
+        self._uncommitted.clear()
+
+    def discard_uncommitted(self) -> None:
+        """
+        Forgets the creators inserted since the last commit after a rollback.
+        """
+        for key in self._uncommitted:
+            self._ids.pop(key, None)
+        self._uncommitted.clear()
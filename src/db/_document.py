@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime, timezone
+from typing import Dict
+
+from src import model
+from src.normalizer import normalize_name
+
+
+def build_document(record: model.Record) -> str:
+    """
+    Serializes a parsed record into the JSON document stored for the read path.
+
+    The document matches what `_convert_sa_to_pydantic` returns for the stored
+    rows: the datestamp is read back as UTC, repeated identifiers and creators
+    are stored once, creators keep their source order and the record's own
+    spelling, and issued values are stored as strings.
+    """
+    dc = record.metadata.dc
+    creators: Dict[str, str] = {}
+    for name in dc.creator:
+        creators.setdefault(normalize_name(name), name)
+    stored_dc = dc.model_copy(
+        update={
+            "identifier": list({(i.value, i.type): i for i in dc.identifier}.values()),
+            "creator": list(creators.values()),
+            "issued": [
+                model.TypedValue[datetime | str](value=str(i.value), type=i.type)
+                for i in dc.issued
+            ],
+        }
+    )
+    stored_record = model.Record(
+        header=model.Header(
+            identifier=record.header.identifier,
+            datestamp=record.header.datestamp.replace(tzinfo=timezone.utc),
+        ),
+        metadata=model.Metadata(dc=stored_dc),
+    )
+    return stored_record.model_dump_json()
+
+
+def content_hash(document: str) -> str:
+    """
+    Hashes a stored record document, so that an ingest can tell whether a
+    record changed without comparing its rows.
+    """
+    return hashlib.blake2b(document.encode(), digest_size=16).hexdigest()
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Literal, Tuple, get_args
+
+from sqlalchemy import ColumnElement, Select, distinct, func, literal, or_, select
+
+from src.db import _model as sa_model
+
+Row = Dict[str, Any]
+
+FacetName = Literal[
+    "material_type", "language", "access_rights", "subject", "publisher"
+]
+FACET_NAMES: Tuple[str, ...] = get_args(FacetName)
+
+# Facets stored as columns of `records`; "subject" lives in `subjects`
+RECORD_FACETS = ("material_type", "language", "access_rights", "publisher")
+
+# Subject types whose values are classification numbers, e.g. NDC "913.6".
+# The subject facet counts headings only, e.g. NDLSH "日本文学" or untyped
+# keywords, so that it never offers codes and headings side by side.
+CLASSIFICATION_SUBJECT_TYPES = (
+    "dcndl:NDC",
+    "dcndl:NDC8",
+    "dcndl:NDC9",
+    "dcndl:NDC10",
+    "dcndl:NDLC",
+    "dcterms:DDC",
+    "dcterms:LCC",
+    "dcterms:UDC",
+)
+
+
+class InvalidFacetsError(ValueError):
+    """
+    Raised when `facets` names an unknown facet.
+    """
+
+
+def parse_facets(spec: str | None) -> Tuple[str, ...]:
+    """
+    Parses a comma-separated list of facet names into their canonical order.
+    """
+    if spec is None:
+        return ()
+    names = {name.strip() for name in spec.split(",")} - {""}
+    unknown = names.difference(FACET_NAMES)
+    if unknown:
+        raise InvalidFacetsError(f"Unknown facet: {sorted(unknown)[0]!r}")
+    return tuple(name for name in FACET_NAMES if name in names)
+
+
+def _is_heading(subject: Row) -> bool:
+    return subject["type"] not in CLASSIFICATION_SUBJECT_TYPES
+
+
+def _heading_condition() -> ColumnElement[bool]:
+    subject_type = sa_model.Subject.type
+    return or_(
+        subject_type.is_(None), subject_type.not_in(CLASSIFICATION_SUBJECT_TYPES)
+    )
+
+
+def count_values(records: Iterable[Row], subjects: Iterable[Row]) -> List[Row]:
+    """
+    Counts the facet values of newly inserted rows as `facet_counts` rows,
+    to be added to the stored counts. A subject heading counts once per record.
+    """
+    counter: Counter[Tuple[str, str]] = Counter()
+    for record in records:
+        for facet in RECORD_FACETS:
+            value = record.get(facet)
+            if value is not None:
+                counter[(facet, value)] += 1
+    headings = {
+        (subject["record_id"], subject["value"])
+        for subject in subjects
+        if _is_heading(subject)
+    }
+    for _, value in headings:
+        counter[("subject", value)] += 1
+    return [
+        {"facet": facet, "value": value, "count": count}
+        for (facet, value), count in counter.items()
+    ]
+
+
+def aggregate_query(facet: str) -> Select[str, str, int]:
+    """
+    Returns (facet, value, count) rows of a facet over all records, to rebuild
+    the stored counts.
+    """
+    if facet in RECORD_FACETS:
+        column: ColumnElement[str] = getattr(sa_model.Record, facet)
+        return (
+            select(literal(facet), column, func.count())
+            .where(column.is_not(None))
+            .group_by(column)
+        )
+    subjects = sa_model.Subject
+    return (
+        select(literal(facet), subjects.value, func.count(distinct(subjects.record_id)))
+        .where(_heading_condition())
+        .group_by(subjects.value)
+    )
+
+
+def precomputed_query(facet: str, limit: int) -> Select[str, int]:
+    """
+    Returns the most frequent values of a facet over all records, from the
+    counts maintained by ingest.
+    """
+    counts = sa_model.FacetCount
+    return (
+        select(counts.value, counts.count)
+        .where(counts.facet == facet, counts.count > 0)
+        .order_by(counts.count.desc(), counts.value)
+        .limit(limit)
+    )
+
+
+def matching_query(facet: str, record_ids: Select[Any], limit: int) -> Select[str, int]:
+    """
+    Returns the most frequent values of a facet among the given records.
+    Values are read through the primary key of `records` and the index on
+    `subjects.record_id`, so the cost follows the number of records.
+    """
+    if facet in RECORD_FACETS:
+        column: ColumnElement[str] = getattr(sa_model.Record, facet)
+        count = func.count()
+        stmt = select(column, count).where(
+            sa_model.Record.id.in_(record_ids), column.is_not(None)
+        )
+    else:
+        column = sa_model.Subject.value.expression
+        count = func.count(distinct(sa_model.Subject.record_id))
+        stmt = select(column, count).where(
+            sa_model.Subject.record_id.in_(record_ids), _heading_condition()
+        )
+    return stmt.group_by(column).order_by(count.desc(), column).limit(limit)
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Sequence
+
+from config import Config
+from src import normalizer
+
+# Length of the n-grams stored in the index. Changing it requires rebuilding the
+# index with `python manage.py rebuild-search-index`.
+NGRAM_SIZE = Config().SEARCH_NGRAM_SIZE
+
+TITLE_COLUMNS = ("title", "title_transcription", "alternative", "series_title")
+CREATOR_COLUMNS = ("creators",)
+
+
+def _quote_phrase(text: str) -> str:
+    """
+    Quotes text as an FTS5 string so that it is never parsed as query syntax.
+    """
+    return '"' + text.replace('"', '""') + '"'
+
+
+def to_index_text(text: str | None) -> str | None:
+    """
+    Converts a field value to the space-separated n-grams stored in the index.
+    """
+    if text is None:
+        return None
+    return " ".join(normalizer.index_ngrams(text, NGRAM_SIZE))
+
+
+def build_match_phrases(text: str, columns: Sequence[str] | None = None) -> List[str]:
+    """
+    Tokenizes a query the same way as indexed text and returns one FTS5 phrase
+    per segment, optionally restricted to the given columns.
+
+    Segments of at least `NGRAM_SIZE` characters become a phrase of consecutive
+    n-grams; shorter segments become a prefix query. A text without segments,
+    e.g. only symbols, gives no phrases: it can match no record.
+    """
+    phrases = []
+    for segment in normalizer.segments(text):
+        grams = normalizer.query_ngrams(segment, NGRAM_SIZE)
+        if grams:
+            phrase = _quote_phrase(" ".join(grams))
+        else:
+            phrase = _quote_phrase(segment) + " *"
+        if columns:
+            phrase = "{" + " ".join(columns) + "} : " + phrase
+        phrases.append(phrase)
+    return phrases
+
+
+def combine_match_phrases(phrases: List[str]) -> str:
+    """
+    Combines phrases into one MATCH expression that requires all of them.
+    """
+    return " AND ".join(phrases)
+
+
+def build_fts_row(
+    record_id: int,
+    title: str,
+    title_transcription: str | None,
+    alternative: str | None,
+    series_title: str | None,
+    creators: Sequence[str],
+) -> Dict[str, Any]:
+    """
+    Builds the values of a `records_fts` row for a record.
+    """
+    creator_tokens = [to_index_text(name) for name in creators]
+    return {
+        "rowid": record_id,
+        "title": to_index_text(title),
+        "title_transcription": to_index_text(title_transcription),
+        "alternative": to_index_text(alternative),
+        "series_title": to_index_text(series_title),
+        "creators": " ".join(token for token in creator_tokens if token),
+    }
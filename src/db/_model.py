@@ -5,11 +5,18 @@ from datetime import datetime
 from typing import List
 
 from sqlalchemy import (
+    DDL,
     DateTime,
     ForeignKey,
+    Index,
+    Integer,
     String,
+    Text,
     UniqueConstraint,
     UUID,
+    column,
+    event,
+    table,
 )
 from sqlalchemy.orm import (
     Mapped,
@@ -28,26 +35,28 @@ Base = declarative_base()
 class TypedValueMixin:
     """Mixin for models that represent a value with an optional type."""
 
-    id: Mapped[uuid.UUID] = mapped_column(UUID, primary_key=True, default=uuid.uuid4)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
 
     value: Mapped[str] = mapped_column(String)
     type: Mapped[str | None] = mapped_column(String, nullable=True)
 
+    # Indexed for loading, replacing and deleting the rows of a record
     @declared_attr
-    def record_id(cls) -> Mapped[uuid.UUID]:
-        return mapped_column(ForeignKey("records.id"))
+    def record_id(cls) -> Mapped[int]:
+        return mapped_column(ForeignKey("records.id"), index=True)
 
 
 class ResourceLinkMixin:
     """Mixin for models that represent a resource link."""
 
-    id: Mapped[uuid.UUID] = mapped_column(UUID, primary_key=True, default=uuid.uuid4)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
 
     resource: Mapped[str] = mapped_column(String)
 
+    # Indexed for loading, replacing and deleting the rows of a record
     @declared_attr
-    def record_id(cls) -> Mapped[uuid.UUID]:
-        return mapped_column(ForeignKey("records.id"))
+    def record_id(cls) -> Mapped[int]:
+        return mapped_column(ForeignKey("records.id"), index=True)
 
 
 # --- Association Model ---
@@ -56,12 +65,13 @@ class ResourceLinkMixin:
 class RecordCreatorAssociation(Base):
     __tablename__ = "record_creator_association"
 
-    record_id: Mapped[uuid.UUID] = mapped_column(
-        ForeignKey("records.id"), primary_key=True
-    )
-    creator_id: Mapped[uuid.UUID] = mapped_column(
-        ForeignKey("creators.id"), primary_key=True
-    )
+    record_id: Mapped[int] = mapped_column(ForeignKey("records.id"), primary_key=True)
+    creator_id: Mapped[int] = mapped_column(ForeignKey("creators.id"), primary_key=True)
+    # The creator's name as spelled in this record. Creators are deduplicated on
+    # their normalized name, and `Creator.name` is the first spelling seen.
+    name: Mapped[str] = mapped_column(String)
+    # Position of the creator among the record's creators, in source order
+    position: Mapped[int] = mapped_column(Integer, default=0)
 
 
 # --- Main Models ---
@@ -70,27 +80,50 @@ class RecordCreatorAssociation(Base):
 class Record(Base):
     __tablename__ = "records"
 
-    id: Mapped[uuid.UUID] = mapped_column(UUID, primary_key=True, default=uuid.uuid4)
+    # INTEGER PRIMARY KEY is the rowid itself: compact keys in every child
+    # table, and new records are appended to the end of the B-tree
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # Stable id to hand out to other systems; not used as a key here
+    external_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID, nullable=True, unique=True, index=True, default=uuid.uuid4
+    )
 
     # Header fields
+    # OAI-PMH header identifier: the key that ingests upsert records on
+    oai_identifier: Mapped[str] = mapped_column(String, unique=True, index=True)
     datestamp: Mapped[datetime] = mapped_column(DateTime)
+    # `_document.content_hash` of the stored document; None until one is stored
+    content_hash: Mapped[str | None] = mapped_column(String, nullable=True)
 
     # DcndlSimple direct fields
     title: Mapped[str] = mapped_column(String)
-    publisher: Mapped[str | None] = mapped_column(String, nullable=True)
+    publisher: Mapped[str | None] = mapped_column(String, nullable=True, index=True)
     alternative: Mapped[str | None] = mapped_column(String, nullable=True)
     series_title: Mapped[str | None] = mapped_column(String, nullable=True)
     date: Mapped[str | None] = mapped_column(String, nullable=True)
-    language: Mapped[str | None] = mapped_column(String, nullable=True)
+    language: Mapped[str | None] = mapped_column(String, nullable=True, index=True)
     extent: Mapped[str | None] = mapped_column(String, nullable=True)
-    material_type: Mapped[str | None] = mapped_column(String, nullable=True)
-    access_rights: Mapped[str | None] = mapped_column(String, nullable=True)
+    material_type: Mapped[str | None] = mapped_column(String, nullable=True, index=True)
+    access_rights: Mapped[str | None] = mapped_column(String, nullable=True, index=True)
     title_transcription: Mapped[str | None] = mapped_column(String, nullable=True)
     volume: Mapped[str | None] = mapped_column(String, nullable=True)
 
+    # Publication date parsed from `issued` and `date` at ingest (see
+    # `normalizer.publication_date`), for year ranges and sorting by date
+    pub_year: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    pub_month: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    pub_day: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
     # Relationships
+    # In source order, as in the stored document
     creators: Mapped[List["Creator"]] = relationship(
-        secondary="record_creator_association", back_populates="records"
+        secondary="record_creator_association",
+        back_populates="records",
+        order_by="RecordCreatorAssociation.position",
+    )
+    # The creators as spelled in this record, in source order
+    creator_links: Mapped[List["RecordCreatorAssociation"]] = relationship(
+        order_by="RecordCreatorAssociation.position", viewonly=True
     )
     identifiers: Mapped[List["Identifier"]] = relationship(
         back_populates="record", cascade="all, delete-orphan"
@@ -114,27 +147,94 @@ class Record(Base):
         back_populates="record", cascade="all, delete-orphan"
     )
 
+    # Serves year ranges, and the date sort in index order
+    __table_args__ = (
+        Index("ix_records_publication_date", "pub_year", "pub_month", "pub_day"),
+    )
+
 
 class Creator(Base):
     __tablename__ = "creators"
 
-    id: Mapped[uuid.UUID] = mapped_column(UUID, primary_key=True, default=uuid.uuid4)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
 
     name: Mapped[str] = mapped_column(String, unique=False, index=True)
+    # Deduplication key, see `src.normalizer.normalize_name`
+    normalized_name: Mapped[str] = mapped_column(String, unique=True, index=True)
 
     records: Mapped[List["Record"]] = relationship(
         secondary="record_creator_association", back_populates="creators"
     )
 
 
+class RecordDocument(Base):
+    """
+    Denormalized read model: the record as returned by the API, serialized once
+    at write time so that search does not load the child tables.
+    """
+
+    __tablename__ = "record_documents"
+
+    record_id: Mapped[int] = mapped_column(ForeignKey("records.id"), primary_key=True)
+    # JSON of `src.model.Record`, see `src.db._document.build_document`
+    document: Mapped[str] = mapped_column(Text)
+
+
+class FacetCount(Base):
+    """
+    Number of records per facet value, maintained by every write so that
+    facets of unfiltered searches are read instead of counted.
+    """
+
+    __tablename__ = "facet_counts"
+
+    # One of `src.db._facets.FACET_NAMES`
+    facet: Mapped[str] = mapped_column(String, primary_key=True)
+    value: Mapped[str] = mapped_column(String, primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class HarvestState(Base):
+    """
+    High-water mark of the incremental OAI-PMH harvests of one set.
+    """
+
+    __tablename__ = "harvest_states"
+
+    endpoint: Mapped[str] = mapped_column(String, primary_key=True)
+    # "" for harvests of the whole repository
+    set_spec: Mapped[str] = mapped_column(String, primary_key=True)
+    # Latest datestamp harvested (UTC); the next harvest starts from it
+    last_datestamp: Mapped[datetime] = mapped_column(DateTime)
+    harvested_at: Mapped[datetime] = mapped_column(DateTime)
+
+
+class DataGeneration(Base):
+    """
+    Single-row counter that every write bumps. Caches of search results and
+    counts are only valid for the generation they were computed at.
+    """
+
+    __tablename__ = "data_generation"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    generation: Mapped[int] = mapped_column(Integer, default=0)
+
+
 # --- TypedValue-based Models ---
 
 
 class Identifier(TypedValueMixin, Base):
     __tablename__ = "identifiers"
 
+    # Lookup key, e.g. the ISBN-13 of an ISBN-10, see
+    # `src.normalizer.normalize_identifier`
+    normalized_value: Mapped[str] = mapped_column(String, index=True)
+
     record: Mapped["Record"] = relationship(back_populates="identifiers")
 
+    # The index behind the constraint also serves lookups by value and by
+    # (value, type), see `crud.get_records_by_identifiers`
     __table_args__ = (
         UniqueConstraint("value", "type", "record_id", name="_identifier_uc"),
     )
@@ -157,6 +257,10 @@ class Subject(TypedValueMixin, Base):
 
     record: Mapped["Record"] = relationship(back_populates="subjects")
 
+    # For the `subject=` filter and the subject facet; the facet of a result set
+    # reads the subjects of its records through the index on `record_id`
+    __table_args__ = (Index("ix_subjects_value", "value"),)
+
 
 # --- ResourceLink-based Models ---
 
@@ -177,3 +281,40 @@ class Thumbnail(ResourceLinkMixin, Base):
     __tablename__ = "thumbnails"
 
     record: Mapped["Record"] = relationship(back_populates="thumbnails")
+
+
+# --- Full-text search index ---
+
+# FTS5 virtual tables cannot be expressed as declarative models, so the index is
+# described as a lightweight table for Core statements and created with raw DDL.
+# The ``rowid`` of a row is the ``id`` of its record, so that matches join back
+# to ``records`` and the row of a record is found without a scan. The columns
+# hold normalized n-grams built by ``src.normalizer``, so the tokenizer only
+# has to split on spaces.
+RECORDS_FTS_TABLE_NAME = "records_fts"
+
+CREATE_RECORDS_FTS_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {RECORDS_FTS_TABLE_NAME} USING fts5("
+    "title, "
+    "title_transcription, "
+    "alternative, "
+    "series_title, "
+    "creators, "
+    "tokenize = 'unicode61 remove_diacritics 0'"
+    ")"
+)
+
+records_fts = table(
+    RECORDS_FTS_TABLE_NAME,
+    column("rowid", Integer),
+    column("title", String),
+    column("title_transcription", String),
+    column("alternative", String),
+    column("series_title", String),
+    column("creators", String),
+    # Hidden column named after the table, used as the left side of MATCH.
+    column(RECORDS_FTS_TABLE_NAME, String),
+)
+
+# Make ``Base.metadata.create_all`` (used by populate.py) create the index too.
+event.listen(Base.metadata, "after_create", DDL(CREATE_RECORDS_FTS_SQL))
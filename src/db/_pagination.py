@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from typing import Any, List, Sequence
+
+from sqlalchemy import ColumnElement, and_, false, or_
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(sort_values: List[Any]) -> str:
+    """
+    Encodes the sort key of the last returned row as an opaque cursor.
+    """
+    payload = json.dumps(sort_values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, key_length: int) -> List[Any]:
+    """
+    Decodes a cursor produced by `encode_cursor` for a sort key of the given
+    length.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_values = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidCursorError("Malformed cursor") from e
+    if not isinstance(sort_values, list) or len(sort_values) != key_length:
+        raise InvalidCursorError("Cursor does not match the sort order")
+    return sort_values
+
+
+def after_key(
+    columns: Sequence[ColumnElement[Any]],
+    sort_values: Sequence[Any],
+    descending: bool = False,
+) -> ColumnElement[bool]:
+    """
+    Builds the condition for the rows that follow the sort key `sort_values` of
+    the nullable `columns`, ordered all ascending or all descending. NULLs sort
+    first in ascending order and last in descending order, as in SQLite.
+    """
+    conditions = []
+    for i, (column, value) in enumerate(zip(columns, sort_values)):
+        if descending:
+            beyond = false() if value is None else or_(column < value, column.is_(None))
+        else:
+            beyond = column.is_not(None) if value is None else column > value
+        equal = [c.is_(v) for c, v in zip(columns[:i], sort_values[:i])]
+        conditions.append(and_(*equal, beyond))
+    condition = or_(*conditions)
+    # A plain bound on the first column lets the index seek to the key
+    if not descending and sort_values[0] is not None:
+        condition = and_(columns[0] >= sort_values[0], condition)
+    return condition
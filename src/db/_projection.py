@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from typing import Dict, Sequence, Tuple
+
+from sqlalchemy import ColumnElement, String, func
+
+from src import model
+
+# Fields of `model.DcndlSimple`, in schema order
+RECORD_FIELDS: Tuple[str, ...] = tuple(model.DcndlSimple.model_fields)
+
+# Named sets of fields for `fields=`
+FIELD_PROFILES: Dict[str, Tuple[str, ...]] = {
+    # What a result list shows
+    "summary": ("title", "creator", "publisher", "date", "thumbnail"),
+    "full": RECORD_FIELDS,
+}
+
+# Returned whatever is selected, so that every item can be shown and identified
+# (the header is always returned too)
+_ALWAYS_SELECTED = ("title",)
+
+
+class InvalidFieldsError(ValueError):
+    """
+    Raised when `fields` names an unknown field or profile.
+    """
+
+
+def parse_fields(spec: str | None) -> Tuple[str, ...] | None:
+    """
+    Parses a comma-separated list of field names and profile names.
+    Returns the selected fields in schema order, or None if all are selected.
+    """
+    if spec is None:
+        return None
+    selected = set(_ALWAYS_SELECTED)
+    for name in (part.strip() for part in spec.split(",")):
+        if name in FIELD_PROFILES:
+            selected.update(FIELD_PROFILES[name])
+        elif name in RECORD_FIELDS:
+            selected.add(name)
+        elif name:
+            raise InvalidFieldsError(f"Unknown field or profile: {name!r}")
+    if selected.issuperset(RECORD_FIELDS):
+        return None
+    return tuple(field for field in RECORD_FIELDS if field in selected)
+
+
+def project_document(
+    document: ColumnElement[str], fields: Sequence[str]
+) -> ColumnElement[str]:
+    """
+    Builds the SQL that removes the unselected fields from a stored record
+    document, so they never leave SQLite. NULL documents stay NULL.
+    """
+    # One json_remove() parses the document once, unlike extracting each
+    # selected field into a new object
+    removed_paths = [
+        f"$.metadata.dc.{field}" for field in RECORD_FIELDS if field not in fields
+    ]
+    return func.json_remove(document, *removed_paths, type_=String)
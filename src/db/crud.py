@@ -1,112 +1,627 @@
 from __future__ import annotations
 
-from typing import List, Tuple
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Literal, NamedTuple, Sequence, Tuple
 
-from sqlalchemy import select, and_, or_, func
+from sqlalchemy import (
+    select,
+    insert,
+    update,
+    delete,
+    and_,
+    false,
+    func,
+    ColumnElement,
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from src import model
+from src.cache import LRUCache
+from src.db import _bulk, _facets, _fts, _pagination, _projection
 from src.db import _model as sa_model
 from src.db._convert import _convert_sa_to_pydantic
+from src.db._creator_cache import CreatorCache
+from src.db._document import content_hash
+from src.db._facets import InvalidFacetsError as InvalidFacetsError
+from src.db._facets import Row
+from src.db._pagination import InvalidCursorError as InvalidCursorError
+from src.db._projection import InvalidFieldsError as InvalidFieldsError
+from src.db.session import app_config
+from src.normalizer import (
+    identifier_keys,
+    normalize_identifier,
+    normalize_isbn,
+)
 
+_CREATOR_NAME_SEPARATOR = "\n"
 
-async def __get_or_create_creator(
-    db_session: AsyncSession, name: str
-) -> sa_model.Creator:
+# Stable sort key for search results: insertion order, as record ids are
+# rowids. Keyset pagination seeks on it, so deep pages cost the same as the
+# first one.
+_RECORD_SORT_KEY: ColumnElement[int] = sa_model.Record.id.expression
+
+SortOrder = Literal["inserted", "date_asc", "date_desc"]
+
+# Sort keys per order, matching an index so that pages are read in index order
+_PUBLICATION_DATE_SORT_KEY: Tuple[ColumnElement[Any], ...] = (
+    sa_model.Record.pub_year.expression,
+    sa_model.Record.pub_month.expression,
+    sa_model.Record.pub_day.expression,
+    _RECORD_SORT_KEY,
+)
+_SORT_KEYS: Dict[SortOrder, Tuple[ColumnElement[Any], ...]] = {
+    "inserted": (_RECORD_SORT_KEY,),
+    "date_asc": _PUBLICATION_DATE_SORT_KEY,
+    "date_desc": _PUBLICATION_DATE_SORT_KEY,
+}
+
+
+# Loads every relationship that `_convert_sa_to_pydantic` reads
+_RECORD_LOAD_OPTIONS = (
+    selectinload(sa_model.Record.creator_links),
+    selectinload(sa_model.Record.identifiers),
+    selectinload(sa_model.Record.publication_places),
+    selectinload(sa_model.Record.issued),
+    selectinload(sa_model.Record.subjects),
+    selectinload(sa_model.Record.see_alsos),
+    selectinload(sa_model.Record.same_as_links),
+    selectinload(sa_model.Record.thumbnails),
+)
+
+CountMode = Literal["exact", "estimate", "none"]
+
+# Exact counts keyed by (data generation, normalized filters)
+_count_cache: LRUCache[Tuple[Any, ...], int] = LRUCache(
+    app_config.SEARCH_COUNT_CACHE_SIZE
+)
+
+
+FacetCounts = Dict[str, List[Tuple[str, int]]]
+
+# Facet counts keyed by (data generation, normalized filters, facets), shared
+# by every page of a search. Values are (counts, exact).
+_facet_cache: LRUCache[Tuple[Any, ...], Tuple[FacetCounts, bool]] = LRUCache(
+    app_config.SEARCH_COUNT_CACHE_SIZE
+)
+
+
+class SearchResult(NamedTuple):
+    # JSON documents of `model.Record`, ready to be written to a response
+    documents: List[str]
+    # None when counting was skipped
+    total_items: int | None
+    # False when `total_items` is only a lower bound
+    total_is_exact: bool
+    # Opaque cursor of the next page, or None on the last page
+    next_cursor: str | None
+    # Most frequent (value, count) pairs per requested facet
+    facets: FacetCounts | None = None
+    # False when the facets were counted over a sample of the matches
+    facets_exact: bool = True
+
+
+# Search results keyed by (data generation, normalized filters, page, count mode)
+_result_cache: LRUCache[Tuple[Any, ...], SearchResult] = LRUCache(
+    app_config.SEARCH_RESULT_CACHE_SIZE, ttl=app_config.SEARCH_RESULT_CACHE_TTL_SECONDS
+)
+
+
+class UpsertCounts:
     """
-    Retrieve a creator by name, or create it if it doesn't exist.
+    Numbers of records an ingest inserted, updated and left unchanged.
     """
-    stmt = select(sa_model.Creator).where(sa_model.Creator.name == name)
-    result = await db_session.execute(stmt)
-    creator = result.scalar_one_or_none()
-    if not creator:
-        creator = sa_model.Creator(name=name)  # type: ignore[call-arg]
-        db_session.add(creator)
-        # We flush to get the ID without committing the whole transaction
-        await db_session.flush()
-    return creator
+
+    def __init__(self, inserted: int = 0, updated: int = 0, unchanged: int = 0):
+        self.inserted = inserted
+        self.updated = updated
+        self.unchanged = unchanged
+
+    @property
+    def total(self) -> int:
+        return self.inserted + self.updated + self.unchanged
+
+    def add(self, other: UpsertCounts) -> None:
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.unchanged += other.unchanged
+
+    def __repr__(self) -> str:
+        return (
+            f"inserted {self.inserted}, updated {self.updated}, "
+            f"unchanged {self.unchanged}"
+        )
 
 
 async def create_record(
     db_session: AsyncSession, pydantic_record: model.Record
 ) -> model.Record:
     """
-    Converts a Pydantic Record to a SQLAlchemy Record and saves it to the database.
+    Saves a Pydantic Record to the database, replacing the stored record with
+    the same header identifier, and returns it as stored.
     """
-    # Handle many-to-many relationship for creators
-    creators = [
-        await __get_or_create_creator(db_session, name)
-        for name in pydantic_record.metadata.dc.creator
-    ]
+    await upsert_batch_rows(db_session, _bulk.build_batch_rows([pydantic_record]))
 
-    # Create the main SQLAlchemy Record object without relationship fields
-    db_record = sa_model.Record(  # type: ignore[call-arg]
-        datestamp=pydantic_record.header.datestamp,
-        title=pydantic_record.metadata.dc.title,
-        publisher=pydantic_record.metadata.dc.publisher,
-        alternative=pydantic_record.metadata.dc.alternative,
-        series_title=pydantic_record.metadata.dc.series_title,
-        date=pydantic_record.metadata.dc.date,
-        language=pydantic_record.metadata.dc.language,
-        extent=pydantic_record.metadata.dc.extent,
-        material_type=pydantic_record.metadata.dc.material_type,
-        access_rights=pydantic_record.metadata.dc.access_rights,
-        title_transcription=pydantic_record.metadata.dc.title_transcription,
-        volume=pydantic_record.metadata.dc.volume,
+    # Re-fetch the record with all relationships loaded to avoid lazy loading issues.
+    stmt = (
+        select(sa_model.Record)
+        .where(sa_model.Record.oai_identifier == pydantic_record.header.identifier)
+        .options(*_RECORD_LOAD_OPTIONS)
+        .execution_options(populate_existing=True)
     )
+    result = await db_session.execute(stmt)
+    return _convert_sa_to_pydantic(result.scalar_one())
+
+
+async def bulk_upsert_records(
+    db_session: AsyncSession,
+    pydantic_records: Sequence[model.Record],
+    creator_cache: CreatorCache | None = None,
+) -> UpsertCounts:
+    """
+    Saves a batch of records with one executemany per table, see
+    `upsert_batch_rows`. Unlike `create_record`, nothing is read back.
+
+    Pass the same `creator_cache` for every batch of an ingest so that creator
+    names are resolved from memory.
+    """
+    rows = _bulk.build_batch_rows(pydantic_records)
+    return await upsert_batch_rows(db_session, rows, creator_cache)
+
+
+async def upsert_batch_rows(
+    db_session: AsyncSession,
+    rows: _bulk.BatchRows,
+    creator_cache: CreatorCache | None = None,
+) -> UpsertCounts:
+    """
+    Saves rows prepared by `_bulk.build_batch_rows`, e.g. in a worker process,
+    keyed on the OAI-PMH header identifier of each record:
 
-    # Assign relationship attributes after initialization
-    db_record.creators = creators
+    - new records are inserted;
+    - changed records keep their id, and get their row in `records`
+      updated and their rows in every other table replaced;
+    - records whose content hash matches the stored one are skipped without
+      touching any table, so loading the same files again writes nothing.
+    """
+    counts = UpsertCounts()
+    # The last version of a record in the batch wins
+    latest = {row["oai_identifier"]: row for row in rows.records}
+    stmt = select(
+        sa_model.Record.oai_identifier,
+        sa_model.Record.id,
+        sa_model.Record.content_hash,
+    ).where(sa_model.Record.oai_identifier.in_(latest))
+    stored = {
+        oai_identifier: (record_id, content_hash)
+        for oai_identifier, record_id, content_hash in await db_session.execute(stmt)
+    }
 
-    # Handle one-to-many relationships
-    for p_identifier in pydantic_record.metadata.dc.identifier:
-        db_record.identifiers.append(sa_model.Identifier(**p_identifier.model_dump()))
+    # Batch-local record ids -> ids in the database
+    record_ids: Dict[int, int] = {}
+    new_rows: List[Row] = []
+    changed_rows: List[Row] = []
+    for oai_identifier, row in latest.items():
+        if oai_identifier not in stored:
+            new_rows.append(row)
+        elif stored[oai_identifier][1] != row["content_hash"]:
+            record_ids[row["id"]] = stored[oai_identifier][0]
+            changed_rows.append(row)
+        else:
+            counts.unchanged += 1
+    counts.inserted = len(new_rows)
+    counts.updated = len(changed_rows)
+    if not new_rows and not changed_rows:
+        return counts
 
-    for p_pub_place in pydantic_record.metadata.dc.publication_place:
-        db_record.publication_places.append(
-            sa_model.PublicationPlace(**p_pub_place.model_dump())
+    if changed_rows:
+        await __delete_record_rows(db_session, list(record_ids.values()))
+        # ORM bulk UPDATE by primary key: one executemany. The external id of
+        # a record never changes.
+        await db_session.execute(
+            update(sa_model.Record),
+            [
+                {
+                    **{k: v for k, v in row.items() if k != "external_id"},
+                    "id": record_ids[row["id"]],
+                }
+                for row in changed_rows
+            ],
         )
+    if new_rows:
+        table = sa_model.Record.__table__
+        # Ids come back in any order, which lets SQLAlchemy insert many rows per
+        # statement; the unique OAI-PMH identifier tells them apart
+        result = await db_session.execute(
+            insert(table).returning(table.c.oai_identifier, table.c.id),
+            [{k: v for k, v in row.items() if k != "id"} for row in new_rows],
+        )
+        record_ids.update(
+            (latest[oai_identifier]["id"], record_id)
+            for oai_identifier, record_id in result.tuples()
+        )
+    rows = rows.remap(record_ids)
 
-    for p_issued in pydantic_record.metadata.dc.issued:
-        db_record.issued.append(
-            sa_model.Issued(value=str(p_issued.value), type=p_issued.type)  # type: ignore
+    if creator_cache is None:
+        creator_cache = CreatorCache(max_size=0)
+    creator_ids = await creator_cache.get_ids(
+        db_session, [name for _, name in rows.creator_links]
+    )
+    # Names that normalize to the same creator must not repeat the association;
+    # it keeps the first spelling in the record, as the stored document does.
+    # Positions keep the source order, which the stored document has too.
+    links: Dict[Tuple[int, int], str] = {}
+    for record_id, name in rows.creator_links:
+        links.setdefault((record_id, creator_ids[name]), name)
+    association_rows: List[Row] = []
+    positions: Dict[int, int] = {}
+    for (record_id, creator_id), name in links.items():
+        position = positions.get(record_id, 0)
+        positions[record_id] = position + 1
+        association_rows.append(
+            {
+                "record_id": record_id,
+                "creator_id": creator_id,
+                "name": name,
+                "position": position,
+            }
         )
 
-    for p_subject in pydantic_record.metadata.dc.subject:
-        db_record.subjects.append(sa_model.Subject(**p_subject.model_dump()))
+    for table, table_rows in rows.table_rows():
+        if table_rows:
+            await db_session.execute(insert(table), table_rows)
+    if association_rows:
+        await db_session.execute(
+            insert(sa_model.RecordCreatorAssociation.__table__), association_rows
+        )
+    # Updated records were taken out of the counts with their old values
+    await __add_facet_counts(
+        db_session,
+        _facets.count_values(
+            [row for row in latest.values() if row["id"] in record_ids],
+            rows.subjects,
+        ),
+    )
+    await bump_data_generation(db_session)
 
-    for p_see_also in pydantic_record.metadata.dc.see_also:
-        db_record.see_alsos.append(sa_model.SeeAlso(**p_see_also.model_dump()))
+    return counts
 
-    for p_same_as in pydantic_record.metadata.dc.same_as:
-        db_record.same_as_links.append(sa_model.SameAs(**p_same_as.model_dump()))
 
-    for p_thumbnail in pydantic_record.metadata.dc.thumbnail:
-        db_record.thumbnails.append(sa_model.Thumbnail(**p_thumbnail.model_dump()))
+# Tables whose rows belong to one record, deleted with it
+_RECORD_CHILD_TABLES = (
+    sa_model.RecordDocument.__table__,
+    sa_model.Identifier.__table__,
+    sa_model.PublicationPlace.__table__,
+    sa_model.Issued.__table__,
+    sa_model.Subject.__table__,
+    sa_model.SeeAlso.__table__,
+    sa_model.SameAs.__table__,
+    sa_model.Thumbnail.__table__,
+    sa_model.RecordCreatorAssociation.__table__,
+)
 
-    db_session.add(db_record)
-    await db_session.flush()
 
-    # Re-fetch the record with all relationships loaded to avoid lazy loading issues.
+async def __delete_record_rows(
+    db_session: AsyncSession, record_ids: Sequence[int]
+) -> None:
+    """
+    Deletes the rows of records in every table but `records`, and takes the
+    records out of the facet counts. Creators stay, as other records may share
+    them.
+    """
+    facet_columns = [getattr(sa_model.Record, facet) for facet in _facets.RECORD_FACETS]
+    records = await db_session.execute(
+        select(*facet_columns).where(sa_model.Record.id.in_(record_ids))
+    )
+    subjects = await db_session.execute(
+        select(
+            sa_model.Subject.record_id, sa_model.Subject.value, sa_model.Subject.type
+        ).where(sa_model.Subject.record_id.in_(record_ids))
+    )
+    facet_rows = _facets.count_values(
+        [row._asdict() for row in records], [row._asdict() for row in subjects]
+    )
+    await __add_facet_counts(
+        db_session, [{**row, "count": -row["count"]} for row in facet_rows]
+    )
+
+    fts = sa_model.records_fts
+    await db_session.execute(delete(fts).where(fts.c.rowid.in_(record_ids)))
+    for table in _RECORD_CHILD_TABLES:
+        await db_session.execute(delete(table).where(table.c.record_id.in_(record_ids)))
+
+
+async def __delete_records(db_session: AsyncSession, record_ids: Sequence[int]) -> None:
+    """
+    Deletes records with their rows in every table.
+    """
+    await __delete_record_rows(db_session, record_ids)
+    await db_session.execute(
+        delete(sa_model.Record).where(sa_model.Record.id.in_(record_ids))
+    )
+
+
+async def delete_records_by_uri(db_session: AsyncSession, uris: Sequence[str]) -> int:
+    """
+    Deletes the records whose OAI-PMH header identifier is one of `uris`.
+    Returns the number of records.
+    """
+    if not uris:
+        return 0
+    stmt = select(sa_model.Record.id).where(sa_model.Record.oai_identifier.in_(uris))
+    record_ids = list((await db_session.execute(stmt)).scalars())
+    if record_ids:
+        await __delete_records(db_session, record_ids)
+        await bump_data_generation(db_session)
+    return len(record_ids)
+
+
+async def get_harvest_state(
+    db_session: AsyncSession, endpoint: str, set_spec: str
+) -> datetime | None:
+    """
+    Returns the datestamp the next harvest of a set starts from, in UTC, or None
+    if the set was never harvested.
+    """
+    state = await db_session.get(sa_model.HarvestState, (endpoint, set_spec))
+    if state is None:
+        return None
+    return state.last_datestamp.replace(tzinfo=timezone.utc)
+
+
+async def set_harvest_state(
+    db_session: AsyncSession, endpoint: str, set_spec: str, last_datestamp: datetime
+) -> None:
+    """
+    Records the datestamp the next harvest of a set starts from.
+    """
+    values = {
+        "last_datestamp": last_datestamp.astimezone(timezone.utc).replace(tzinfo=None),
+        "harvested_at": datetime.now(timezone.utc).replace(tzinfo=None),
+    }
+    stmt = sqlite_insert(sa_model.HarvestState).values(
+        endpoint=endpoint, set_spec=set_spec, **values
+    )
+    await db_session.execute(
+        stmt.on_conflict_do_update(index_elements=["endpoint", "set_spec"], set_=values)
+    )
+
+
+async def __add_facet_counts(db_session: AsyncSession, facet_rows: List[Row]) -> None:
+    """
+    Adds counts from `_facets.count_values` to the stored facet counts.
+    """
+    if not facet_rows:
+        return
+    table = sa_model.FacetCount.__table__
+    stmt = sqlite_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.facet, table.c.value],
+        set_={"count": table.c.count + stmt.excluded.count},
+    )
+    await db_session.execute(stmt, facet_rows)
+
+
+async def rebuild_facet_counts(db_session: AsyncSession) -> int:
+    """
+    Recounts the stored facet counts from the records, e.g. to backfill a
+    database created before they existed. Returns the number of facet values.
+    """
+    await db_session.execute(delete(sa_model.FacetCount))
+    columns = ["facet", "value", "count"]
+    for facet in _facets.FACET_NAMES:
+        await db_session.execute(
+            insert(sa_model.FacetCount).from_select(
+                columns, _facets.aggregate_query(facet)
+            )
+        )
+    await bump_data_generation(db_session)
+
+    stmt = select(func.count()).select_from(sa_model.FacetCount)
+    return (await db_session.execute(stmt)).scalar_one()
+
+
+async def rebuild_search_index(db_session: AsyncSession) -> int:
+    """
+    Rebuilds the full-text search index from the records table.
+    Returns the number of indexed records.
+    """
+    fts = sa_model.records_fts
+    await db_session.execute(delete(fts))
+
+    # The names as spelled in each record, as indexed at ingest
+    creator_names = (
+        select(
+            func.group_concat(
+                sa_model.RecordCreatorAssociation.name, _CREATOR_NAME_SEPARATOR
+            )
+        )
+        .where(sa_model.RecordCreatorAssociation.record_id == sa_model.Record.id)
+        .scalar_subquery()
+    )
+    stmt = select(
+        sa_model.Record.id,
+        sa_model.Record.title,
+        sa_model.Record.title_transcription,
+        sa_model.Record.alternative,
+        sa_model.Record.series_title,
+        creator_names,
+    )
+
+    indexed_count = 0
+    result = await db_session.stream(stmt)
+    async for partition in result.partitions(1000):
+        rows = [
+            _fts.build_fts_row(
+                record_id=row[0],
+                title=row[1],
+                title_transcription=row[2],
+                alternative=row[3],
+                series_title=row[4],
+                creators=row[5].split(_CREATOR_NAME_SEPARATOR) if row[5] else [],
+            )
+            for row in partition
+        ]
+        await db_session.execute(insert(fts), rows)
+        indexed_count += len(rows)
+    await bump_data_generation(db_session)
+
+    return indexed_count
+
+
+async def rebuild_record_documents(db_session: AsyncSession) -> int:
+    """
+    Rebuilds the stored record documents from the normalized tables, e.g. to
+    backfill a database created before they existed.
+    Returns the number of documents.
+    """
+    await db_session.execute(delete(sa_model.RecordDocument))
+
     stmt = (
         select(sa_model.Record)
-        .where(sa_model.Record.id == db_record.id)
-        .options(
-            selectinload(sa_model.Record.creators),
-            selectinload(sa_model.Record.identifiers),
-            selectinload(sa_model.Record.publication_places),
-            selectinload(sa_model.Record.issued),
-            selectinload(sa_model.Record.subjects),
-            selectinload(sa_model.Record.see_alsos),
-            selectinload(sa_model.Record.same_as_links),
-            selectinload(sa_model.Record.thumbnails),
+        .options(*_RECORD_LOAD_OPTIONS)
+        .execution_options(yield_per=1000)
+    )
+    document_count = 0
+    result = await db_session.stream_scalars(stmt)
+    async for partition in result.partitions():
+        documents = {
+            db_record.id: _convert_sa_to_pydantic(
+                db_record, validate=False
+            ).model_dump_json()
+            for db_record in partition
+        }
+        await db_session.execute(
+            insert(sa_model.RecordDocument.__table__),
+            [
+                {"record_id": record_id, "document": document}
+                for record_id, document in documents.items()
+            ],
         )
+        # Later ingests compare against the hash of the rebuilt document
+        await db_session.execute(
+            update(sa_model.Record),
+            [
+                {"id": record_id, "content_hash": content_hash(document)}
+                for record_id, document in documents.items()
+            ],
+        )
+        document_count += len(documents)
+        # Loaded records are not needed again
+        db_session.expunge_all()
+    await bump_data_generation(db_session)
+
+    return document_count
+
+
+async def get_data_generation(db_session: AsyncSession) -> int:
+    """
+    Returns the current data generation, see `sa_model.DataGeneration`.
+    """
+    stmt = select(sa_model.DataGeneration.generation).where(
+        sa_model.DataGeneration.id == 1
+    )
+    return (await db_session.execute(stmt)).scalar_one_or_none() or 0
+
+
+async def bump_data_generation(db_session: AsyncSession) -> None:
+    """
+    Advances the data generation, invalidating cached search counts and results.
+    """
+    stmt = sqlite_insert(sa_model.DataGeneration).values(id=1, generation=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[sa_model.DataGeneration.id],
+        set_={"generation": sa_model.DataGeneration.generation + 1},
+    )
+    await db_session.execute(stmt)
+
+
+async def __load_documents(
+    db_session: AsyncSession,
+    record_ids: Sequence[int],
+    fields: Sequence[str] | None = None,
+) -> Dict[int, str]:
+    """
+    Builds documents from the normalized tables, for records that have no
+    stored document yet. Only `fields` are included if given.
+    """
+    include: Dict[str, Any] | None = None
+    if fields is not None:
+        include = {"header": True, "metadata": {"dc": set(fields)}}
+
+    stmt = (
+        select(sa_model.Record)
+        .where(sa_model.Record.id.in_(record_ids))
+        .options(*_RECORD_LOAD_OPTIONS)
     )
     result = await db_session.execute(stmt)
-    loaded_db_record = result.scalar_one()
+    return {
+        db_record.id: _convert_sa_to_pydantic(
+            db_record, validate=False
+        ).model_dump_json(include=include)
+        for db_record in result.scalars()
+    }
 
-    return _convert_sa_to_pydantic(loaded_db_record)
+
+def __document_column(fields: Sequence[str] | None) -> ColumnElement[str]:
+    """
+    Returns the stored document column, cut down to `fields` if given.
+    """
+    document: ColumnElement[str] = sa_model.RecordDocument.document.expression
+    if fields is not None:
+        document = _projection.project_document(document, fields)
+    return document
+
+
+async def __count_records(
+    db_session: AsyncSession, filters: List[ColumnElement[bool]], cap: int | None
+) -> int:
+    """
+    Counts the records matching the filters, stopping at `cap` if given.
+    """
+    stmt = select(sa_model.Record.id).where(*filters)
+    if cap is not None:
+        stmt = stmt.limit(cap)
+    count_stmt = select(func.count()).select_from(stmt.subquery())
+    return (await db_session.execute(count_stmt)).scalar_one()
+
+
+async def __count_facets(
+    db_session: AsyncSession,
+    filters: List[ColumnElement[bool]],
+    facet_names: Sequence[str],
+) -> Tuple[FacetCounts, bool]:
+    """
+    Counts the most frequent values of each facet among the records matching the
+    filters. Returns the counts and whether they cover every match.
+    """
+    limit = app_config.SEARCH_FACET_LIMIT
+    if not filters:
+        # Every record matches: read the counts maintained by ingest
+        return {
+            name: list(
+                (await db_session.execute(_facets.precomputed_query(name, limit)))
+                .tuples()
+                .all()
+            )
+            for name in facet_names
+        }, True
+
+    # Count over at most SEARCH_FACET_SAMPLE_SIZE matches, so that a broad
+    # search costs no more than the sample
+    sample_size = app_config.SEARCH_FACET_SAMPLE_SIZE
+    exact = await __count_records(db_session, filters, sample_size + 1) <= sample_size
+    record_ids = select(sa_model.Record.id).where(*filters).limit(sample_size)
+    return {
+        name: list(
+            (await db_session.execute(_facets.matching_query(name, record_ids, limit)))
+            .tuples()
+            .all()
+        )
+        for name in facet_names
+    }, exact
 
 
 async def search_records(
@@ -116,56 +631,330 @@ async def search_records(
     creator: str | None = None,
     skip: int = 0,
     limit: int = 20,
-) -> Tuple[List[model.Record], int]:
+    cursor: str | None = None,
+    count: CountMode = "exact",
+    count_session: AsyncSession | None = None,
+    fields: str | None = None,
+    isbn: str | None = None,
+    identifier: str | None = None,
+    facets: str | None = None,
+    material_type: str | None = None,
+    language: str | None = None,
+    access_rights: str | None = None,
+    subject: str | None = None,
+    publisher: str | None = None,
+    year_from: int | None = None,
+    year_to: int | None = None,
+    sort: SortOrder = "inserted",
+) -> SearchResult:
     """
     Searches for records in the database with pagination.
+
+    `isbn` matches ISBN-10 and ISBN-13 forms of a book, with or without
+    hyphens. `identifier` matches any identifier by its normalized value. Both
+    are answered from the index on `identifiers.normalized_value`.
+
+    `material_type`, `language`, `access_rights`, `subject` and `publisher`
+    match a facet value exactly. `facets` (comma-separated names of
+    `_facets.FACET_NAMES`) adds the most frequent values of those facets among
+    the matches, up to `SEARCH_FACET_LIMIT` each; raises `InvalidFacetsError`
+    for an unknown name. Without filters the counts come from `facet_counts`.
+    Otherwise at most `SEARCH_FACET_SAMPLE_SIZE` matches are counted and
+    `facets_exact` is False if there are more. Facets are cached like counts.
+
+    `year_from` and `year_to` bound the publication year, inclusive. `sort`
+    orders the results by insertion or by publication date; records without a
+    date come first in "date_asc" and last in "date_desc".
+
+    Pages are selected by `cursor` (a `next_cursor` of an earlier result) if
+    given, otherwise by `skip`. Raises `InvalidCursorError` for a bad cursor.
+
+    `count` selects how `total_items` is computed: "exact" counts every match,
+    "estimate" stops counting at `SEARCH_COUNT_ESTIMATE_CAP`, and "none" skips
+    counting. Exact counts are cached until the data generation changes. If a
+    `count_session` is given, a count that is not cached runs on it
+    concurrently with the page query.
+
+    Records are returned as their stored JSON documents, without loading or
+    validating models. `fields` (comma-separated field and profile names, see
+    `_projection.FIELD_PROFILES`) cuts the documents down inside the query.
+    Raises `InvalidFieldsError` for an unknown name. Whole results are cached for
+    `SEARCH_RESULT_CACHE_TTL_SECONDS` or until the data generation changes.
     """
-    stmt = select(sa_model.Record).options(
-        selectinload(sa_model.Record.creators),
-        selectinload(sa_model.Record.identifiers),
-        selectinload(sa_model.Record.publication_places),
-        selectinload(sa_model.Record.issued),
-        selectinload(sa_model.Record.subjects),
-        selectinload(sa_model.Record.see_alsos),
-        selectinload(sa_model.Record.same_as_links),
-        selectinload(sa_model.Record.thumbnails),
-    )
-
-    filters = []
-    if q:
-        search_terms = q.split()
-        any_clauses = []
-        for term in search_terms:
-            any_clauses.append(
-                or_(
-                    sa_model.Record.title.ilike(f"%{term}%"),
-                    sa_model.Record.creators.any(
-                        sa_model.Creator.name.ilike(f"%{term}%")
-                    ),
+    selected_fields = _projection.parse_fields(fields)
+    facet_names = _facets.parse_facets(facets)
+    match_phrases: List[str] = []
+    # A query without any indexable term, e.g. only symbols, matches nothing
+    # rather than dropping the filter
+    unmatchable = False
+
+    for text, columns in (
+        (q, None),
+        (title, _fts.TITLE_COLUMNS),
+        (creator, _fts.CREATOR_COLUMNS),
+    ):
+        if text and text.strip():
+            phrases = _fts.build_match_phrases(text, columns)
+            unmatchable = unmatchable or not phrases
+            match_phrases.extend(phrases)
+
+    isbn_key = normalize_isbn(isbn) if isbn else None
+    identifier_key = tuple(sorted(identifier_keys(identifier))) if identifier else None
+    facet_values = {
+        "material_type": material_type,
+        "language": language,
+        "access_rights": access_rights,
+        "subject": subject,
+        "publisher": publisher,
+    }
+    facet_filter_key = tuple(
+        (name, value) for name, value in facet_values.items() if value is not None
+    )
+
+    # Normalized filters: equivalent queries share cached results and counts
+    match_expression = _fts.combine_match_phrases(match_phrases)
+    filter_key = (
+        match_expression,
+        unmatchable,
+        isbn_key,
+        identifier_key,
+        facet_filter_key,
+        year_from,
+        year_to,
+    )
+    generation = await get_data_generation(db_session)
+    page_key = ("cursor", cursor) if cursor is not None else ("offset", skip)
+    result_key = (
+        generation,
+        filter_key,
+        page_key,
+        limit,
+        count,
+        selected_fields,
+        facet_names,
+        sort,
+    )
+    cached_result = _result_cache.get(result_key)
+    if cached_result is not None:
+        return cached_result
+
+    # Matching ids with their stored documents; no child table is read
+    document = __document_column(selected_fields)
+    stmt = select(sa_model.Record.id, document).outerjoin(sa_model.RecordDocument)
+
+    filters: List[ColumnElement[bool]] = []
+
+    # All terms are answered by a single MATCH against the FTS index
+    if unmatchable:
+        filters.append(false())
+    elif match_expression:
+        fts = sa_model.records_fts
+        filters.append(
+            sa_model.Record.id.in_(
+                select(fts.c.rowid).where(
+                    fts.c[sa_model.RECORDS_FTS_TABLE_NAME].match(match_expression)
+                )
+            )
+        )
+
+    if isbn_key is not None:
+        filters.append(
+            sa_model.Record.id.in_(
+                select(sa_model.Identifier.record_id).where(
+                    sa_model.Identifier.normalized_value == isbn_key,
+                    sa_model.Identifier.type.contains("ISBN"),
+                )
+            )
+        )
+
+    if identifier_key is not None:
+        filters.append(
+            sa_model.Record.id.in_(
+                select(sa_model.Identifier.record_id).where(
+                    sa_model.Identifier.normalized_value.in_(identifier_key)
                 )
             )
-        filters.append(and_(*any_clauses))
+        )
 
-    if title:
-        filters.append(sa_model.Record.title.ilike(f"%{title}%"))
+    # Facet values are matched on their own indexes
+    for name, value in facet_filter_key:
+        if name == "subject":
+            filters.append(
+                sa_model.Record.id.in_(
+                    select(sa_model.Subject.record_id).where(
+                        sa_model.Subject.value == value
+                    )
+                )
+            )
+        else:
+            filters.append(getattr(sa_model.Record, name) == value)
 
-    if creator:
-        stmt = stmt.join(sa_model.Record.creators)
-        filters.append(sa_model.Creator.name.ilike(f"%{creator}%"))
+    if year_from is not None:
+        filters.append(sa_model.Record.pub_year >= year_from)
+    if year_to is not None:
+        filters.append(sa_model.Record.pub_year <= year_to)
 
     if filters:
-        stmt = stmt.where(and_(*filters)).distinct()
+        stmt = stmt.where(and_(*filters))
 
-    # Get the total count of items before pagination
-    count_stmt = select(func.count()).select_from(stmt.subquery())
-    total_items_result = await db_session.execute(count_stmt)
-    total_items = total_items_result.scalar_one()
+    # Apply pagination. One extra row tells whether another page follows. Every
+    # sort key ends with the record id, which is selected already.
+    sort_key = _SORT_KEYS[sort]
+    descending = sort == "date_desc"
+    paginated_stmt = stmt.add_columns(*sort_key[:-1]).order_by(
+        *(column.desc() if descending else column for column in sort_key)
+    )
+    if cursor is not None:
+        last_sort_key = _pagination.decode_cursor(cursor, key_length=len(sort_key))
+        if not isinstance(last_sort_key[-1], int) or not all(
+            value is None or isinstance(value, int) for value in last_sort_key
+        ):
+            raise InvalidCursorError("Cursor does not match the sort order")
+        paginated_stmt = paginated_stmt.where(
+            _pagination.after_key(sort_key, last_sort_key, descending)
+        )
+    else:
+        paginated_stmt = paginated_stmt.offset(skip)
+
+    count_key = (generation, filter_key)
+    total_items = _count_cache.get(count_key) if count != "none" else None
+    total_is_exact = total_items is not None or count == "exact"
+    cap = app_config.SEARCH_COUNT_ESTIMATE_CAP if count == "estimate" else None
+
+    page_query = db_session.execute(paginated_stmt.limit(limit + 1))
+    if total_items is not None or count == "none":
+        result = await page_query
+    elif count_session is not None:
+        total_items, result = await asyncio.gather(
+            __count_records(count_session, filters, cap), page_query
+        )
+    else:
+        total_items = await __count_records(db_session, filters, cap)
+        result = await page_query
+
+    if cap is not None and total_items is not None and total_items < cap:
+        # The estimate did not reach the cap, so it is the exact count
+        total_is_exact = True
+    if total_is_exact and total_items is not None:
+        _count_cache.set(count_key, total_items)
+
+    rows = result.all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        record_id, _, *leading_key = rows[-1]
+        next_cursor = _pagination.encode_cursor([*leading_key, record_id])
+
+    missing_ids = [record_id for record_id, document, *_ in rows if document is None]
+    loaded_documents = (
+        await __load_documents(db_session, missing_ids, selected_fields)
+        if missing_ids
+        else {}
+    )
+    documents = [
+        document if document is not None else loaded_documents[record_id]
+        for record_id, document, *_ in rows
+    ]
+
+    facet_counts: FacetCounts | None = None
+    facets_exact = True
+    if facet_names:
+        facet_key = (generation, filter_key, facet_names)
+        cached_facets = _facet_cache.get(facet_key)
+        if cached_facets is None:
+            cached_facets = await __count_facets(db_session, filters, facet_names)
+            _facet_cache.set(facet_key, cached_facets)
+        facet_counts, facets_exact = cached_facets
+
+    search_result = SearchResult(
+        documents,
+        total_items,
+        total_is_exact,
+        next_cursor,
+        facet_counts,
+        facets_exact,
+    )
+    _result_cache.set(result_key, search_result)
+    return search_result
+
+
+async def get_records_by_identifiers(
+    db_session: AsyncSession,
+    identifiers: Sequence[str],
+    identifier_type: str | None = None,
+    fields: str | None = None,
+) -> Dict[str, List[str]]:
+    """
+    Looks up records by identifier value (e.g. an NDL URI or an ISBN in any
+    form), optionally of one identifier type only.
+
+    Returns the JSON documents of the matching records per requested value,
+    oldest first. All values are resolved with one query on the index on
+    `identifiers.normalized_value`. `fields` works as in `search_records`.
+    """
+    # Normalized keys of every requested value
+    requested_keys = {
+        value: (
+            {normalize_identifier(value, identifier_type)}
+            if identifier_type is not None
+            else identifier_keys(value)
+        )
+        for value in identifiers
+    }
+    values_by_key: Dict[str, List[str]] = {}
+    for value, keys in requested_keys.items():
+        for key in keys:
+            values_by_key.setdefault(key, []).append(value)
 
-    # Apply pagination
-    paginated_stmt = stmt.offset(skip).limit(limit)
-    result = await db_session.execute(paginated_stmt)
-    db_records = result.scalars().all()
+    selected_fields = _projection.parse_fields(fields)
+    document = __document_column(selected_fields)
+    stmt = (
+        select(sa_model.Identifier.normalized_value, sa_model.Record.id, document)
+        .join(sa_model.Record, sa_model.Record.id == sa_model.Identifier.record_id)
+        .outerjoin(
+            sa_model.RecordDocument,
+            sa_model.RecordDocument.record_id == sa_model.Record.id,
+        )
+        .where(sa_model.Identifier.normalized_value.in_(values_by_key))
+        .order_by(_RECORD_SORT_KEY)
+    )
+    if identifier_type is not None:
+        stmt = stmt.where(sa_model.Identifier.type == identifier_type)
+    rows = (await db_session.execute(stmt)).all()
+
+    missing_ids = [record_id for _, record_id, stored in rows if stored is None]
+    loaded_documents = (
+        await __load_documents(db_session, missing_ids, selected_fields)
+        if missing_ids
+        else {}
+    )
+    # A record matches once per value even if several of its identifiers match
+    matches: Dict[str, Dict[int, str]] = {value: {} for value in identifiers}
+    for key, record_id, stored in rows:
+        for value in values_by_key[key]:
+            matches[value].setdefault(
+                record_id,
+                stored if stored is not None else loaded_documents[record_id],
+            )
+    return {value: list(documents.values()) for value, documents in matches.items()}
 
-    pydantic_records = [_convert_sa_to_pydantic(rec) for rec in db_records]
 
-    return pydantic_records, total_items
+def get_search_cache_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Returns the counters of the search result, count and facet caches of this
+    process.
+    """
+    return {
+        "results": _result_cache.stats(),
+        "counts": _count_cache.stats(),
+        "facets": _facet_cache.stats(),
+    }
+
+
+def clear_search_caches() -> None:
+    """
+    Empties the search result, count and facet caches of this process.
+    """
+    _result_cache.clear()
+    _count_cache.clear()
+    _facet_cache.clear()
@@ -1,16 +1,122 @@
-from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+import time
+from typing import Any, AsyncGenerator, Dict
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 
 from config import Config
+from src import metrics
 
 app_config = Config()
 
-# Create an async engine instance from the effective URL in the config
-async_engine = create_async_engine(app_config.EFFECTIVE_ASYNC_DATABASE_URL)
+# Pragmas of the read-only connections that serve the API. Readers never block
+# on, or get blocked by, the writer because the database is in WAL mode, which
+# the write engine turns on.
+READ_PRAGMAS: Dict[str, Any] = {
+    "mmap_size": app_config.DATABASE_MMAP_SIZE,
+    "cache_size": -app_config.DATABASE_READ_CACHE_SIZE_KIB,
+    "temp_store": "MEMORY",
+}
+
+# Pragmas of the single write connection, tuned for bulk loads
+WRITE_PRAGMAS: Dict[str, Any] = {
+    "journal_mode": "WAL",
+    "synchronous": app_config.DATABASE_WRITE_SYNCHRONOUS,
+    "mmap_size": app_config.DATABASE_MMAP_SIZE,
+    "cache_size": -app_config.DATABASE_WRITE_CACHE_SIZE_KIB,
+    "temp_store": "MEMORY",
+}
+
+
+def _set_pragmas_on_connect(engine: AsyncEngine, pragmas: Dict[str, Any]) -> None:
+    """
+    Applies the pragmas to every new connection of the engine.
+    """
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+
+def _record_statements(engine: AsyncEngine) -> None:
+    """
+    Times every statement executed by the engine, and counts the rows it
+    returns, for `src.metrics` and request profiles.
+    """
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def start_timer(
+        conn: Any,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        context.metrics_start = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def stop_timer(
+        conn: Any,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        # The async adapter fetches the rows of a statement while executing it,
+        # so they are counted here; streamed results are not buffered and not
+        # counted
+        rows = getattr(cursor, "_rows", None)
+        metrics.record_statement(
+            statement,
+            time.perf_counter() - context.metrics_start,
+            len(rows) if rows is not None else 0,
+            app_config.METRICS_SLOW_STATEMENT_SECONDS,
+        )
+
+
+_connect_args = {"timeout": app_config.DATABASE_BUSY_TIMEOUT_SECONDS}
 
-# Create a session factory
-AsyncSessionLocal: async_sessionmaker[AsyncSession] = async_sessionmaker(
-    bind=async_engine,
+# Read-only engine for the API
+read_engine = create_async_engine(
+    app_config.EFFECTIVE_ASYNC_READ_ONLY_DATABASE_URL,
+    pool_size=app_config.DATABASE_READ_POOL_SIZE,
+    connect_args=_connect_args,
+)
+_set_pragmas_on_connect(read_engine, READ_PRAGMAS)
+
+# Engine for schema changes, ingest and maintenance. SQLite allows one writer
+# at a time, so a single connection is enough.
+write_engine = create_async_engine(
+    app_config.EFFECTIVE_ASYNC_DATABASE_URL,
+    pool_size=1,
+    connect_args=_connect_args,
+)
+_set_pragmas_on_connect(write_engine, WRITE_PRAGMAS)
+
+if app_config.METRICS_ENABLED or app_config.PROFILING_ENABLED:
+    _record_statements(read_engine)
+    _record_statements(write_engine)
+
+
+# Create the session factories
+ReadSessionLocal: async_sessionmaker[AsyncSession] = async_sessionmaker(
+    bind=read_engine,
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+)
+WriteSessionLocal: async_sessionmaker[AsyncSession] = async_sessionmaker(
+    bind=write_engine,
     autocommit=False,
     autoflush=False,
     expire_on_commit=False,
@@ -19,8 +125,17 @@ AsyncSessionLocal: async_sessionmaker[AsyncSession] = async_sessionmaker(
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
-    Dependency provider for database sessions.
+    Dependency provider for read-only database sessions.
+    Yields a session and ensures it's closed after use.
+    """
+    async with ReadSessionLocal() as session:
+        yield session
+
+
+async def get_write_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Provider for sessions that write, e.g. in populate.py.
     Yields a session and ensures it's closed after use.
     """
-    async with AsyncSessionLocal() as session:
+    async with WriteSessionLocal() as session:
         yield session
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+from http.client import HTTPResponse
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Tuple
+from urllib.parse import urlencode
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db import crud
+from src.db._creator_cache import CreatorCache
+from src.model import Record
+from src.xml_loader._parser import _CHUNK_SIZE, _create_feeder
+
+# HTTP statuses after which a request is retried; 503 is how OAI-PMH
+# repositories ask harvesters to slow down, with a Retry-After header
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Seconds to wait before retrying when the repository does not say
+_DEFAULT_RETRY_AFTER = 10.0
+
+
+class OaiPmhError(Exception):
+    """
+    Raised when the repository answers a request with an OAI-PMH error.
+    """
+
+    def __init__(self, code: str, message: str) -> None:
+        super().__init__(f"{code}: {message}")
+        self.code = code
+
+
+class HarvestResult(NamedTuple):
+    # Records that were not stored yet
+    inserted: int
+    # Stored records replaced by a changed version
+    updated: int
+    # Records harvested again without changes, e.g. after an interrupted harvest
+    unchanged: int
+    # Stored records removed because the repository deleted them
+    deleted: int
+    # Records skipped because they failed validation
+    skipped: int
+    # Datestamp the next harvest of the set starts from
+    last_datestamp: datetime | None
+
+
+def format_datestamp(datestamp: datetime) -> str:
+    """
+    Formats a datestamp as an OAI-PMH UTC datetime with seconds granularity.
+    """
+    return datestamp.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _parse_datestamp(value: str) -> datetime:
+    datestamp = datetime.fromisoformat(value)
+    if datestamp.tzinfo is None:
+        # Day granularity ("2024-01-31") carries no time zone; OAI-PMH uses UTC
+        datestamp = datestamp.replace(tzinfo=timezone.utc)
+    return datestamp
+
+
+def list_records_url(
+    base_url: str,
+    metadata_prefix: str,
+    set_spec: str,
+    from_datestamp: datetime | None,
+    resumption_token: str | None = None,
+) -> str:
+    """
+    Builds the URL of a ListRecords request. A resumption token replaces every
+    other argument, as the protocol requires.
+    """
+    params = {"verb": "ListRecords"}
+    if resumption_token is not None:
+        params["resumptionToken"] = resumption_token
+    else:
+        params["metadataPrefix"] = metadata_prefix
+        if set_spec:
+            params["set"] = set_spec
+        if from_datestamp is not None:
+            params["from"] = format_datestamp(from_datestamp)
+    return f"{base_url}?{urlencode(params)}"
+
+
+def _open(url: str, timeout: float, max_attempts: int) -> HTTPResponse:
+    """
+    Opens a URL, retrying on connection errors and on the statuses of an
+    overloaded repository.
+    """
+    for attempt in range(1, max_attempts + 1):
+        try:
+            response: HTTPResponse = urllib.request.urlopen(url, timeout=timeout)
+            return response
+        except urllib.error.HTTPError as e:
+            if e.code not in _RETRY_STATUSES or attempt == max_attempts:
+                raise
+            retry_after = e.headers.get("Retry-After")
+            delay = (
+                float(retry_after)
+                if retry_after and retry_after.isdigit()
+                else _DEFAULT_RETRY_AFTER
+            )
+        except urllib.error.URLError:
+            if attempt == max_attempts:
+                raise
+            delay = _DEFAULT_RETRY_AFTER
+        logging.warning(f"Request failed (attempt {attempt}), retrying: {url}")
+        time.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+async def iter_list_records(
+    base_url: str,
+    metadata_prefix: str,
+    set_spec: str,
+    from_datestamp: datetime | None,
+    timeout: float,
+    max_attempts: int,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Requests ListRecords and yields record dicts, following resumption tokens
+    until the list is complete. Each response is parsed while it is read, so
+    memory use does not depend on the page size. Deleted records are yielded
+    with `header["status"] == "deleted"` and no metadata.
+    """
+    resumption_token = None
+    while True:
+        url = list_records_url(
+            base_url, metadata_prefix, set_spec, from_datestamp, resumption_token
+        )
+        completed_records: List[Dict[str, Any]] = []
+        response_elements: Dict[str, Tuple[str, Dict[str, str]]] = {}
+        feed, close = _create_feeder(
+            "expat",
+            completed_records.append,
+            lambda name, text, attributes: response_elements.update(
+                {name: (text, attributes)}
+            ),
+        )
+
+        response = await asyncio.to_thread(_open, url, timeout, max_attempts)
+        with response:
+            while chunk := await asyncio.to_thread(response.read, _CHUNK_SIZE):
+                feed(chunk)
+                for record_dict in completed_records:
+                    yield record_dict
+                completed_records.clear()
+        close()
+        for record_dict in completed_records:
+            yield record_dict
+
+        if "error" in response_elements:
+            message, attributes = response_elements["error"]
+            code = attributes.get("code", "")
+            if code == "noRecordsMatch":
+                # Nothing changed since `from_datestamp`
+                return
+            raise OaiPmhError(code, message)
+        # An empty token marks the last page of the list
+        resumption_token = response_elements.get("resumptionToken", ("", {}))[0]
+        if not resumption_token:
+            return
+
+
+async def harvest_set(
+    db_session: AsyncSession,
+    creator_cache: CreatorCache,
+    base_url: str,
+    metadata_prefix: str,
+    set_spec: str,
+    batch_size: int,
+    timeout: float,
+    max_attempts: int,
+) -> HarvestResult:
+    """
+    Harvests the records of a set (or of the whole repository if `set_spec` is
+    "") that changed since its last harvest, and writes them in batches.
+
+    A harvested record replaces the stored record with the same header
+    identifier, and deleted records are removed, so harvesting the same
+    changes again leaves the database as it was. The high-water mark of the set
+    only moves once the whole list is harvested; an interrupted harvest starts
+    over from the previous mark.
+    """
+    from_datestamp = await crud.get_harvest_state(db_session, base_url, set_spec)
+    last_datestamp = from_datestamp
+    counts = crud.UpsertCounts()
+    deleted_count = skipped_count = 0
+    logging.info(
+        f"Harvesting set {set_spec!r} from {base_url}"
+        + (f" since {format_datestamp(from_datestamp)}" if from_datestamp else "")
+    )
+
+    async def write_batch(batch: List[Dict[str, Any]]) -> None:
+        nonlocal deleted_count, skipped_count
+        # The last version of a record in the batch wins
+        latest = {
+            record_dict["header"].get("identifier"): record_dict
+            for record_dict in batch
+        }
+        latest.pop(None, None)
+        deleted = [
+            uri
+            for uri, record_dict in latest.items()
+            if record_dict["header"].get("status") == "deleted"
+        ]
+        records = []
+        for record_dict in latest.values():
+            if record_dict["header"].get("status") == "deleted":
+                continue
+            try:
+                records.append(Record.model_validate(record_dict))
+            except ValidationError as e:
+                skipped_count += 1
+                if skipped_count < 10:
+                    logging.warning(f"Skipping a record due to validation error: {e}")
+
+        deleted_count += await crud.delete_records_by_uri(db_session, deleted)
+        counts.add(await crud.bulk_upsert_records(db_session, records, creator_cache))
+        await db_session.commit()
+        creator_cache.mark_committed()
+
+    batch: List[Dict[str, Any]] = []
+    try:
+        async for record_dict in iter_list_records(
+            base_url, metadata_prefix, set_spec, from_datestamp, timeout, max_attempts
+        ):
+            if datestamp := record_dict["header"].get("datestamp"):
+                parsed = _parse_datestamp(datestamp)
+                if last_datestamp is None or parsed > last_datestamp:
+                    last_datestamp = parsed
+            batch.append(record_dict)
+            if len(batch) >= batch_size:
+                await write_batch(batch)
+                batch.clear()
+        if batch:
+            await write_batch(batch)
+    except Exception:
+        await db_session.rollback()
+        creator_cache.discard_uncommitted()
+        raise
+
+    if last_datestamp is not None:
+        await crud.set_harvest_state(db_session, base_url, set_spec, last_datestamp)
+        await db_session.commit()
+    return HarvestResult(
+        counts.inserted,
+        counts.updated,
+        counts.unchanged,
+        deleted_count,
+        skipped_count,
+        last_datestamp,
+    )
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import queue
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db import crud
+from src.db._bulk import build_batch_rows
+from src.db._creator_cache import CreatorCache
+from src.xml_loader.loader import iter_xml
+
+# Seconds the writer waits on the queue before checking whether workers finished
+_QUEUE_POLL_INTERVAL = 0.5
+
+
+def _parse_file(path: str, batch_size: int, batch_queue: queue.Queue[Any]) -> int:
+    """
+    Runs in a worker process: parses and validates one XML file and puts
+    batches of table rows on the queue. Returns the number of parsed records.
+    """
+    parsed_count = 0
+    try:
+        for batch in itertools.batched(iter_xml(Path(path)), batch_size):
+            batch_queue.put(build_batch_rows(batch))
+            parsed_count += len(batch)
+    except Exception as e:
+        # Some exceptions (e.g. SAXParseException) cannot be unpickled in the
+        # parent process, which would break the whole pool
+        raise RuntimeError(f"{type(e).__name__}: {e}") from None
+    return parsed_count
+
+
+async def ingest_files_parallel(
+    db_session: AsyncSession,
+    paths: Sequence[Path],
+    creator_cache: CreatorCache,
+    workers: int,
+    batch_size: int,
+    queue_size: int,
+) -> crud.UpsertCounts:
+    """
+    Parses XML files in a pool of worker processes and writes their batches
+    through this single session, so SQLite only ever sees one writer.
+    The bounded queue holds parsers back when the writer falls behind.
+    Returns the numbers of inserted, updated and unchanged records.
+    """
+    counts = crud.UpsertCounts()
+    # Spawned workers do not inherit the event loop or open connections
+    context = multiprocessing.get_context("spawn")
+
+    with (
+        context.Manager() as manager,
+        ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool,
+    ):
+        batch_queue = manager.Queue(maxsize=queue_size)
+        futures: Dict[Future[int], Path] = {
+            pool.submit(_parse_file, str(path), batch_size, batch_queue): path
+            for path in paths
+        }
+
+        while True:
+            try:
+                rows = await asyncio.to_thread(
+                    batch_queue.get, timeout=_QUEUE_POLL_INTERVAL
+                )
+            except queue.Empty:
+                # Workers put every batch before they finish, so once all are done
+                # an empty queue means everything has been written
+                if all(future.done() for future in futures) and batch_queue.empty():
+                    break
+                continue
+
+            try:
+                batch_counts = await crud.upsert_batch_rows(
+                    db_session, rows, creator_cache
+                )
+                await db_session.commit()
+                creator_cache.mark_committed()
+                counts.add(batch_counts)
+                logging.info(f"Committed batch. Total records: {counts}")
+            except Exception as e:
+                logging.error(f"Failed to save a batch: {e}", exc_info=True)
+                await db_session.rollback()
+                creator_cache.discard_uncommitted()
+
+        for future, path in futures.items():
+            if (error := future.exception()) is not None:
+                logging.error(f"Failed to process file {path.name}: {error}")
+            else:
+                logging.info(f"Parsed {future.result()} records from {path.name}.")
+
+    return counts
@@ -2,7 +2,10 @@ from fastapi import FastAPI
 from fastapi.responses import RedirectResponse
 from fastapi.staticfiles import StaticFiles
 
-from src.api import search
+from src.api import metrics, records, search
+from src.db.session import app_config
+from src.metrics import MetricsMiddleware
+from src.profiling import ProfilingMiddleware
 
 app = FastAPI(
     title="OPAC API",
@@ -14,6 +17,16 @@ app = FastAPI(
 
 # --- API Router ---
 app.include_router(search.router, prefix="/api/v1", tags=["search"])
+app.include_router(records.router, prefix="/api/v1", tags=["records"])
+
+# --- Metrics and Profiling ---
+# Off by default; requests that do not ask for a profile skip it after a look
+# at their headers. Added first, so that it runs inside the metrics middleware.
+if app_config.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware, output_dir=app_config.PROFILING_OUTPUT_DIR)
+if app_config.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics.router, prefix="/api", tags=["metrics"])
 
 # --- Frontend Serving ---
 FRONTEND_DIST_DIR = "frontend/dist"
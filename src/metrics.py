@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import bisect
+import contextvars
+import logging
+import threading
+import time
+from typing import Dict, List, Sequence, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Label values of one series, in the order of the metric's label names
+LabelValues = Tuple[str, ...]
+
+# Seconds, for request and statement latencies
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+# Statements per request; a jump between deploys points at an N+1 query
+STATEMENT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+# Rows fetched per request; a jump points at a query that reads far more rows
+# than the response needs
+ROW_BUCKETS = (0, 10, 50, 100, 500, 1000, 5000, 10000)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class Counter:
+    """
+    Monotonic count per label values, like a Prometheus counter.
+    """
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                labels = _format_labels(self.label_names, label_values)
+                lines.append(f"{self.name}{labels} {_format_value(value)}")
+        return lines
+
+
+class _Series:
+    def __init__(self, bucket_count: int) -> None:
+        # Observations per bucket, not cumulative; the last bucket is +Inf
+        self.counts = [0] * bucket_count
+        self.total = 0.0
+
+
+class Histogram:
+    """
+    Observations counted in fixed buckets per label values, like a Prometheus
+    histogram.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series: Dict[LabelValues, _Series] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        # The first bucket whose upper bound is not below the value
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = _Series(len(self.buckets) + 1)
+            series.counts[index] += 1
+            series.total += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        names = (*self.label_names, "le")
+        with self._lock:
+            for label_values, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip((*self.buckets, float("inf")), series.counts):
+                    cumulative += count
+                    labels = _format_labels(
+                        names, (*label_values, _format_value(bound))
+                    )
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.label_names, label_values)
+                lines.append(f"{self.name}_sum{labels} {_format_value(series.total)}")
+                lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+REQUEST_SECONDS = Histogram(
+    "opac_http_request_duration_seconds",
+    "Time to answer an HTTP request.",
+    ("method", "route", "status"),
+)
+REQUEST_STATEMENTS = Histogram(
+    "opac_db_statements_per_request",
+    "SQL statements executed while answering an HTTP request.",
+    ("route",),
+    STATEMENT_BUCKETS,
+)
+REQUEST_DB_SECONDS = Histogram(
+    "opac_db_seconds_per_request",
+    "Time spent executing SQL statements while answering an HTTP request.",
+    ("route",),
+)
+REQUEST_ROWS = Histogram(
+    "opac_db_rows_fetched_per_request",
+    "Rows fetched from the database while answering an HTTP request.",
+    ("route",),
+    ROW_BUCKETS,
+)
+STATEMENT_SECONDS = Histogram(
+    "opac_db_statement_duration_seconds",
+    "Time to execute a SQL statement.",
+    ("operation",),
+)
+SLOW_STATEMENTS = Counter(
+    "opac_db_slow_statements_total",
+    "SQL statements slower than METRICS_SLOW_STATEMENT_SECONDS.",
+    ("operation",),
+)
+CONVERSION_SECONDS = Histogram(
+    "opac_convert_sa_to_pydantic_seconds",
+    "Time to convert a loaded record to its Pydantic model.",
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025),
+)
+
+METRICS = (
+    REQUEST_SECONDS,
+    REQUEST_STATEMENTS,
+    REQUEST_DB_SECONDS,
+    REQUEST_ROWS,
+    STATEMENT_SECONDS,
+    SLOW_STATEMENTS,
+    CONVERSION_SECONDS,
+)
+
+
+def render() -> str:
+    """
+    Returns every metric in the Prometheus text exposition format.
+    """
+    return "\n".join(line for metric in METRICS for line in metric.render()) + "\n"
+
+
+class RequestStats:
+    """
+    Work done for the HTTP request being answered.
+    """
+
+    def __init__(self) -> None:
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.rows_fetched = 0
+        # (start, seconds, statement) of every statement, kept while the
+        # request is profiled
+        self.timeline: List[Tuple[float, float, str]] | None = None
+
+
+_request_stats: contextvars.ContextVar[RequestStats | None] = contextvars.ContextVar(
+    "request_stats", default=None
+)
+
+
+def record_statement(
+    statement: str, seconds: float, rows: int, slow_seconds: float
+) -> None:
+    """
+    Records a SQL statement executed by the app and the rows it returned, and
+    logs it if it was slow.
+    """
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement else ""
+    STATEMENT_SECONDS.observe(seconds, operation)
+    if seconds >= slow_seconds:
+        SLOW_STATEMENTS.inc(operation)
+        sql = " ".join(statement.split())
+        logging.warning(f"Slow SQL statement ({seconds:.3f} s): {sql}")
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += seconds
+        stats.rows_fetched += rows
+        if stats.timeline is not None:
+            stats.timeline.append((time.perf_counter() - seconds, seconds, statement))
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware that times every HTTP request and records the SQL work done
+    for it, labeled with the path template of the matched route, e.g.
+    "/records/{identifier:path}", so that requests for different records
+    share their series.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_stats.reset(token)
+            # Set by the router once a route matches; mounted apps, such as
+            # the frontend, are labeled with their mount path
+            matched_route = scope.get("route")
+            if matched_route is not None:
+                route = matched_route.path
+            else:
+                route = scope.get("root_path") or "unmatched"
+            REQUEST_SECONDS.observe(elapsed, scope["method"], route, str(status))
+            REQUEST_STATEMENTS.observe(stats.statements, route)
+            REQUEST_DB_SECONDS.observe(stats.db_seconds, route)
+            REQUEST_ROWS.observe(stats.rows_fetched, route)
@@ -53,3 +53,38 @@ class Metadata(BaseModel):
 class Record(BaseModel):
     header: Header
     metadata: Metadata
+
+
+# `DcndlSimple` as returned with `fields=`: the fields that were not selected are
+# omitted, the title is always returned
+class ProjectedDcndlSimple(BaseModel):
+    title: str
+    identifier: Optional[List[TypedValue[str]]] = None
+    creator: Optional[List[str]] = None
+    publisher: Optional[str] = None
+    alternative: Optional[str] = None
+    series_title: Optional[str] = None
+    date: Optional[str] = None
+    language: Optional[str] = None
+    extent: Optional[str] = None
+    material_type: Optional[str] = None
+    access_rights: Optional[str] = None
+    title_transcription: Optional[str] = None
+    volume: Optional[str] = None
+
+    publication_place: Optional[List[TypedValue[str]]] = None
+    issued: Optional[List[TypedValue[datetime | str]]] = None
+    subject: Optional[List[TypedValue[str]]] = None
+
+    see_also: Optional[List[ResourceLink]] = None
+    same_as: Optional[List[ResourceLink]] = None
+    thumbnail: Optional[List[ResourceLink]] = None
+
+
+class ProjectedMetadata(BaseModel):
+    dc: ProjectedDcndlSimple
+
+
+class ProjectedRecord(BaseModel):
+    header: Header
+    metadata: ProjectedMetadata
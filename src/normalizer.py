@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import calendar
+import re
+import unicodedata
+from typing import Iterable, List, NamedTuple, Set
+
+# Katakana (ァ..ヶ, ヽ, ヾ) are folded onto their hiragana counterparts so that
+# "ネコ" and "ねこ" index and query identically.
+_KATAKANA_TO_HIRAGANA = {cp: cp - 0x60 for cp in range(0x30A1, 0x30F7)} | {
+    0x30FD: 0x309D,
+    0x30FE: 0x309E,
+}
+
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+# Separators written inside ISBNs and ISSNs (after NFKC): spaces and hyphens
+_CODE_SEPARATOR_RE = re.compile(r"[\s\-\u2010-\u2015\u2212]+")
+_ISBN10_RE = re.compile(r"\d{9}[\dX]")
+_ISBN13_RE = re.compile(r"97[89]\d{10}")
+_ISSN_RE = re.compile(r"\d{7}[\dX]")
+
+# A year with an optional month and day, as in W3CDTF ("1997-01-05") and in
+# NDL's "1997.1", inside text such as "[1997]" or "c1997"
+_DATE_RE = re.compile(r"(?<!\d)(\d{4})(?:[-./](\d{1,2})(?:[-./](\d{1,2}))?)?(?!\d)")
+
+
+def normalize(text: str) -> str:
+    """
+    Normalizes text for search: NFKC (full-width/half-width folding),
+    case folding and katakana-to-hiragana folding.
+    """
+    normalized = unicodedata.normalize("NFKC", text).casefold()
+    return normalized.translate(_KATAKANA_TO_HIRAGANA)
+
+
+def normalize_name(name: str) -> str:
+    """
+    Normalizes a creator name into the key used to deduplicate creators:
+    NFKC, case folding and collapsed whitespace. Kana are not folded because
+    different readings may denote different people.
+    """
+    return " ".join(unicodedata.normalize("NFKC", name).casefold().split())
+
+
+def compact(text: str) -> str:
+    """
+    Normalizes text and removes whitespace, punctuation and symbols, so that
+    "データ・ベース" and "夏目, 漱石" are indexed as "でーたべーす" and "夏目漱石".
+    """
+    return _NON_WORD_RE.sub("", normalize(text))
+
+
+def segments(text: str) -> List[str]:
+    """
+    Splits a query into normalized segments at whitespace, punctuation and
+    symbols.
+    """
+    return [segment for segment in _NON_WORD_RE.split(normalize(text)) if segment]
+
+
+def index_ngrams(text: str, n: int) -> List[str]:
+    """
+    Returns the n-grams to index for a text.
+
+    One token starts at every character of the compacted text; tokens near the
+    end are shorter than `n`. This lets any substring of at least `n` characters
+    be found as a phrase of consecutive n-grams, and any shorter substring as a
+    token prefix.
+    """
+    compacted = compact(text)
+    return [compacted[i : i + n] for i in range(len(compacted))]
+
+
+def query_ngrams(segment: str, n: int) -> List[str]:
+    """
+    Returns the consecutive n-grams of a normalized query segment,
+    or an empty list if the segment is shorter than `n`.
+    """
+    return [segment[i : i + n] for i in range(len(segment) - n + 1)]
+
+
+def _compact_code(value: str) -> str:
+    return _CODE_SEPARATOR_RE.sub("", unicodedata.normalize("NFKC", value)).upper()
+
+
+def _isbn10_is_valid(isbn: str) -> bool:
+    digits = [10 if c == "X" else int(c) for c in isbn]
+    return sum((10 - i) * d for i, d in enumerate(digits)) % 11 == 0
+
+
+def _isbn13_check_digit(first_twelve: str) -> str:
+    total = sum((1 if i % 2 == 0 else 3) * int(c) for i, c in enumerate(first_twelve))
+    return str(-total % 10)
+
+
+def normalize_isbn(value: str) -> str:
+    """
+    Normalizes an ISBN to the 13 digits of its ISBN-13 form, so that
+    "4-10-101001-X" and "978-4-10-101001-4" compare equal. Values that are not
+    a valid ISBN-10 lose their separators only.
+    """
+    code = _compact_code(value)
+    if _ISBN10_RE.fullmatch(code) and _isbn10_is_valid(code):
+        first_twelve = "978" + code[:9]
+        return first_twelve + _isbn13_check_digit(first_twelve)
+    return code
+
+
+def normalize_issn(value: str) -> str:
+    """
+    Normalizes an ISSN to its eight characters without the hyphen.
+    """
+    return _compact_code(value)
+
+
+def normalize_identifier(value: str, type: str | None) -> str:
+    """
+    Normalizes an identifier value according to its type: ISBNs (dcndl:ISBN,
+    dcndl:SetISBN, ...) become ISBN-13 digits, ISSNs (dcndl:ISSN,
+    dcndl:ISSNL, ...) lose the hyphen, and other values are NFKC-normalized
+    with surrounding whitespace removed.
+    """
+    if type is not None and "ISBN" in type:
+        return normalize_isbn(value)
+    if type is not None and "ISSN" in type:
+        return normalize_issn(value)
+    return unicodedata.normalize("NFKC", value).strip()
+
+
+def identifier_keys(value: str) -> Set[str]:
+    """
+    Returns the normalized values an identifier of unknown type may be stored
+    as: the value itself, and its ISBN or ISSN form if it looks like one.
+    """
+    keys = {normalize_identifier(value, None)}
+    code = _compact_code(value)
+    if _ISBN10_RE.fullmatch(code) or _ISBN13_RE.fullmatch(code):
+        keys.add(normalize_isbn(value))
+    if _ISSN_RE.fullmatch(code):
+        keys.add(normalize_issn(value))
+    return keys
+
+
+class PublicationDate(NamedTuple):
+    year: int | None
+    month: int | None
+    day: int | None
+
+
+def parse_date(value: str) -> PublicationDate:
+    """
+    Parses the first year, with its month and day if present and valid, out of
+    a free-text date.
+    """
+    match = _DATE_RE.search(unicodedata.normalize("NFKC", value))
+    if match is None:
+        return PublicationDate(None, None, None)
+    year = int(match[1])
+    month = int(match[2]) if match[2] else None
+    if month is None or not 1 <= month <= 12:
+        return PublicationDate(year, None, None)
+    day = int(match[3]) if match[3] else None
+    if day is None or not 1 <= day <= calendar.monthrange(year, month)[1]:
+        return PublicationDate(year, month, None)
+    return PublicationDate(year, month, day)
+
+
+def publication_date(date: str | None, issued: Iterable[str]) -> PublicationDate:
+    """
+    Derives the publication date of a record from its `issued` values and its
+    `date`: the most precise date among them, the earliest listed on a tie.
+    """
+    values = [*issued, *([date] if date is not None else [])]
+    return max(
+        (parse_date(value) for value in values),
+        key=lambda parsed: sum(part is not None for part in parsed),
+        default=PublicationDate(None, None, None),
+    )
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import json
+import logging
+import pstats
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+from urllib.parse import parse_qsl
+
+import sqlalchemy.orm
+from fastapi import routing
+from pydantic import BaseModel
+from starlette.datastructures import MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src import metrics
+from src.api import records, search
+from src.db import _convert
+
+# Header or query parameter that asks for a profile of the request
+PROFILE_HEADER = b"x-profile"
+PROFILE_PARAMETER = "profile"
+
+# Functions profiled per request, the most expensive first
+TOP_FUNCTIONS = 40
+
+# (file, line, name) of a function, as keyed by `pstats.Stats`
+FunctionKey = Tuple[str, int, str]
+
+
+def _function_key(function: Callable[..., Any]) -> FunctionKey:
+    code = function.__code__
+    return code.co_filename, code.co_firstlineno, code.co_name
+
+
+# Entry points of JSON encoding that do not call each other. Time spent in
+# `_render_paginated_response` itself is added to theirs.
+_ENCODERS = (
+    _function_key(BaseModel.model_dump_json),
+    _function_key(JSONResponse.render),
+    _function_key(routing.serialize_response),
+    _function_key(records._render_batch_response),
+)
+_PAGE_RENDERER = _function_key(search._render_paginated_response)
+_CONVERTER = _function_key(_convert._convert_sa_to_pydantic)
+_ORM_DIRECTORY = str(Path(sqlalchemy.orm.__file__).parent)
+
+
+def _wants_profile(scope: Scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER:
+            return value not in (b"", b"0", b"false")
+    query = scope.get("query_string", b"")
+    if PROFILE_PARAMETER.encode() not in query:
+        return False
+    values = dict(parse_qsl(query.decode("latin-1")))
+    return values.get(PROFILE_PARAMETER, "0") not in ("", "0", "false")
+
+
+def breakdown(
+    stats: pstats.Stats, request_stats: metrics.RequestStats, total_seconds: float
+) -> Dict[str, float]:
+    """
+    Splits the time of a profiled request, in milliseconds, into executing SQL,
+    SQLAlchemy ORM code such as hydrating rows into objects, converting records
+    to Pydantic models and encoding JSON. The rest is routing, validation and
+    the app's own code.
+    """
+    entries: Dict[FunctionKey, Tuple[Any, ...]] = stats.stats  # type: ignore[attr-defined]
+
+    def cumulative(key: FunctionKey) -> float:
+        entry = entries.get(key)
+        return entry[3] if entry else 0.0
+
+    orm = sum(
+        entry[2] for key, entry in entries.items() if key[0].startswith(_ORM_DIRECTORY)
+    )
+    encoding = sum(cumulative(key) for key in _ENCODERS)
+    if _PAGE_RENDERER in entries:
+        encoding += entries[_PAGE_RENDERER][2]
+    # SQL runs on the driver's thread, which the profiler does not see, so its
+    # time comes from the statement timings
+    parts = {
+        "db": request_stats.db_seconds,
+        "orm": orm,
+        "conversion": cumulative(_CONVERTER),
+        "json": encoding,
+    }
+    parts["other"] = max(total_seconds - sum(parts.values()), 0.0)
+    parts["total"] = total_seconds
+    return {name: round(seconds * 1000, 3) for name, seconds in parts.items()}
+
+
+def _top_functions(stats: pstats.Stats) -> List[Dict[str, Any]]:
+    entries: Dict[FunctionKey, Tuple[Any, ...]] = stats.stats  # type: ignore[attr-defined]
+    top = sorted(entries.items(), key=lambda item: item[1][3], reverse=True)
+    return [
+        {
+            "function": f"{file}:{line}({name})",
+            "calls": entry[1],
+            "own_ms": round(entry[2] * 1000, 3),
+            "cumulative_ms": round(entry[3] * 1000, 3),
+        }
+        for (file, line, name), entry in top[:TOP_FUNCTIONS]
+    ]
+
+
+def _write_profile(
+    output_dir: Path, stats: pstats.Stats, report: Dict[str, Any]
+) -> None:
+    """
+    Writes a request profile to `<output_dir>/<id>.prof` and its report to
+    `<output_dir>/<id>.json`.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    stats.dump_stats(output_dir / f"{report['id']}.prof")
+    (output_dir / f"{report['id']}.json").write_text(
+        json.dumps(report, ensure_ascii=False, indent=2) + "\n", encoding="utf-8"
+    )
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles the HTTP requests that ask for it with an
+    `X-Profile: 1` header or a `profile=1` query parameter.
+
+    The profile covers the request until its response starts. Its breakdown
+    is returned in a `Server-Timing` header, and the breakdown, the timeline
+    of SQL statements and the most expensive functions are written to
+    `<output_dir>/<id>.json`, next to `<id>.prof` for pstats or snakeviz. The
+    id is returned in an `X-Profile-Id` header.
+
+    cProfile sees every coroutine on the event loop, so requests answered
+    concurrently end up in the same profile; profile on an otherwise idle
+    server. Only one request is profiled at a time.
+    """
+
+    def __init__(self, app: ASGIApp, output_dir: Path) -> None:
+        self.app = app
+        self.output_dir = output_dir
+        self._profiling = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not _wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+        if self._profiling:
+            logging.warning(f"Not profiling {scope['path']}: a profile is running")
+            await self.app(scope, receive, send)
+            return
+
+        # Shares the statistics of `MetricsMiddleware` when it runs outside
+        request_stats = metrics._request_stats.get()
+        token = None
+        if request_stats is None:
+            request_stats = metrics.RequestStats()
+            token = metrics._request_stats.set(request_stats)
+        request_stats.timeline = []
+        profile_id = f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}"
+        profiler = cProfile.Profile()
+        status = 500
+        elapsed = 0.0
+        start = time.perf_counter()
+
+        def stop() -> None:
+            nonlocal elapsed
+            if not elapsed:
+                profiler.disable()
+                elapsed = time.perf_counter() - start
+
+        async def send_with_profile(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                stop()
+                status = message["status"]
+                timings = breakdown(pstats.Stats(profiler), request_stats, elapsed)
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    ", ".join(f"{name};dur={ms}" for name, ms in timings.items()),
+                )
+                headers.append("X-Profile-Id", profile_id)
+            await send(message)
+
+        self._profiling = True
+        try:
+            profiler.enable()
+            try:
+                await self.app(scope, receive, send_with_profile)
+            finally:
+                stop()
+        finally:
+            self._profiling = False
+            timeline = request_stats.timeline or []
+            request_stats.timeline = None
+            if token is not None:
+                metrics._request_stats.reset(token)
+
+        stats = pstats.Stats(profiler)
+        report = {
+            "id": profile_id,
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "method": scope["method"],
+            "path": scope["path"],
+            "query": scope.get("query_string", b"").decode("latin-1"),
+            "status": status,
+            "breakdown_ms": breakdown(stats, request_stats, elapsed),
+            "statements": len(timeline),
+            "rows_fetched": request_stats.rows_fetched,
+            "sql": [
+                {
+                    "start_ms": round((statement_start - start) * 1000, 3),
+                    "duration_ms": round(seconds * 1000, 3),
+                    "statement": " ".join(statement.split()),
+                }
+                for statement_start, seconds, statement in timeline
+            ],
+            "functions": _top_functions(stats),
+        }
+        # Off the event loop, which keeps serving other requests meanwhile
+        await asyncio.to_thread(_write_profile, self.output_dir, stats, report)
+        logging.info(f"Profiled {scope['method']} {scope['path']} as {profile_id}")
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import pyexpat
 import xml.sax
-from typing import Callable, List, Optional, Tuple, Dict, Any
-from xml.sax.xmlreader import AttributesNSImpl
+from typing import Callable, Iterator, List, Literal, Optional, Tuple, Dict, Any
+from xml.sax.xmlreader import AttributesNSImpl, IncrementalParser
 
 NAMESPACES = {
     "oai": "http://www.openarchives.org/OAI/2.0/",
@@ -17,10 +18,23 @@ NAMESPACES = {
 }
 
 
+# Called with the local name, text and unqualified attributes of the OAI-PMH
+# elements outside records that a harvester needs: resumptionToken and error
+ResponseCallback = Callable[[str, str, Dict[str, str]], None]
+
+# OAI-PMH elements reported to a `ResponseCallback`
+_RESPONSE_ELEMENTS = ("resumptionToken", "error")
+
+
 class _DcndlSaxHandler(xml.sax.ContentHandler):
-    def __init__(self, record_callback: Callable[[Dict[str, Any]], None]) -> None:
+    def __init__(
+        self,
+        record_callback: Callable[[Dict[str, Any]], None],
+        response_callback: ResponseCallback | None = None,
+    ) -> None:
         super().__init__()
         self.record_callback = record_callback
+        self.response_callback = response_callback
         self._path: List[str] = []
         self._current_text: str = ""
         self._current_record_dict: Optional[Dict[str, Any]] = None
@@ -39,6 +53,14 @@ class _DcndlSaxHandler(xml.sax.ContentHandler):
 
         if localname == "record" and ns_uri == NAMESPACES["oai"]:
             self._current_record_dict = {"header": {}, "metadata": {"dc": {}}}
+        elif (
+            localname == "header"
+            and ns_uri == NAMESPACES["oai"]
+            and self._current_record_dict is not None
+            and (None, "status") in attrs
+        ):
+            # "deleted" marks a record withdrawn from the repository
+            self._current_record_dict["header"]["status"] = attrs[(None, "status")]
 
     def endElementNS(
         self, name: Tuple[Optional[str], str], qname: Optional[str]
@@ -46,6 +68,17 @@ class _DcndlSaxHandler(xml.sax.ContentHandler):
         ns_uri, localname = name
 
         if not self._current_record_dict:
+            if (
+                self.response_callback is not None
+                and localname in _RESPONSE_ELEMENTS
+                and ns_uri == NAMESPACES["oai"]
+            ):
+                attributes = {
+                    attr_name: value
+                    for (attr_ns, attr_name), value in self._current_attributes.items()
+                    if attr_ns is None
+                }
+                self.response_callback(localname, self._current_text, attributes)
             self._path.pop()
             return
 
@@ -130,11 +163,185 @@ class _DcndlSaxHandler(xml.sax.ContentHandler):
         self._current_text += content.strip()
 
 
+# --- pyexpat engine ---
+#
+# Same output as `_DcndlSaxHandler`, but driven by pyexpat directly: element names
+# arrive as "namespace localname" strings and are resolved with one dict lookup,
+# and text is buffered in a list instead of being concatenated.
+
+
+def _expat_name(prefix: str, localname: str) -> str:
+    return f"{NAMESPACES[prefix]} {localname}"
+
+
+_RECORD = _expat_name("oai", "record")
+_HEADER = _expat_name("oai", "header")
+_RESPONSE_NAMES = {_expat_name("oai", name): name for name in _RESPONSE_ELEMENTS}
+_XSI_TYPE = _expat_name("xsi", "type")
+_RDF_RESOURCE = _expat_name("rdf", "resource")
+
+# End-tag actions
+_HEADER_IDENTIFIER, _DATESTAMP, _SIMPLE, _CREATOR, _TYPED, _RESOURCE = range(6)
+
+_END_ACTIONS: Dict[str, Tuple[int, str]] = {
+    _expat_name("oai", "identifier"): (_HEADER_IDENTIFIER, "identifier"),
+    _expat_name("oai", "datestamp"): (_DATESTAMP, "datestamp"),
+    _expat_name("dc", "title"): (_SIMPLE, "title"),
+    _expat_name("dc", "publisher"): (_SIMPLE, "publisher"),
+    _expat_name("dcterms", "alternative"): (_SIMPLE, "alternative"),
+    _expat_name("dcndl", "seriesTitle"): (_SIMPLE, "series_title"),
+    _expat_name("dc", "date"): (_SIMPLE, "date"),
+    _expat_name("dc", "language"): (_SIMPLE, "language"),
+    _expat_name("dcterms", "extent"): (_SIMPLE, "extent"),
+    _expat_name("dcndl", "materialType"): (_SIMPLE, "material_type"),
+    _expat_name("dcterms", "accessRights"): (_SIMPLE, "access_rights"),
+    _expat_name("dcndl", "titleTranscription"): (_SIMPLE, "title_transcription"),
+    _expat_name("dcndl", "volume"): (_SIMPLE, "volume"),
+    _expat_name("dc", "creator"): (_CREATOR, "creator"),
+    _expat_name("dc", "identifier"): (_TYPED, "identifier"),
+    _expat_name("dcndl", "publicationPlace"): (_TYPED, "publication_place"),
+    _expat_name("dcterms", "issued"): (_TYPED, "issued"),
+    _expat_name("dc", "subject"): (_TYPED, "subject"),
+    _expat_name("rdfs", "seeAlso"): (_RESOURCE, "see_also"),
+    _expat_name("owl", "sameAs"): (_RESOURCE, "same_as"),
+    _expat_name("foaf", "thumbnail"): (_RESOURCE, "thumbnail"),
+}
+
+
+class _DcndlExpatHandler:
+    def __init__(
+        self,
+        record_callback: Callable[[Dict[str, Any]], None],
+        response_callback: ResponseCallback | None = None,
+    ) -> None:
+        self.record_callback = record_callback
+        self.response_callback = response_callback
+        self._text_parts: List[str] = []
+        self._current_record_dict: Optional[Dict[str, Any]] = None
+        self._current_attributes: Dict[str, str] = {}
+
+        self.parser = pyexpat.ParserCreate(namespace_separator=" ")
+        self.parser.StartElementHandler = self.start_element
+        self.parser.EndElementHandler = self.end_element
+        self.parser.CharacterDataHandler = self._text_parts.append
+
+    def start_element(self, name: str, attrs: Dict[str, str]) -> None:
+        self._text_parts.clear()
+        self._current_attributes = attrs
+        if name == _RECORD:
+            self._current_record_dict = {"header": {}, "metadata": {"dc": {}}}
+        elif name == _HEADER and self._current_record_dict is not None:
+            if "status" in attrs:
+                # "deleted" marks a record withdrawn from the repository
+                self._current_record_dict["header"]["status"] = attrs["status"]
+
+    def end_element(self, name: str) -> None:
+        record_dict = self._current_record_dict
+        if not record_dict:
+            if self.response_callback is not None and name in _RESPONSE_NAMES:
+                text = "".join([part.strip() for part in self._text_parts])
+                self.response_callback(
+                    _RESPONSE_NAMES[name], text, self._current_attributes
+                )
+            return
+
+        if name == _RECORD:
+            self.record_callback(record_dict)
+            self._current_record_dict = None
+            return
+
+        action = _END_ACTIONS.get(name)
+        if action is None:
+            return
+        kind, key = action
+        dc_dict = record_dict["metadata"]["dc"]
+
+        if kind == _RESOURCE:
+            res_attr = self._current_attributes.get(_RDF_RESOURCE)
+            if res_attr:
+                dc_dict.setdefault(key, []).append({"resource": res_attr})
+            return
+
+        # Chunks are stripped one by one, exactly like `_DcndlSaxHandler.characters`
+        text = "".join([part.strip() for part in self._text_parts])
+        if kind == _SIMPLE:
+            dc_dict[key] = text
+        elif kind == _CREATOR:
+            dc_dict.setdefault(key, []).append(text)
+        elif kind == _TYPED:
+            dc_dict.setdefault(key, []).append(
+                {"value": text, "type": self._current_attributes.get(_XSI_TYPE)}
+            )
+        elif kind == _HEADER_IDENTIFIER:
+            record_dict["header"]["identifier"] = text
+            # Also add it to the dc:identifier list for consistency
+            dc_dict.setdefault("identifier", []).append(
+                {"value": text, "type": "dcterms:URI"}
+            )
+        elif kind == _DATESTAMP:
+            record_dict["header"]["datestamp"] = text
+
+
+ParserEngine = Literal["sax", "expat"]
+
+# Read size per feed; the same as `xml.sax` uses, so both engines see the same
+# text chunks
+_CHUNK_SIZE = 64 * 1024
+
+
+def _create_feeder(
+    engine: ParserEngine,
+    record_callback: Callable[[Dict[str, Any]], None],
+    response_callback: ResponseCallback | None = None,
+) -> Tuple[Callable[[bytes], None], Callable[[], None]]:
+    """
+    Returns `(feed, close)` functions of an incremental parser for the engine.
+    """
+    if engine == "expat":
+        expat_parser = _DcndlExpatHandler(record_callback, response_callback).parser
+
+        def feed(data: bytes) -> None:
+            expat_parser.Parse(data, False)
+
+        def close() -> None:
+            expat_parser.Parse(b"", True)
+
+        return feed, close
+
+    sax_parser = xml.sax.make_parser()
+    if not isinstance(sax_parser, IncrementalParser):
+        raise TypeError("The default SAX parser does not support incremental parsing")
+    sax_parser.setFeature(xml.sax.handler.feature_namespaces, True)
+    sax_parser.setContentHandler(_DcndlSaxHandler(record_callback, response_callback))
+    return sax_parser.feed, sax_parser.close
+
+
 def _parse_dcndl_xml(
-    file_path: str, record_callback: Callable[[Dict[str, Any]], None]
+    file_path: str,
+    record_callback: Callable[[Dict[str, Any]], None],
+    engine: ParserEngine = "expat",
 ) -> None:
-    parser = xml.sax.make_parser()
-    parser.setFeature(xml.sax.handler.feature_namespaces, True)
-    handler = _DcndlSaxHandler(record_callback)
-    parser.setContentHandler(handler)
-    parser.parse(file_path)
+    feed, close = _create_feeder(engine, record_callback)
+    with open(file_path, "rb") as f:
+        while chunk := f.read(_CHUNK_SIZE):
+            feed(chunk)
+    close()
+
+
+def _iter_dcndl_xml(
+    file_path: str, chunk_size: int = _CHUNK_SIZE, engine: ParserEngine = "expat"
+) -> Iterator[Dict[str, Any]]:
+    """
+    Incrementally parses the file and yields record dicts as soon as they are
+    complete, so memory use does not depend on the size of the file.
+    """
+    completed_records: List[Dict[str, Any]] = []
+    feed, close = _create_feeder(engine, completed_records.append)
+
+    with open(file_path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            feed(chunk)
+            yield from completed_records
+            completed_records.clear()
+    close()
+    yield from completed_records